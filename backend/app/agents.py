@@ -1,89 +1,167 @@
 """
 Refactored AI Agents - using Randomized Rule Engine & Guardian Pattern
+Every agent has a sync variant (thread callers) and an async variant
+(workflow coroutines); both share the rule, prompt and parsing steps.
 """
 
+import httpx
 import requests
 import json
-from typing import Dict, Any, List
-from app.rules import rule_engine
-from app.guardian import validate_with_guardian
+import os
+from contextlib import closing
+from typing import Dict, Any, List, Optional, Tuple
+from pydantic import ValidationError
+from app.analysis_context import AnalysisContext
+from app.guardian import validate_with_guardian, validate_with_guardian_async
+from app.llm_cache import llm_cache, cache_key
+from app.llm_client import llm_client, async_llm_client
+from app.llm_stream import OllamaStreamReader, IncrementalJSONObject
+from app.micro_batch import MicroBatcher
 from app.schemas import TriageOutput, ComplianceOutput, RiskOutput
+from app.single_flight import SingleFlight, AsyncSingleFlight
 
-OLLAMA_API = "http://localhost:11434/api/generate"
+OLLAMA_GENERATE_PATH = "/api/generate"
 MODEL_NAME = "mistral"
 
-def call_ollama(prompt: str, system: str = "") -> str:
+# Stream replies and stop at the first complete JSON object (agents never need the rest)
+LLM_STREAMING = os.getenv("LLM_STREAMING", "true").lower() in ("1", "true", "yes")
+
+def _ollama_payload(prompt: str, system: str) -> Dict[str, Any]:
+    return {
+        "model": MODEL_NAME,
+        "prompt": prompt,
+        "system": system,
+        "stream": LLM_STREAMING,
+        "options": {
+            "temperature": 0.1,  # Lower = faster & more deterministic
+            "num_predict": 200,  # Limit output tokens for speed
+            "num_ctx": 2048,     # Smaller context window
+            "top_p": 0.9
+        }
+    }
+
+def call_ollama(prompt: str, system: str = "", agent: str = "LLM") -> str:
     """Ollama API call with error handling and speed optimizations"""
+    return _generate(_ollama_payload(prompt, system), agent)
+
+async def call_ollama_async(prompt: str, system: str = "", agent: str = "LLM") -> str:
+    """Async Ollama API call (same contract as call_ollama, no thread held while waiting)"""
+    return await _generate_async(_ollama_payload(prompt, system), agent)
+
+# Identical in-flight requests (same cache key) share one LLM call
+llm_single_flight = SingleFlight()
+async_llm_single_flight = AsyncSingleFlight()
+
+def _generate(payload: Dict[str, Any], agent: str, container: str = "object") -> str:
+    """Cached, coalesced generate call; errors come back as "Error: ..." strings"""
+    key = cache_key(payload)
+    cached = llm_cache.get(key)
+    if cached is not None:
+        return cached
+    return llm_single_flight.do(key, lambda: _request(payload, key, agent, container))
+
+def _request(payload: Dict[str, Any], key: str, agent: str, container: str) -> str:
     try:
-        payload = {
-            "model": MODEL_NAME,
-            "prompt": prompt,
-            "system": system,
-            "stream": False,
-            "options": {
-                "temperature": 0.1,  # Lower = faster & more deterministic
-                "num_predict": 200,  # Limit output tokens for speed
-                "num_ctx": 2048,     # Smaller context window
-                "top_p": 0.9
-            }
-        }
-        
-        # 15s timeout to prevent hanging
-        response = requests.post(OLLAMA_API, json=payload, timeout=15)
-        response.raise_for_status()
-        result = response.json()
-        return result.get("response", "").strip()
-        
+        # Pooled keep-alive connection; connect/read timeouts prevent hanging
+        if payload["stream"]:
+            reader = OllamaStreamReader(agent, container=container)
+            with closing(llm_client.stream_lines(OLLAMA_GENERATE_PATH, payload)) as lines:
+                for line in lines:
+                    if reader.feed(line):
+                        break  # Closing the stream drops the connection and ends the generation
+            response, complete = reader.finish(), reader.detector.complete
+        else:
+            result = llm_client.post_json(OLLAMA_GENERATE_PATH, payload)
+            response = result.get("response", "").strip()
+            complete = IncrementalJSONObject(container).feed(response)
+        if complete:
+            # Empty, prose-only or truncated replies are not pinned; errors below are never cached
+            llm_cache.put(key, response, MODEL_NAME)
+        return response
+
     except requests.exceptions.Timeout:
         print(f"⚠️  LLM Timeout ({MODEL_NAME}) - using fallback")
         return "Error: Timeout"
     except Exception as e:
         return f"Error: {str(e)}"
 
+async def _generate_async(payload: Dict[str, Any], agent: str, container: str = "object") -> str:
+    key = cache_key(payload)
+    cached = await llm_cache.aget(key)
+    if cached is not None:
+        return cached
+    return await async_llm_single_flight.do(key, lambda: _request_async(payload, key, agent, container))
+
+async def _request_async(payload: Dict[str, Any], key: str, agent: str, container: str) -> str:
+    try:
+        if payload["stream"]:
+            reader = OllamaStreamReader(agent, container=container)
+            lines = async_llm_client.stream_lines(OLLAMA_GENERATE_PATH, payload)
+            try:
+                async for line in lines:
+                    if reader.feed(line):
+                        break
+            finally:
+                await lines.aclose()
+            response, complete = reader.finish(), reader.detector.complete
+        else:
+            result = await async_llm_client.post_json(OLLAMA_GENERATE_PATH, payload)
+            response = result.get("response", "").strip()
+            complete = IncrementalJSONObject(container).feed(response)
+        if complete:
+            await llm_cache.aput(key, response, MODEL_NAME)
+        return response
+
+    except httpx.TimeoutException:
+        print(f"⚠️  LLM Timeout ({MODEL_NAME}) - using fallback")
+        return "Error: Timeout"
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+def _extract_json(response: str) -> Dict[str, Any]:
+    """Decode the JSON object of an LLM reply (bare or in a ``` fence)"""
+    if "```json" in response:
+        json_str = response.split("```json")[1].split("```")[0].strip()
+    elif "```" in response:
+        json_str = response.split("```")[1].split("```")[0].strip()
+    else:
+        json_str = response.strip()
+    return json.loads(json_str)
+
 
 # ---------------------------------------------------------
 # TRIAGE AGENT
 # ---------------------------------------------------------
 
-def triage_agent_raw(title: str, description: str) -> Dict[str, Any]:
-    """
-    TRIAGE AGENT - Hybrid (Raw Function)
-    """
-    text = f"{title} {description}"
-    
-    # 1. Rules
-    cat = rule_engine.classify_category(text)
-    pri = rule_engine.classify_priority(text, cat["category"])
-    
-    if cat["confidence"] >= 0.8 and pri["confidence"] >= 0.8:
-        # Map "General" to "Support" to match schema
-        dept = cat.get("department", "Support")
-        if dept == "General": dept = "Support"
-        
-        return {
-            "category": cat["category"],
-            "priority": pri["priority"],
-            "department": dept,
-            "reasoning": f"Rule match: {cat['method']} (Confidence: {cat['confidence']})"
-        }
-
-    # 2. LLM Fallback
-    system_prompt = """You are a ticket classifier. Respond ONLY with JSON:
+TRIAGE_SYSTEM_PROMPT = """You are a ticket classifier. Respond ONLY with JSON:
 {"category": "Billing|Technical|Access|Logistics|HR|Other", "priority": "Low|Medium|High", "department": "Finance|IT|Operations|Sales|HR|Support", "reasoning": "brief explanation"}"""
-    
-    user_prompt = f"Classify:\nTitle: {title}\nDescription: {description}"
-    
-    response = call_ollama(user_prompt, system=system_prompt)
-    
+
+def _triage_from_rules(context: AnalysisContext) -> Optional[Dict[str, Any]]:
+    """Rule triage when confident, else None (computed once per ticket via the context)"""
+    if not context.is_confident():
+        return None
+
+    cat = context.category()
+    pri = context.priority(cat["category"])
+
+    # Map "General" to "Support" to match schema
+    dept = cat.get("department", "Support")
+    if dept == "General": dept = "Support"
+
+    return {
+        "category": cat["category"],
+        "priority": pri["priority"],
+        "department": dept,
+        "reasoning": f"Rule match: {cat['method']} (Confidence: {cat['confidence']})",
+        "rule_version": cat["rule_version"]
+    }
+
+def _triage_prompt(title: str, description: str) -> str:
+    return f"Classify:\nTitle: {title}\nDescription: {description}"
+
+def _parse_triage(response: str) -> Dict[str, Any]:
     try:
-        if "```json" in response:
-            json_str = response.split("```json")[1].split("```")[0].strip()
-        elif "```" in response:
-             json_str = response.split("```")[1].split("```")[0].strip()
-        else:
-            json_str = response.strip()
-        
-        data = json.loads(json_str)
+        data = _extract_json(response)
 
         # SANITIZATION LAYER (Prevent Guardian Failures)
         allowed_cats = ["Billing", "Technical", "Access", "Logistics", "HR", "Other"]
@@ -93,7 +171,7 @@ def triage_agent_raw(title: str, description: str) -> Dict[str, Any]:
         # Ensure valid Category
         if data.get("category") not in allowed_cats:
             data["category"] = "Other"
-            
+
         # Ensure valid Department
         if data.get("department") not in allowed_depts:
             data["department"] = "Support"
@@ -101,13 +179,13 @@ def triage_agent_raw(title: str, description: str) -> Dict[str, Any]:
         # Ensure valid Priority
         if data.get("priority") not in allowed_pris:
             data["priority"] = "Medium"
-            
+
         # Ensure Reasoning length constraint (10-500 chars)
         reasoning = str(data.get("reasoning", "AI analysis provided."))
         if len(reasoning) < 10:
             reasoning += " (Automated classification)"
         data["reasoning"] = reasoning[:500]
-        
+
         return data
 
     except Exception as e:
@@ -118,7 +196,96 @@ def triage_agent_raw(title: str, description: str) -> Dict[str, Any]:
             "reasoning": f"LLM parsing failed: {str(e)}"
         }
 
-def triage_agent(title: str, description: str) -> Dict[str, Any]:
+# Micro-batched triage: concurrent LLM triages (ingest bursts) share one prompt
+TRIAGE_BATCHING = os.getenv("TRIAGE_BATCH_ENABLED", "false").lower() in ("1", "true", "yes")
+TRIAGE_BATCH_WINDOW_MS = float(os.getenv("TRIAGE_BATCH_WINDOW_MS", "50"))  # Wait for more tickets
+TRIAGE_BATCH_MAX_SIZE = int(os.getenv("TRIAGE_BATCH_MAX_SIZE", "8"))        # Flush when this many are pending
+TRIAGE_BATCH_DESCRIPTION_CHARS = 500
+
+TRIAGE_BATCH_SYSTEM_PROMPT = """You are a ticket classifier. Classify EVERY ticket. Respond ONLY with a JSON array, one object per ticket, in order:
+[{"id": 1, "category": "Billing|Technical|Access|Logistics|HR|Other", "priority": "Low|Medium|High", "department": "Finance|IT|Operations|Sales|HR|Support", "reasoning": "brief explanation"}]"""
+
+def _triage_batch_payload(items: List[Tuple[str, str]]) -> Dict[str, Any]:
+    prompt = "Classify each ticket:\n" + "\n".join(
+        f"[{i}] Title: {title}\nDescription: {(description or '')[:TRIAGE_BATCH_DESCRIPTION_CHARS]}"
+        for i, (title, description) in enumerate(items, start=1)
+    )
+    payload = _ollama_payload(prompt, TRIAGE_BATCH_SYSTEM_PROMPT)
+    # Room for one classification per ticket and the longer prompt
+    payload["options"] = {**payload["options"], "num_predict": 64 + 96 * len(items), "num_ctx": 4096}
+    return payload
+
+def _split_triage_batch(response: str, count: int) -> List[Optional[Dict[str, Any]]]:
+    """
+    Per-ticket results of a batch reply (matched by "id", else by position)
+    Entries that are missing or fail TriageOutput validation are None.
+    """
+    if response.startswith("Error:"):
+        raise RuntimeError(response)
+    detector = IncrementalJSONObject("array")
+    if not detector.feed(response):
+        raise ValueError("No JSON array in batch reply")
+
+    results: List[Optional[Dict[str, Any]]] = [None] * count
+    for position, entry in enumerate(detector.value):
+        if not isinstance(entry, dict):
+            continue
+        try:
+            index = int(entry.get("id", position + 1)) - 1
+            validated = TriageOutput.model_validate(entry)
+        except (TypeError, ValueError, ValidationError):
+            continue
+        if 0 <= index < count and results[index] is None:
+            results[index] = {
+                "category": validated.category,
+                "priority": validated.priority,
+                "department": validated.department,
+                "reasoning": validated.reasoning,
+                "method": "llm_batch"
+            }
+    return results
+
+async def _triage_batch(items: List[Tuple[str, str]]) -> List[Optional[Dict[str, Any]]]:
+    response = await _generate_async(_triage_batch_payload(items), "Triage Batch", container="array")
+    return _split_triage_batch(response, len(items))
+
+triage_batcher = MicroBatcher(_triage_batch, TRIAGE_BATCH_WINDOW_MS, TRIAGE_BATCH_MAX_SIZE)
+
+def triage_agent_raw(title: str, description: str, context: Optional[AnalysisContext] = None) -> Dict[str, Any]:
+    """
+    TRIAGE AGENT - Hybrid (Raw Function)
+    """
+    # 1. Rules (computed once per ticket, shared with the workflow, retries and other agents)
+    rule_result = _triage_from_rules(context or AnalysisContext(title, description))
+    if rule_result:
+        return rule_result
+
+    # 2. LLM Fallback
+    return _parse_triage(call_ollama(
+        _triage_prompt(title, description), system=TRIAGE_SYSTEM_PROMPT, agent="Triage Agent"
+    ))
+
+async def triage_agent_raw_async(
+    title: str,
+    description: str,
+    context: Optional[AnalysisContext] = None
+) -> Dict[str, Any]:
+    """TRIAGE AGENT - Hybrid, async LLM fallback (micro-batched when enabled)"""
+    rule_result = _triage_from_rules(context or AnalysisContext(title, description))
+    if rule_result:
+        return rule_result
+
+    if TRIAGE_BATCHING:
+        batched = await triage_batcher.submit((title, description))
+        if batched is not None:
+            return batched
+        # Alone in its window, or the batch could not classify it: single-ticket call
+
+    return _parse_triage(await call_ollama_async(
+        _triage_prompt(title, description), system=TRIAGE_SYSTEM_PROMPT, agent="Triage Agent"
+    ))
+
+def triage_agent(title: str, description: str, context: Optional[AnalysisContext] = None) -> Dict[str, Any]:
     """Triage Agent with Guardian validation"""
     return validate_with_guardian(
         triage_agent_raw,
@@ -126,7 +293,24 @@ def triage_agent(title: str, description: str) -> Dict[str, Any]:
         "Triage Agent",
         max_retries=2,
         title=title,
-        description=description
+        description=description,
+        context=context or AnalysisContext(title, description)
+    )
+
+async def triage_agent_async(
+    title: str,
+    description: str,
+    context: Optional[AnalysisContext] = None
+) -> Dict[str, Any]:
+    """Triage Agent with async Guardian validation"""
+    return await validate_with_guardian_async(
+        triage_agent_raw_async,
+        TriageOutput,
+        "Triage Agent",
+        max_retries=2,
+        title=title,
+        description=description,
+        context=context or AnalysisContext(title, description)
     )
 
 
@@ -134,14 +318,18 @@ def triage_agent(title: str, description: str) -> Dict[str, Any]:
 # COMPLIANCE AGENT
 # ---------------------------------------------------------
 
-def compliance_agent_raw(title: str, description: str, category: str = "General") -> Dict[str, Any]:
+def compliance_agent_raw(
+    title: str,
+    description: str,
+    category: str = "General",
+    context: Optional[AnalysisContext] = None
+) -> Dict[str, Any]:
     """
     COMPLIANCE AGENT - Rule based
     """
-    # Create ticket dict for rule engine
-    ticket = {"title": title, "description": description, "category": category}
-    result = rule_engine.check_compliance(ticket)
-    
+    context = context or AnalysisContext(title, description)
+    result = context.compliance(category)
+
     # Add 'recommendation' field required by schema
     if result["status"] == "Blocked":
         result["recommendation"] = "Reject processing immediately and notify security."
@@ -149,10 +337,15 @@ def compliance_agent_raw(title: str, description: str, category: str = "General"
         result["recommendation"] = "Request missing details from user."
     else:
         result["recommendation"] = "Proceed with standard workflow."
-        
+
     return result
 
-def compliance_agent(title: str, description: str, category: str = "General") -> Dict[str, Any]:
+def compliance_agent(
+    title: str,
+    description: str,
+    category: str = "General",
+    context: Optional[AnalysisContext] = None
+) -> Dict[str, Any]:
     """Compliance Agent with Guardian validation"""
     return validate_with_guardian(
         compliance_agent_raw,
@@ -161,7 +354,26 @@ def compliance_agent(title: str, description: str, category: str = "General") ->
         max_retries=1,
         title=title,
         description=description,
-        category=category
+        category=category,
+        context=context or AnalysisContext(title, description)
+    )
+
+async def compliance_agent_async(
+    title: str,
+    description: str,
+    category: str = "General",
+    context: Optional[AnalysisContext] = None
+) -> Dict[str, Any]:
+    """Compliance Agent with async Guardian validation (rules only - runs inline)"""
+    return await validate_with_guardian_async(
+        compliance_agent_raw,
+        ComplianceOutput,
+        "Compliance Agent",
+        max_retries=1,
+        title=title,
+        description=description,
+        category=category,
+        context=context or AnalysisContext(title, description)
     )
 
 
@@ -169,57 +381,87 @@ def compliance_agent(title: str, description: str, category: str = "General") ->
 # RISK AGENT
 # ---------------------------------------------------------
 
-def risk_agent_raw(title: str, description: str, priority: str) -> Dict[str, Any]:
-    """
-    RISK AGENT - Hybrid
-    """
-    ticket = {"title": title, "description": description}
-    triage = {"priority": priority}
-    
-    # 1. Rule calculation
-    risk = rule_engine.calculate_risk(ticket, triage)
-    
-    # 2. LLM if needed
-    if risk["needs_llm_review"]:
-        system_prompt = """Analyze business risk. Respond with JSON:
+RISK_SYSTEM_PROMPT = """Analyze business risk. Respond with JSON:
 {"impact_areas": ["area1", "area2"], "explanation": "why this is high risk"}"""
-        
-        user_prompt = f"Analyze HIGH RISK ticket:\nTitle: {title}\nDescription: {description[:200]}\nScore: {risk['risk_score']}"
-        
-        response = call_ollama(user_prompt, system=system_prompt)
-        try:
-            if "```json" in response:
-                json_str = response.split("```json")[1].split("```")[0].strip()
-            elif "```" in response:
-                json_str = response.split("```")[1].split("```")[0].strip()
-            else:
-                json_str = response.strip()
-            
-            llm_result = json.loads(json_str)
-            risk["impact_areas"] = llm_result.get("impact_areas", [])
-            risk["explanation"] = llm_result.get("explanation", "High risk detected")
-        except:
-             pass # Keep rule defaults
-            
+
+def _risk_prompt(title: str, description: str, risk: Dict[str, Any]) -> str:
+    return f"Analyze HIGH RISK ticket:\nTitle: {title}\nDescription: {description[:200]}\nScore: {risk['risk_score']}"
+
+def _apply_risk_review(risk: Dict[str, Any], response: str):
+    """Merge the LLM's impact areas/explanation into the rule risk"""
+    try:
+        llm_result = _extract_json(response)
+        risk["impact_areas"] = llm_result.get("impact_areas", [])
+        risk["explanation"] = llm_result.get("explanation", "High risk detected")
+    except:
+         pass # Keep rule defaults
+
+def _finalize_risk(risk: Dict[str, Any]) -> Dict[str, Any]:
     # Flatten output to match schema
     result = {
         "risk_score": risk["risk_score"],
         "risk_level": risk["risk_level"],
         "impact_areas": risk.get("impact_areas", ["General"]),
-        "explanation": risk.get("explanation", "Risk evaluated by rules")
+        "explanation": risk.get("explanation", "Risk evaluated by rules"),
+        "rule_version": risk.get("rule_version")
     }
-    
+
     # SANITIZATION
     if not result["impact_areas"]:
         result["impact_areas"] = ["General Business"]
-    
+
     expl = str(result.get("explanation", ""))
     if len(expl) < 10:
         result["explanation"] = expl + " (Automated risk score)"
-        
+
     return result
 
-def risk_agent(title: str, description: str, priority: str) -> Dict[str, Any]:
+def risk_agent_raw(
+    title: str,
+    description: str,
+    priority: str,
+    context: Optional[AnalysisContext] = None
+) -> Dict[str, Any]:
+    """
+    RISK AGENT - Hybrid
+    """
+    context = context or AnalysisContext(title, description)
+
+    # 1. Rule calculation
+    risk = context.risk(priority)
+
+    # 2. LLM if needed
+    if risk["needs_llm_review"]:
+        _apply_risk_review(risk, call_ollama(
+            _risk_prompt(title, description, risk), system=RISK_SYSTEM_PROMPT, agent="Risk Agent"
+        ))
+
+    return _finalize_risk(risk)
+
+async def risk_agent_raw_async(
+    title: str,
+    description: str,
+    priority: str,
+    context: Optional[AnalysisContext] = None
+) -> Dict[str, Any]:
+    """RISK AGENT - Hybrid, async LLM review"""
+    context = context or AnalysisContext(title, description)
+    risk = context.risk(priority)
+
+    if risk["needs_llm_review"]:
+        response = await call_ollama_async(
+            _risk_prompt(title, description, risk), system=RISK_SYSTEM_PROMPT, agent="Risk Agent"
+        )
+        _apply_risk_review(risk, response)
+
+    return _finalize_risk(risk)
+
+def risk_agent(
+    title: str,
+    description: str,
+    priority: str,
+    context: Optional[AnalysisContext] = None
+) -> Dict[str, Any]:
     """Risk Agent with Guardian validation"""
     return validate_with_guardian(
         risk_agent_raw,
@@ -228,5 +470,24 @@ def risk_agent(title: str, description: str, priority: str) -> Dict[str, Any]:
         max_retries=2,
         title=title,
         description=description,
-        priority=priority
+        priority=priority,
+        context=context or AnalysisContext(title, description)
+    )
+
+async def risk_agent_async(
+    title: str,
+    description: str,
+    priority: str,
+    context: Optional[AnalysisContext] = None
+) -> Dict[str, Any]:
+    """Risk Agent with async Guardian validation"""
+    return await validate_with_guardian_async(
+        risk_agent_raw_async,
+        RiskOutput,
+        "Risk Agent",
+        max_retries=2,
+        title=title,
+        description=description,
+        priority=priority,
+        context=context or AnalysisContext(title, description)
     )
@@ -0,0 +1,83 @@
+"""
+Promoted Analysis Columns
+Extracts the queryable fields of the ai_analysis JSON payload into typed Ticket columns,
+plus a backfill job for tickets analyzed before the columns existed
+"""
+
+import json
+import os
+from typing import Dict, Any, Optional
+from sqlmodel import Session, select
+from app.models import Ticket
+
+BACKFILL_BATCH_SIZE = int(os.getenv("ANALYSIS_BACKFILL_BATCH", "500"))
+
+
+def analysis_columns(analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Map a full analysis payload {"triage", "compliance", "risk"} to column values
+    """
+    triage = analysis.get("triage") or {}
+    compliance = analysis.get("compliance") or {}
+    risk = analysis.get("risk") or {}
+
+    risk_score: Optional[int] = None
+    try:
+        if risk.get("risk_score") is not None:
+            risk_score = int(risk["risk_score"])
+    except (TypeError, ValueError):
+        risk_score = None
+
+    llm_used = triage.get("llm_used")
+    return {
+        "risk_score": risk_score,
+        "risk_level": risk.get("risk_level"),
+        "compliance_status": compliance.get("status"),
+        "llm_used": bool(llm_used) if llm_used is not None else None
+    }
+
+
+def backfill_analysis_columns(engine=None, batch_size: int = BACKFILL_BATCH_SIZE) -> Dict[str, int]:
+    """
+    Populate promoted columns for analyzed tickets that predate them
+    Walks by id in small batches so each write transaction stays short.
+    """
+    if engine is None:
+        from app.database import engine
+
+    updated = 0
+    skipped = 0
+    last_id = 0
+
+    while True:
+        with Session(engine) as session:
+            tickets = session.exec(
+                select(Ticket)
+                .where(Ticket.id > last_id)
+                .where(Ticket.ai_analysis.is_not(None))
+                .where(Ticket.compliance_status.is_(None))
+                .where(Ticket.risk_score.is_(None))
+                .order_by(Ticket.id)
+                .limit(batch_size)
+            ).all()
+
+            if not tickets:
+                break
+
+            for ticket in tickets:
+                last_id = ticket.id
+                try:
+                    columns = analysis_columns(json.loads(ticket.ai_analysis))
+                except (TypeError, ValueError, AttributeError):
+                    skipped += 1
+                    continue
+                for name, value in columns.items():
+                    setattr(ticket, name, value)
+                session.add(ticket)
+                updated += 1
+
+            session.commit()
+
+    if updated or skipped:
+        print(f"🛠️  Analysis backfill: {updated} tickets updated, {skipped} unparseable")
+    return {"updated": updated, "skipped": skipped}
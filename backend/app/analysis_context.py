@@ -0,0 +1,78 @@
+"""
+Analysis Context - Per-Ticket Rule State
+Holds the normalized ticket text and every rule result of one analysis,
+so the workflow, the agents and Guardian retries compute each of them once
+"""
+
+import copy
+import threading
+from typing import Dict, Any, Callable, Optional, Tuple
+from app.rules import rule_engine, RuleEngine, RuleHits
+
+
+class AnalysisContext:
+    """
+    Lazily computed, memoized rule results for one ticket
+    Results are keyed by their inputs (compliance depends on the category the
+    triage settled on, risk on the priority), so an LLM override still gets
+    a fresh rule result. Safe to share between the parallel agent threads;
+    callers receive copies and may modify them.
+    """
+
+    def __init__(self, title: str, description: str, engine: Optional[RuleEngine] = None):
+        self.title = title or ""
+        self.description = description or ""
+        self.text = f"{self.title} {self.description}"
+        self._engine = engine or rule_engine
+        self._lock = threading.Lock()
+        self._hits: Optional[RuleHits] = None
+        self._results: Dict[Tuple[str, Any], Dict[str, Any]] = {}
+        self.computed = 0  # Rule evaluations actually run (the rest were reused)
+
+    @property
+    def hits(self) -> RuleHits:
+        """The single scan of title + description"""
+        with self._lock:
+            if self._hits is None:
+                self._hits = self._engine.scan_ticket(self.title, self.description)
+            return self._hits
+
+    @property
+    def rule_version(self) -> str:
+        return self.hits.rule_set.version
+
+    def _memo(self, key: Tuple[str, Any], compute: Callable[[RuleHits], Dict[str, Any]]) -> Dict[str, Any]:
+        hits = self.hits
+        with self._lock:
+            if key not in self._results:
+                self._results[key] = compute(hits)
+                self.computed += 1
+            return copy.deepcopy(self._results[key])
+
+    def category(self) -> Dict[str, Any]:
+        return self._memo(("category", None), lambda hits: self._engine.classify_category(self.text, hits=hits))
+
+    def priority(self, category: Optional[str] = None) -> Dict[str, Any]:
+        """Priority given a category (defaults to the rule category)"""
+        if category is None:
+            category = self.category()["category"]
+        return self._memo(
+            ("priority", category),
+            lambda hits: self._engine.classify_priority(self.text, category, hits=hits)
+        )
+
+    def is_confident(self) -> bool:
+        """Whether the rule triage is strong enough to skip the LLM"""
+        category = self.category()
+        return self._engine.is_confident(category, self.priority(category["category"]))
+
+    def compliance(self, category: str) -> Dict[str, Any]:
+        ticket = {"title": self.title, "description": self.description, "category": category}
+        return self._memo(("compliance", category), lambda hits: self._engine.check_compliance(ticket, hits=hits))
+
+    def risk(self, priority: str) -> Dict[str, Any]:
+        ticket = {"title": self.title, "description": self.description}
+        return self._memo(
+            ("risk", priority),
+            lambda hits: self._engine.calculate_risk(ticket, {"priority": priority}, hits=hits)
+        )
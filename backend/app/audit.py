@@ -1,13 +1,31 @@
 """
 Audit Service - Persistent Event Logging
 Writes all events to database for compliance
+Event listeners go through a buffered sink that batches inserts
 """
 
-from sqlmodel import Session
+from sqlalchemy import insert, tuple_
+from sqlmodel import Session, select
 from app.models import AuditLog
 from app.event_bus import event_bus
 from datetime import datetime
+from collections import deque
+from typing import Dict, Any, List, Optional, Tuple
 import json
+import os
+import threading
+import time
+
+# Sink tuning (override via environment)
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "100"))            # Flush after N entries...
+AUDIT_FLUSH_INTERVAL_MS = int(os.getenv("AUDIT_FLUSH_INTERVAL_MS", "250"))  # ...or after T ms
+AUDIT_MAX_BUFFER = int(os.getenv("AUDIT_MAX_BUFFER", "10000"))          # Entries beyond this are dropped
+
+# Rows per INSERT statement (stays well under SQLite's bound-parameter limit)
+ROWS_PER_STATEMENT = 500
+
+# Longest wait between retries while writes keep failing (database down or locked)
+MAX_RETRY_BACKOFF_S = 30.0
 
 
 def log_audit_event(
@@ -36,17 +54,9 @@ def log_audit_event(
         duration_ms: Execution time
     """
     
-    log_entry = AuditLog(
-        event_type=event_type,
-        event_category=category,
-        ticket_id=ticket_id,
-        actor=actor,
-        description=description,
-        metadata_json=json.dumps(metadata) if metadata else None,
-        status=status,
-        created_at=datetime.utcnow(),
-        duration_ms=duration_ms
-    )
+    log_entry = AuditLog(**build_audit_entry(
+        event_type, category, ticket_id, actor, description, metadata, status, duration_ms
+    ))
     
     session.add(log_entry)
     session.commit()
@@ -54,6 +64,256 @@ def log_audit_event(
     print(f"📝 Audit logged: {event_type} - {description}")
 
 
+def build_audit_entry(
+    event_type: str,
+    category: str,
+    ticket_id: int = None,
+    actor: str = "System",
+    description: str = "",
+    metadata: dict = None,
+    status: str = "SUCCESS",
+    duration_ms: int = None
+) -> Dict[str, Any]:
+    """AuditLog column values for one event (timestamped now, not at flush time)"""
+    return {
+        "event_type": event_type,
+        "event_category": category,
+        "ticket_id": ticket_id,
+        "actor": actor,
+        "description": description,
+        "metadata_json": json.dumps(metadata) if metadata else None,
+        "status": status,
+        "created_at": datetime.utcnow(),
+        "duration_ms": duration_ms
+    }
+
+
+def build_audit_log_query(
+    ticket_id: int = None,
+    event_type: str = None,
+    actor: str = None,
+    status: str = None,
+    start: datetime = None,
+    end: datetime = None,
+    cursor: Optional[Tuple[datetime, int]] = None,
+    limit: int = 50
+):
+    """
+    Newest-first AuditLog page (keyset on created_at, id)
+    ticket_id / event_type filters are served by their (column, created_at) composites,
+    everything else walks the created_at index.
+    """
+    query = select(AuditLog)
+
+    if ticket_id is not None:
+        query = query.where(AuditLog.ticket_id == ticket_id)
+    if event_type:
+        query = query.where(AuditLog.event_type == event_type)
+    if actor:
+        query = query.where(AuditLog.actor == actor)
+    if status:
+        query = query.where(AuditLog.status == status)
+    if start:
+        query = query.where(AuditLog.created_at >= start)
+    if end:
+        query = query.where(AuditLog.created_at < end)
+    if cursor:
+        query = query.where(tuple_(AuditLog.created_at, AuditLog.id) < cursor)
+
+    return query.order_by(AuditLog.created_at.desc(), AuditLog.id.desc()).limit(limit)
+
+
+# ============================================================================
+# Buffered Audit Sink
+# ============================================================================
+
+class AuditSink:
+    """
+    Buffers audit entries in memory and writes them in multi-row INSERTs
+    A batch is flushed every AUDIT_BATCH_SIZE entries or AUDIT_FLUSH_INTERVAL_MS,
+    so N events cost one transaction (one fsync) instead of N.
+    """
+
+    def __init__(
+        self,
+        engine=None,
+        batch_size: int = AUDIT_BATCH_SIZE,
+        flush_interval_ms: int = AUDIT_FLUSH_INTERVAL_MS,
+        max_buffer: int = AUDIT_MAX_BUFFER
+    ):
+        self._engine = engine
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_buffer = max_buffer
+
+        self._buffer: deque = deque()
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._thread = None
+        self._stopping = False
+
+        self._counters = {
+            "submitted": 0,
+            "written": 0,
+            "dropped": 0,
+            "delayed": 0,
+            "batches": 0,
+            "write_failures": 0,
+            "max_latency_ms": 0.0
+        }
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            from app.database import engine
+            self._engine = engine
+        return self._engine
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the background flusher thread"""
+        with self._cond:
+            if self.running:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="audit-sink", daemon=True)
+            self._thread.start()
+        print(f"📝 Audit sink started (batch={self.batch_size}, interval={int(self.flush_interval * 1000)}ms)")
+
+    def stop(self):
+        """Stop the flusher and write everything still buffered"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def submit(self, entry: Dict[str, Any]) -> bool:
+        """
+        Queue one entry (see build_audit_entry)
+        Returns False if the buffer is full and the entry was dropped.
+        Without a running flusher (scripts, tests) the entry is written immediately.
+        """
+        with self._cond:
+            if len(self._buffer) >= self.max_buffer:
+                self._counters["dropped"] += 1
+                return False
+            self._buffer.append((time.monotonic(), entry))
+            self._counters["submitted"] += 1
+            if len(self._buffer) >= self.batch_size:
+                self._cond.notify()
+
+        if not self.running:
+            self.flush()
+        return True
+
+    def submit_many(self, entries: List[Dict[str, Any]]) -> int:
+        """
+        Queue several entries under one lock acquisition
+        Returns how many were accepted (the rest are dropped when the buffer is full).
+        """
+        queued_at = time.monotonic()
+        with self._cond:
+            room = max(0, self.max_buffer - len(self._buffer))
+            accepted = entries[:room]
+            self._buffer.extend((queued_at, entry) for entry in accepted)
+            self._counters["submitted"] += len(accepted)
+            self._counters["dropped"] += len(entries) - len(accepted)
+            if len(self._buffer) >= self.batch_size:
+                self._cond.notify()
+
+        if not self.running:
+            self.flush()
+        return len(accepted)
+
+    def flush(self, force: bool = True) -> int:
+        """
+        Write buffered entries; returns the number written
+        With force=False only full batches, plus a partial batch whose oldest
+        entry has waited at least the flush interval, are written.
+        """
+        written = 0
+        while True:
+            with self._cond:
+                if not self._buffer:
+                    return written
+                oldest_age = time.monotonic() - self._buffer[0][0]
+                if not force and len(self._buffer) < self.batch_size and oldest_age < self.flush_interval:
+                    return written
+                batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+            if not self._write(batch):
+                return written
+            written += len(batch)
+
+    def _run(self):
+        backoff = 0.0
+        while True:
+            with self._cond:
+                if backoff:
+                    # A failed write put the batch back: wait before retrying instead of spinning on a full buffer
+                    self._cond.wait_for(lambda: self._stopping, timeout=backoff)
+                elif not self._stopping and len(self._buffer) < self.batch_size:
+                    self._cond.wait(timeout=self.flush_interval)
+                if self._stopping:
+                    return
+                failures = self._counters["write_failures"]
+            self.flush(force=False)
+            with self._cond:
+                failed = self._counters["write_failures"] > failures
+            # Double the wait per consecutive failure, up to MAX_RETRY_BACKOFF_S
+            backoff = min(max(backoff * 2, self.flush_interval), MAX_RETRY_BACKOFF_S) if failed else 0.0
+
+    def _write(self, batch: List) -> bool:
+        rows = [entry for _, entry in batch]
+        try:
+            with self._write_lock, Session(self.engine) as session:
+                for i in range(0, len(rows), ROWS_PER_STATEMENT):
+                    session.execute(insert(AuditLog).values(rows[i:i + ROWS_PER_STATEMENT]))
+                session.commit()
+        except Exception as e:
+            print(f"   ❌ Audit sink flush failed ({len(rows)} entries): {e}")
+            with self._cond:
+                self._counters["write_failures"] += 1
+                # Put the batch back (oldest first) if there is room, otherwise drop it
+                room = self.max_buffer - len(self._buffer)
+                self._buffer.extendleft(reversed(batch[:room]))
+                self._counters["dropped"] += max(0, len(batch) - room)
+            return False
+
+        now = time.monotonic()
+        latencies = [now - queued_at for queued_at, _ in batch]
+        with self._cond:
+            self._counters["written"] += len(rows)
+            self._counters["batches"] += 1
+            self._counters["delayed"] += sum(1 for lat in latencies if lat > self.flush_interval * 2)
+            self._counters["max_latency_ms"] = max(self._counters["max_latency_ms"], max(latencies) * 1000)
+
+        print(f"📝 Audit sink flushed {len(rows)} entries")
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters plus current buffer depth"""
+        with self._cond:
+            stats = dict(self._counters)
+            stats["buffered"] = len(self._buffer)
+        stats["max_latency_ms"] = round(stats["max_latency_ms"], 1)
+        stats["running"] = self.running
+        stats["config"] = {
+            "batch_size": self.batch_size,
+            "flush_interval_ms": int(self.flush_interval * 1000),
+            "max_buffer": self.max_buffer
+        }
+        return stats
+
+
+audit_sink = AuditSink()
+
+
 # ============================================================================
 # Event Listeners (Auto-triggered by event bus)
 # ============================================================================
@@ -65,57 +325,60 @@ def get_db_session():
 def audit_ticket_created(data: dict):
     """Listener for TICKET_CREATED events"""
     print(f"   🎧 Audit listener: TICKET_CREATED")
-    try:
-        with get_db_session() as session:
-            log_audit_event(
-                session=session,
-                event_type="TICKET_CREATED",
-                category="USER_ACTION",
-                ticket_id=data.get("ticket_id"),
-                actor=data.get("created_by", "User"),
-                description=f"New ticket created: {data.get('title')}",
-                metadata=data
-            )
-    except Exception as e:
-        print(f"   ❌ Failed to persist audit log: {e}")
+    audit_sink.submit(build_audit_entry(
+        event_type="TICKET_CREATED",
+        category="USER_ACTION",
+        ticket_id=data.get("ticket_id"),
+        actor=data.get("created_by", "User"),
+        description=f"New ticket created: {data.get('title')}",
+        metadata=data
+    ))
+
+def audit_tickets_bulk_created(data: dict):
+    """Listener for TICKETS_BULK_CREATED events (one TICKET_CREATED entry per ticket)"""
+    tickets = data.get("tickets", [])
+    print(f"   🎧 Audit listener: TICKETS_BULK_CREATED ({len(tickets)} tickets)")
+    actor = data.get("created_by", "Bulk-Import")
+    audit_sink.submit_many([
+        build_audit_entry(
+            event_type="TICKET_CREATED",
+            category="USER_ACTION",
+            ticket_id=ticket.get("ticket_id"),
+            actor=actor,
+            description=f"New ticket created: {ticket.get('title')}",
+            metadata=ticket
+        )
+        for ticket in tickets
+    ])
 
 def audit_ai_analysis_complete(data: dict):
     """Listener for AI_ANALYSIS_COMPLETE events"""
     print(f"   🎧 Audit listener: AI_ANALYSIS_COMPLETE")
-    try:
-        with get_db_session() as session:
-            log_audit_event(
-                session=session,
-                event_type="AI_ANALYZED",
-                category="AI_ACTION",
-                ticket_id=data.get("ticket_id"),
-                actor="AI-Agent-Swarm",
-                description=f"AI Analysis completed in {data.get('execution_time_seconds')}s",
-                metadata=data,
-                duration_ms=int(data.get("execution_time_seconds", 0) * 1000)
-            )
-    except Exception as e:
-         print(f"   ❌ Failed to persist audit log: {e}")
+    audit_sink.submit(build_audit_entry(
+        event_type="AI_ANALYZED",
+        category="AI_ACTION",
+        ticket_id=data.get("ticket_id"),
+        actor="AI-Agent-Swarm",
+        description=f"AI Analysis completed in {data.get('execution_time_seconds')}s",
+        metadata=data,
+        duration_ms=int(data.get("execution_time_seconds", 0) * 1000)
+    ))
 
 def audit_ticket_closed(data: dict):
     """Listener for TICKET_CLOSED events"""
     print(f"   🎧 Audit listener: TICKET_CLOSED")
-    try:
-        with get_db_session() as session:
-            log_audit_event(
-                session=session,
-                event_type="TICKET_CLOSED",
-                category="SYSTEM_ACTION",
-                ticket_id=data.get("ticket_id"),
-                actor="RPA-Bot",
-                description=f"Ticket closed and PDF report generated: {data.get('pdf_filename')}",
-                metadata=data
-            )
-    except Exception as e:
-         print(f"   ❌ Failed to persist audit log: {e}")
+    audit_sink.submit(build_audit_entry(
+        event_type="TICKET_CLOSED",
+        category="SYSTEM_ACTION",
+        ticket_id=data.get("ticket_id"),
+        actor="RPA-Bot",
+        description=f"Ticket closed and PDF report generated: {data.get('pdf_filename')}",
+        metadata=data
+    ))
 
 
 # Register listeners at module load
 event_bus.on("TICKET_CREATED", audit_ticket_created)
+event_bus.on("TICKETS_BULK_CREATED", audit_tickets_bulk_created)
 event_bus.on("AI_ANALYSIS_COMPLETE", audit_ai_analysis_complete)
 event_bus.on("TICKET_CLOSED", audit_ticket_closed)
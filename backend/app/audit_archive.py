@@ -0,0 +1,220 @@
+"""
+Audit Archive - Retention Tiers for AuditLog
+Hot tier: the last AUDIT_HOT_RETENTION_DAYS days stay in SQLite.
+Cold tier: older rows are appended to per-day gzip JSONL files and deleted from SQLite.
+"""
+
+import gzip
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Callable
+from sqlalchemy import func
+from sqlmodel import Session, select, delete
+from app.models import AuditLog
+
+AUDIT_HOT_RETENTION_DAYS = int(os.getenv("AUDIT_HOT_RETENTION_DAYS", "30"))
+AUDIT_ARCHIVE_DIR = os.getenv("AUDIT_ARCHIVE_DIR", "app/audit_archive")
+AUDIT_ARCHIVE_BATCH = int(os.getenv("AUDIT_ARCHIVE_BATCH", "1000"))               # Rows moved per transaction
+AUDIT_ARCHIVE_INTERVAL_SECONDS = int(os.getenv("AUDIT_ARCHIVE_INTERVAL_SECONDS", "3600"))
+
+ARCHIVE_PREFIX = "audit-"
+ARCHIVE_SUFFIX = ".jsonl.gz"
+
+ARCHIVED_FIELDS = [
+    "id", "event_type", "event_category", "ticket_id", "actor", "description",
+    "metadata_json", "status", "created_at", "duration_ms"
+]
+
+
+def row_to_archive_record(log: AuditLog) -> Dict[str, Any]:
+    record = {field: getattr(log, field) for field in ARCHIVED_FIELDS}
+    record["created_at"] = log.created_at.isoformat()
+    return record
+
+
+class AuditArchiver:
+    """
+    Moves old AuditLog rows to append-only compressed files and reads them back
+    Each chunk is: read rows (no write lock) -> append + fsync files -> delete ids
+    (one short write transaction). A crash between append and delete only leaves
+    duplicate records, which readers drop by id.
+
+    The row holding MAX(id) is never deleted: SQLite reuses rowids once a table
+    is empty, which would collide with archived ids.
+    """
+
+    def __init__(
+        self,
+        engine=None,
+        archive_dir: str = AUDIT_ARCHIVE_DIR,
+        retention_days: int = AUDIT_HOT_RETENTION_DAYS,
+        batch_size: int = AUDIT_ARCHIVE_BATCH
+    ):
+        self._engine = engine
+        self.archive_dir = archive_dir
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self._lock = threading.Lock()  # One archival run at a time
+        self.last_run: Optional[Dict[str, Any]] = None
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            from app.database import engine
+            self._engine = engine
+        return self._engine
+
+    def hot_cutoff(self, now: datetime = None) -> datetime:
+        """Rows created before this moment belong to the archive tier"""
+        return (now or datetime.utcnow()) - timedelta(days=self.retention_days)
+
+    def _path_for_day(self, day: str) -> str:
+        return os.path.join(self.archive_dir, f"{ARCHIVE_PREFIX}{day}{ARCHIVE_SUFFIX}")
+
+    def archived_days(self) -> List[str]:
+        """Days (YYYY-MM-DD) that have an archive file, oldest first"""
+        if not os.path.isdir(self.archive_dir):
+            return []
+        days = [
+            name[len(ARCHIVE_PREFIX):-len(ARCHIVE_SUFFIX)]
+            for name in os.listdir(self.archive_dir)
+            if name.startswith(ARCHIVE_PREFIX) and name.endswith(ARCHIVE_SUFFIX)
+        ]
+        return sorted(days)
+
+    # ------------------------------------------------------------------
+    # Archival
+    # ------------------------------------------------------------------
+
+    def archive_once(self, now: datetime = None) -> Dict[str, Any]:
+        """Move every row older than the hot cutoff to the archive; returns a summary"""
+        if not self._lock.acquire(blocking=False):
+            return {"status": "skipped", "reason": "archival already running"}
+
+        try:
+            cutoff = self.hot_cutoff(now)
+            os.makedirs(self.archive_dir, exist_ok=True)
+            archived = 0
+            chunks = 0
+
+            with Session(self.engine) as session:
+                max_id = session.exec(select(func.max(AuditLog.id))).one()
+
+            while True:
+                with Session(self.engine) as session:
+                    logs = session.exec(
+                        select(AuditLog)
+                        .where(AuditLog.created_at < cutoff)
+                        .where(AuditLog.id != max_id)
+                        .order_by(AuditLog.created_at)
+                        .limit(self.batch_size)
+                    ).all()
+                    records = [row_to_archive_record(log) for log in logs]
+
+                if not records:
+                    break
+
+                self._append(records)
+
+                with Session(self.engine) as session:
+                    session.exec(delete(AuditLog).where(AuditLog.id.in_([r["id"] for r in records])))
+                    session.commit()
+
+                archived += len(records)
+                chunks += 1
+
+            self.last_run = {
+                "status": "ok",
+                "cutoff": cutoff.isoformat(),
+                "archived": archived,
+                "chunks": chunks,
+                "finished_at": datetime.utcnow().isoformat()
+            }
+            if archived:
+                print(f"🗄️  Audit archive: moved {archived} entries older than {cutoff:%Y-%m-%d} ({chunks} chunks)")
+            return self.last_run
+        finally:
+            self._lock.release()
+
+    def _append(self, records: List[Dict[str, Any]]):
+        """Append records to their day files (new gzip member per append), fsynced"""
+        by_day: Dict[str, List[Dict[str, Any]]] = {}
+        for record in records:
+            by_day.setdefault(record["created_at"][:10], []).append(record)
+
+        for day, day_records in by_day.items():
+            payload = "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in day_records)
+            with open(self._path_for_day(day), "ab") as raw:
+                with gzip.GzipFile(fileobj=raw, mode="ab") as gz:
+                    gz.write(payload.encode())
+                raw.flush()
+                os.fsync(raw.fileno())
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def read(
+        self,
+        start: datetime = None,
+        end: datetime = None,
+        limit: int = 50,
+        predicate: Callable[[Dict[str, Any]], bool] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Newest-first archived records in [start, end), up to limit
+        Only day files overlapping the range are opened.
+        """
+        first_day = start.strftime("%Y-%m-%d") if start else None
+        last_day = end.strftime("%Y-%m-%d") if end else None
+        start_iso = start.isoformat() if start else None
+        end_iso = end.isoformat() if end else None
+
+        results: List[Dict[str, Any]] = []
+        seen_ids = set()
+
+        for day in reversed(self.archived_days()):
+            if last_day and day > last_day:
+                continue
+            if first_day and day < first_day:
+                break
+
+            with gzip.open(self._path_for_day(day), "rt") as f:
+                day_records = [json.loads(line) for line in f if line.strip()]
+
+            day_records.sort(key=lambda r: (r["created_at"], r["id"]), reverse=True)
+            for record in day_records:
+                if record["id"] in seen_ids:
+                    continue
+                if start_iso and record["created_at"] < start_iso:
+                    continue
+                if end_iso and record["created_at"] >= end_iso:
+                    continue
+                if predicate and not predicate(record):
+                    continue
+                seen_ids.add(record["id"])
+                results.append(record)
+
+            if len(results) >= limit:
+                break
+
+        return results[:limit]
+
+    def stats(self) -> Dict[str, Any]:
+        days = self.archived_days()
+        size = sum(os.path.getsize(self._path_for_day(d)) for d in days)
+        return {
+            "hot_retention_days": self.retention_days,
+            "hot_cutoff": self.hot_cutoff().isoformat(),
+            "archive_dir": self.archive_dir,
+            "archived_days": len(days),
+            "oldest_day": days[0] if days else None,
+            "newest_day": days[-1] if days else None,
+            "archive_bytes": size,
+            "last_run": self.last_run
+        }
+
+
+audit_archiver = AuditArchiver()
@@ -100,6 +100,7 @@ def close_ticket_workflow(ticket_id: int, session) -> Dict[str, Any]:
         return {"status": "error", "message": "Ticket not found"}
 
     # 1. Update Status
+    previous_status = ticket.status
     ticket.status = "Closed"
     session.add(ticket)
     session.commit()
@@ -127,6 +128,7 @@ def close_ticket_workflow(ticket_id: int, session) -> Dict[str, Any]:
     return {
         "status": "success",
         "ticket_id": ticket.id,
+        "previous_status": previous_status,
         "pdf_filename": pdf_filename,
         "pdf_url": pdf_url,
         "actions_completed": actions
@@ -0,0 +1,158 @@
+"""
+Bulk Ticket Ingestion
+Parses JSON array / NDJSON payloads, inserts all tickets in one transaction
+(multi-row INSERT ... RETURNING), emits a single batched creation event and
+runs the AI analyses with bounded concurrency
+"""
+
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Callable, Tuple, Awaitable
+from sqlalchemy import insert
+from sqlmodel import Session
+from app.models import Ticket
+from app.event_bus import event_bus
+
+BULK_MAX_TICKETS = int(os.getenv("BULK_MAX_TICKETS", "10000"))                   # Per request
+BULK_ROWS_PER_STATEMENT = int(os.getenv("BULK_ROWS_PER_STATEMENT", "500"))       # Under SQLite's parameter limit
+BULK_ANALYSIS_CONCURRENCY = int(os.getenv("BULK_ANALYSIS_CONCURRENCY", "4"))     # Parallel workflow runs
+
+# Client-settable fields (AI fields and ids are always server-side)
+BULK_FIELDS = ("title", "description", "status", "priority", "category", "department")
+REQUIRED_FIELDS = ("title", "description")
+
+
+def parse_bulk_payload(body: bytes, content_type: str = "") -> List[Dict[str, Any]]:
+    """
+    Decode a JSON array or an NDJSON stream (one ticket object per line)
+    NDJSON is used when the content type says so or the body is not an array.
+
+    Raises:
+        ValueError: If the payload cannot be decoded
+    """
+    text = body.decode("utf-8").strip()
+    if not text:
+        return []
+
+    if "ndjson" not in content_type and text.startswith("["):
+        try:
+            records = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON array: {e}") from e
+        if not isinstance(records, list):
+            raise ValueError("Expected a JSON array of tickets")
+        return records
+
+    records = []
+    for line_no, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid NDJSON on line {line_no}: {e}") from e
+    return records
+
+
+def validate_tickets(records: List[Any]) -> List[Dict[str, Any]]:
+    """
+    Turn raw records into insertable column dicts (defaults applied)
+
+    Raises:
+        ValueError: On the first invalid record (nothing is inserted)
+    """
+    now = datetime.utcnow()
+    rows = []
+    for i, record in enumerate(records):
+        if not isinstance(record, dict):
+            raise ValueError(f"Ticket #{i} is not an object")
+        for field in REQUIRED_FIELDS:
+            if not isinstance(record.get(field), str) or not record[field].strip():
+                raise ValueError(f"Ticket #{i}: '{field}' is required")
+        for field in BULK_FIELDS:
+            if record.get(field) is not None and not isinstance(record[field], str):
+                raise ValueError(f"Ticket #{i}: '{field}' must be a string")
+
+        row = {
+            "title": record["title"],
+            "description": record["description"],
+            "status": record.get("status") or "New",
+            "priority": record.get("priority") or "Medium",
+            "category": record.get("category"),
+            "department": record.get("department"),
+            "created_at": now
+        }
+        rows.append(row)
+    return rows
+
+
+def insert_tickets(engine, rows: List[Dict[str, Any]]) -> List[int]:
+    """Insert every row in a single transaction; returns the new ids in input order"""
+    ids: List[int] = []
+    with Session(engine) as session:
+        for i in range(0, len(rows), BULK_ROWS_PER_STATEMENT):
+            chunk = rows[i:i + BULK_ROWS_PER_STATEMENT]
+            result = session.execute(insert(Ticket).values(chunk).returning(Ticket.id))
+            # SQLite assigns rowids in VALUES order within one statement
+            ids.extend(sorted(row[0] for row in result))
+        session.commit()
+    return ids
+
+
+def ingest_tickets(engine, rows: List[Dict[str, Any]], created_by: str = "Bulk-Import") -> Dict[str, Any]:
+    """
+    Insert tickets and emit one TICKETS_BULK_CREATED event
+    Returns the ids plus timing for the throughput report.
+    """
+    start = time.perf_counter()
+    ids = insert_tickets(engine, rows)
+    insert_seconds = time.perf_counter() - start
+
+    event_bus.emit("TICKETS_BULK_CREATED", {
+        "count": len(ids),
+        "created_by": created_by,
+        "tickets": [
+            {
+                "ticket_id": ticket_id,
+                "title": row["title"],
+                "priority": row["priority"],
+                "status": row["status"],
+                "category": row["category"],
+                "department": row["department"],
+                "ai_priority": None,
+                "created_at": row["created_at"].isoformat()
+            }
+            for ticket_id, row in zip(ids, rows)
+        ]
+    })
+    total_seconds = time.perf_counter() - start
+
+    return {
+        "ids": ids,
+        "insert_seconds": insert_seconds,
+        "total_seconds": total_seconds
+    }
+
+
+async def run_analysis_batch_async(
+    items: List[Tuple[int, str, str]],
+    worker: Callable[[int, str, str], Awaitable[Any]],
+    concurrency: int = BULK_ANALYSIS_CONCURRENCY
+):
+    """
+    Await worker(ticket_id, title, description) for every item, at most
+    `concurrency` at a time (keeps a burst from flooding the LLM backend)
+    """
+    if not items:
+        return
+    print(f"🧵 Bulk analysis: {len(items)} tickets, concurrency={concurrency}")
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(item):
+        async with semaphore:
+            await worker(*item)
+
+    await asyncio.gather(*(run(item) for item in items))
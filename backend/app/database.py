@@ -1,13 +1,333 @@
+"""
+Database Layer - Shared Engines
+One process-wide, pooled engine used by requests, background workflows and audit listeners,
+plus an async (aiosqlite) engine over the same database for non-blocking endpoints
+"""
+
+import os
+import re
+import threading
+import time
+from typing import Dict, Any
+from sqlalchemy import event, inspect
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
 from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+sqlite_file_name = os.getenv("DATABASE_FILE", "database.db")
+sqlite_url = os.getenv("DATABASE_URL", f"sqlite:///{sqlite_file_name}")
+async_sqlite_url = os.getenv("ASYNC_DATABASE_URL", sqlite_url.replace("sqlite://", "sqlite+aiosqlite://", 1))
+
+# Pool sizing (override via environment to tune for the deployment)
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "-1"))
+
+# SQL echo is noisy and slow - only enable explicitly for debugging
+SQL_ECHO = os.getenv("DB_ECHO", "false").lower() in ("1", "true", "yes")
+
+# SQLite storage profiles (PRAGMAs applied on every new connection)
+# "legacy" keeps SQLite defaults (rollback journal, synchronous=FULL)
+SQLITE_PROFILES = {
+    "legacy": {},
+    "performance": {
+        "journal_mode": "WAL",        # Readers no longer block on the writer
+        "synchronous": "NORMAL",      # Safe with WAL, far fewer fsyncs
+        "busy_timeout": 5000,         # ms to wait on a locked database before failing
+        "cache_size": -64000,         # Negative = KiB (64 MB page cache)
+        "mmap_size": 268435456,       # 256 MB memory-mapped I/O
+        "temp_store": "MEMORY"        # Temp tables/indices in RAM
+    }
+}
+
+# Per-pragma overrides (env var -> pragma)
+_PRAGMA_ENV_OVERRIDES = {
+    "DB_JOURNAL_MODE": "journal_mode",
+    "DB_SYNCHRONOUS": "synchronous",
+    "DB_BUSY_TIMEOUT_MS": "busy_timeout",
+    "DB_CACHE_SIZE": "cache_size",
+    "DB_MMAP_SIZE": "mmap_size",
+    "DB_TEMP_STORE": "temp_store"
+}
+
+_PRAGMA_VALUE = re.compile(r'^-?\w+$')
+
+
+def get_storage_profile(name: str = None) -> Dict[str, Any]:
+    """
+    Resolve the PRAGMA set for a profile (DB_PROFILE, default "performance")
+    Individual DB_* overrides are applied on top of the named profile
+    """
+    name = name or os.getenv("DB_PROFILE", "performance")
+    if name not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown DB_PROFILE '{name}' (expected one of {list(SQLITE_PROFILES)})")
+
+    pragmas = dict(SQLITE_PROFILES[name])
+    for env_var, pragma in _PRAGMA_ENV_OVERRIDES.items():
+        value = os.getenv(env_var)
+        if value:
+            pragmas[pragma] = value
+
+    for pragma, value in pragmas.items():
+        if not _PRAGMA_VALUE.match(str(value)):
+            raise ValueError(f"Invalid value for PRAGMA {pragma}: {value!r}")
+
+    return pragmas
+
+
+def apply_pragmas(engine, pragmas: Dict[str, Any]):
+    """Run the PRAGMAs on every new DBAPI connection of the engine"""
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma, value in pragmas.items():
+                cursor.execute(f"PRAGMA {pragma}={value}")
+        finally:
+            cursor.close()
+
+
+class PoolStats:
+    """
+    Thread-safe counters for connection pool usage
+    Used to size DB_POOL_SIZE / DB_MAX_OVERFLOW
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.connects = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.timeouts = 0
+            self.checked_out = 0
+            self.peak_checked_out = 0
+            self.total_wait_seconds = 0.0
+            self.max_wait_seconds = 0.0
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def record_checkout(self):
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+    def record_checkin(self):
+        with self._lock:
+            self.checkins += 1
+            self.checked_out = max(0, self.checked_out - 1)
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.total_wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = self.checkouts + self.timeouts
+            return {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "checked_out": self.checked_out,
+                "peak_checked_out": self.peak_checked_out,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round((self.total_wait_seconds / waits * 1000) if waits else 0.0, 3),
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 3)
+            }
+
+
+pool_stats = PoolStats()
+async_pool_stats = PoolStats()
+
+
+class _WaitTimingMixin:
+    """Records how long callers wait for a pooled connection"""
+    stats: PoolStats
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.record_wait(time.perf_counter() - start)
+        return conn
+
 
-sqlite_file_name = "database.db"
-sqlite_url = f"sqlite:///{sqlite_file_name}"
+class InstrumentedQueuePool(_WaitTimingMixin, QueuePool):
+    """QueuePool for the sync engine"""
+    stats = pool_stats
 
-engine = create_engine(sqlite_url, echo=True)
 
-def init_db():
-    SQLModel.metadata.create_all(engine)
+class InstrumentedAsyncQueuePool(_WaitTimingMixin, AsyncAdaptedQueuePool):
+    """Async-adapted QueuePool for the aiosqlite engine"""
+    stats = async_pool_stats
+
+
+def _track_pool_events(target_engine, stats: PoolStats):
+    """Count connects/checkouts/checkins on the engine's pool"""
+    event.listen(target_engine, "connect", lambda dbapi_conn, record: stats.record_connect())
+    event.listen(target_engine, "checkout", lambda dbapi_conn, record, proxy: stats.record_checkout())
+    event.listen(target_engine, "checkin", lambda dbapi_conn, record: stats.record_checkin())
+
+
+def _is_memory_url(url: str) -> bool:
+    return url in ("sqlite://", "sqlite:///:memory:")
+
+
+def build_engine(url: str = sqlite_url, profile: str = None, echo: bool = SQL_ECHO):
+    """
+    Create a pooled engine for the given URL with the SQLite storage profile applied
+    SQLite connections are shared across threads, so check_same_thread is disabled
+    """
+    is_sqlite = url.startswith("sqlite")
+    connect_args = {"check_same_thread": False} if is_sqlite else {}
+
+    if _is_memory_url(url):
+        # Every :memory: connection is a separate database - share a single one
+        new_engine = create_engine(url, echo=echo, connect_args=connect_args, poolclass=StaticPool)
+    else:
+        new_engine = create_engine(
+            url,
+            echo=echo,
+            connect_args=connect_args,
+            poolclass=InstrumentedQueuePool,
+            pool_size=POOL_SIZE,
+            max_overflow=MAX_OVERFLOW,
+            pool_timeout=POOL_TIMEOUT,
+            pool_recycle=POOL_RECYCLE
+        )
+
+    if is_sqlite:
+        apply_pragmas(new_engine, get_storage_profile(profile))
+
+    return new_engine
+
+
+def build_async_engine(url: str = async_sqlite_url, profile: str = None, echo: bool = SQL_ECHO):
+    """
+    Create the aiosqlite engine (same database, same storage profile)
+    Lets async endpoints await DB round trips instead of blocking the event loop
+    """
+    is_sqlite = url.startswith("sqlite")
+
+    if _is_memory_url(url.replace("+aiosqlite", "")):
+        new_engine = create_async_engine(url, echo=echo, poolclass=StaticPool)
+    else:
+        new_engine = create_async_engine(
+            url,
+            echo=echo,
+            poolclass=InstrumentedAsyncQueuePool,
+            pool_size=POOL_SIZE,
+            max_overflow=MAX_OVERFLOW,
+            pool_timeout=POOL_TIMEOUT,
+            pool_recycle=POOL_RECYCLE
+        )
+
+    if is_sqlite:
+        apply_pragmas(new_engine.sync_engine, get_storage_profile(profile))
+
+    return new_engine
+
+
+# Global singletons (created once at import, shared by every thread / the event loop)
+engine = build_engine()
+async_engine = build_async_engine()
+
+_track_pool_events(engine, pool_stats)
+_track_pool_events(async_engine.sync_engine, async_pool_stats)
+
+
+def _live_pool_state(pool) -> Dict[str, Any]:
+    live = {"status": pool.status()}
+    if isinstance(pool, QueuePool):
+        live.update({
+            "size": pool.size(),
+            "idle": pool.checkedin(),
+            "in_use": pool.checkedout(),
+            "overflow": pool.overflow()
+        })
+    return live
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Pool configuration, live state and checkout/wait counters (sync engine + async engine)"""
+    pool = engine.pool
+    live = _live_pool_state(pool)
+
+    return {
+        "config": {
+            "pool_class": type(pool).__name__,
+            "pool_size": POOL_SIZE,
+            "max_overflow": MAX_OVERFLOW,
+            "pool_timeout_seconds": POOL_TIMEOUT,
+            "storage_profile": os.getenv("DB_PROFILE", "performance"),
+            "pragmas": get_storage_profile() if sqlite_url.startswith("sqlite") else {}
+        },
+        "live": live,
+        "counters": pool_stats.snapshot(),
+        "async": {
+            "pool_class": type(async_engine.pool).__name__,
+            "live": _live_pool_state(async_engine.pool),
+            "counters": async_pool_stats.snapshot()
+        }
+    }
+
+
+def init_db(target_engine=None):
+    target_engine = target_engine or engine
+    SQLModel.metadata.create_all(target_engine)
+    _ensure_columns(target_engine)
+    _ensure_indexes(target_engine)
+
+
+def _ensure_columns(target_engine):
+    """
+    create_all never alters existing tables -
+    add nullable columns introduced later to existing databases
+    """
+    inspector = inspect(target_engine)
+    with target_engine.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            existing = {col["name"] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                col_type = column.type.compile(dialect=target_engine.dialect)
+                conn.exec_driver_sql(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {col_type}')
+                print(f"🛠️  Added column {table.name}.{column.name}")
+
+
+def _ensure_indexes(target_engine):
+    """
+    create_all only builds indexes together with new tables -
+    add indexes introduced later to existing databases
+    """
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=target_engine, checkfirst=True)
 
 def get_session():
     with Session(engine) as session:
         yield session
+
+async def get_async_session():
+    """FastAPI dependency for async endpoints (aiosqlite engine)"""
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
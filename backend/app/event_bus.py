@@ -3,9 +3,24 @@ Simple Event Bus for Decoupled Architecture
 Enables event-driven workflows and easy extensibility
 """
 
+from collections import deque
 from typing import Dict, List, Callable, Any
 from datetime import datetime
 import json
+import os
+
+EVENT_HISTORY_SIZE = int(os.getenv("EVENT_HISTORY_SIZE", "500"))  # Recent events kept for /api/events
+EVENT_PREVIEW_ITEMS = 3  # List items kept when logging/recording an event (bulk events carry thousands)
+
+
+def _preview(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Shallow copy of an event payload with long lists cut to EVENT_PREVIEW_ITEMS"""
+    preview = {}
+    for key, value in data.items():
+        if isinstance(value, list) and len(value) > EVENT_PREVIEW_ITEMS:
+            value = value[:EVENT_PREVIEW_ITEMS] + [f"... {len(value) - EVENT_PREVIEW_ITEMS} more"]
+        preview[key] = value
+    return preview
 
 
 class EventBus:
@@ -16,7 +31,7 @@ class EventBus:
     
     def __init__(self):
         self._listeners: Dict[str, List[Callable]] = {}
-        self._event_history: List[Dict] = []
+        self._event_history: deque = deque(maxlen=EVENT_HISTORY_SIZE)
     
     def on(self, event_type: str, handler: Callable):
         """
@@ -39,16 +54,17 @@ class EventBus:
             event_bus.emit("TICKET_CREATED", {"ticket_id": 1, "title": "..."})
         """
         
-        # Log event
+        # Log event (listeners get the full payload; history and log only a preview)
+        preview = _preview(data)
         event = {
             "type": event_type,
-            "data": data,
+            "data": preview,
             "timestamp": datetime.utcnow().isoformat()
         }
         self._event_history.append(event)
         
         print(f"\n📡 EVENT EMITTED: {event_type}")
-        print(f"   Data: {json.dumps(data, indent=2)[:200]}...")
+        print(f"   Data: {json.dumps(preview, indent=2, default=str)[:200]}...")
         
         # Call all listeners
         if event_type in self._listeners:
@@ -60,7 +76,7 @@ class EventBus:
     
     def get_recent_events(self, limit: int = 50) -> List[Dict]:
         """Get recent events for debugging"""
-        return self._event_history[-limit:]
+        return list(self._event_history)[-limit:]
 
 
 # Global singleton
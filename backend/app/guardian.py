@@ -1,8 +1,9 @@
 """
 Guardian Pattern Implementation
-Validates and retries AI agent outputs
+Validates and retries AI agent outputs (sync and async agents)
 """
 
+import inspect
 from typing import Dict, Any, Callable, Type
 from pydantic import BaseModel, ValidationError
 from app.schemas import TriageOutput, ComplianceOutput, RiskOutput
@@ -44,11 +45,7 @@ def validate_with_guardian(
             return validated.model_dump()
             
         except ValidationError as e:
-            print(f"   ❌ Validation failed:")
-            for error in e.errors():
-                field = error['loc'] if error['loc'] else 'unknown'
-                msg = error['msg']
-                print(f"      -  {field}: {msg}")
+            _log_validation_error(e)
             
             if attempt < max_retries:
                 print(f"   🔄 Retrying...")
@@ -68,6 +65,63 @@ def validate_with_guardian(
     return get_safe_fallback(schema, agent_name)
 
 
+async def validate_with_guardian_async(
+    agent_func: Callable,
+    schema: Type[BaseModel],
+    agent_name: str,
+    max_retries: int = 2,
+    *args,
+    **kwargs
+) -> Dict[str, Any]:
+    """
+    Async Guardian: same validation/retry/fallback policy as validate_with_guardian
+    agent_func may be a coroutine function (awaited) or a plain function
+    (rule-only agents, called inline - no thread needed).
+    """
+    
+    print(f"\n🛡️  Guardian protecting {agent_name}...")
+    
+    for attempt in range(max_retries + 1):
+        try:
+            print(f"   Attempt {attempt + 1}/{max_retries + 1}...")
+            raw_output = agent_func(*args, **kwargs)
+            if inspect.isawaitable(raw_output):
+                raw_output = await raw_output
+            
+            validated = schema(**raw_output)
+            
+            print(f"   ✅ Output validated successfully")
+            return validated.model_dump()
+            
+        except ValidationError as e:
+            _log_validation_error(e)
+            
+            if attempt < max_retries:
+                print(f"   🔄 Retrying...")
+                continue
+            else:
+                print(f"   ⚠️  Max retries exhausted - using safe fallback")
+                return get_safe_fallback(schema, agent_name)
+                
+        except Exception as e:
+            print(f"   ❌ Agent crashed: {str(e)}")
+            if attempt < max_retries:
+                print(f"   🔄 Retrying...")
+                continue
+            else:
+                return get_safe_fallback(schema, agent_name)
+    
+    return get_safe_fallback(schema, agent_name)
+
+
+def _log_validation_error(e: ValidationError):
+    print(f"   ❌ Validation failed:")
+    for error in e.errors():
+        field = error['loc'] if error['loc'] else 'unknown'
+        msg = error['msg']
+        print(f"      -  {field}: {msg}")
+
+
 def get_safe_fallback(schema: Type[BaseModel], agent_name: str) -> Dict[str, Any]:
     """
     Return safe default values when validation fails
@@ -0,0 +1,294 @@
+"""
+LLM Response Cache - Content-Addressed, Two Tiers
+Identical LLM requests (same model, options, system prompt and prompt) are
+answered from an in-memory LRU with TTL and, optionally, from a SQLite table
+that survives restarts. Forced re-analysis bypasses the lookup (and refreshes
+the stored response) via bypass_llm_cache().
+"""
+
+import asyncio
+import contextvars
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, Tuple
+from sqlmodel import Session, delete
+from app.models import LLMCacheEntry
+
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "1024"))                       # In-memory entries (0 = no memory tier)
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))      # Both tiers
+LLM_CACHE_PERSIST = os.getenv("LLM_CACHE_PERSIST", "false").lower() in ("1", "true", "yes")  # SQLite tier
+
+# Set while a forced re-analysis runs: lookups are skipped, fresh responses still stored
+# (contextvars follow asyncio tasks and asyncio.to_thread)
+_bypass: contextvars.ContextVar[bool] = contextvars.ContextVar("llm_cache_bypass", default=False)
+
+
+@contextmanager
+def bypass_llm_cache():
+    """Skip cached responses for LLM calls made inside this block"""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def llm_cache_bypassed() -> bool:
+    """Whether the current call runs inside bypass_llm_cache() (forced re-analysis)"""
+    return _bypass.get()
+
+
+def cache_key(payload: Dict[str, Any]) -> str:
+    """sha256 of the fields that determine the response (model, options, system, prompt)"""
+    material = {field: payload.get(field) for field in ("model", "options", "system", "prompt")}
+    canonical = json.dumps(material, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class LLMCacheStats:
+    """Thread-safe hit/miss counters for the LLM response cache"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.lookups = 0
+            self.memory_hits = 0
+            self.persistent_hits = 0
+            self.misses = 0
+            self.bypasses = 0
+            self.stores = 0
+            self.evictions = 0
+            self.expired = 0
+            self.errors = 0
+
+    def record(self, **increments: int):
+        with self._lock:
+            for name, amount in increments.items():
+                setattr(self, name, getattr(self, name) + amount)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self.memory_hits + self.persistent_hits
+            return {
+                "lookups": self.lookups,
+                "hits": hits,
+                "memory_hits": self.memory_hits,
+                "persistent_hits": self.persistent_hits,
+                "misses": self.misses,
+                "bypasses": self.bypasses,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "expired": self.expired,
+                "errors": self.errors,
+                "hit_rate": round(hits / self.lookups, 4) if self.lookups else 0.0
+            }
+
+
+class LLMResponseCache:
+    """
+    LRU + TTL memory tier in front of an optional SQLite tier
+    Persistent hits are promoted to memory. Only successful responses are
+    stored; callers decide what counts as success (errors are never cached).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = LLM_CACHE_SIZE,
+        ttl_seconds: float = LLM_CACHE_TTL_SECONDS,
+        persist: bool = LLM_CACHE_PERSIST,
+        engine=None
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.persist = persist
+        self._engine = engine
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()  # key -> (response, expires_at)
+        self.stats = LLMCacheStats()
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            from app.database import engine
+            self._engine = engine
+        return self._engine
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 or self.persist
+
+    # -- memory tier --
+
+    def _memory_get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            response, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.stats.record(expired=1)
+                return None
+            self._entries.move_to_end(key)
+            return response
+
+    def _memory_put(self, key: str, response: str, age_seconds: float = 0.0):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (response, time.monotonic() + self.ttl_seconds - age_seconds)
+            self._entries.move_to_end(key)
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        if evicted:
+            self.stats.record(evictions=evicted)
+
+    # -- persistent tier --
+
+    def _persistent_get(self, key: str) -> Optional[Tuple[str, float]]:
+        """(response, age in seconds) of a live persisted entry (a storage error counts as a miss)"""
+        try:
+            return self._persistent_lookup(key)
+        except Exception as e:
+            print(f"⚠️  LLM cache read failed: {e}")
+            self.stats.record(errors=1)
+            return None
+
+    def _persistent_lookup(self, key: str) -> Optional[Tuple[str, float]]:
+        with Session(self.engine) as session:
+            entry = session.get(LLMCacheEntry, key)
+            if entry is None:
+                return None
+            age = (datetime.utcnow() - entry.created_at).total_seconds()
+            if age >= self.ttl_seconds:
+                session.delete(entry)
+                session.commit()
+                self.stats.record(expired=1)
+                return None
+            return entry.response, age
+
+    def _persistent_put(self, key: str, model: str, response: str):
+        """Upsert the response (a storage error only loses the persisted copy)"""
+        try:
+            with Session(self.engine) as session:
+                session.merge(LLMCacheEntry(key=key, model=model or "", response=response, created_at=datetime.utcnow()))
+                session.commit()
+        except Exception as e:
+            print(f"⚠️  LLM cache write failed: {e}")
+            self.stats.record(errors=1)
+
+    def purge_expired(self) -> int:
+        """Delete expired persisted entries; returns the number removed"""
+        if not self.persist:
+            return 0
+        cutoff = datetime.utcnow() - timedelta(seconds=self.ttl_seconds)
+        with Session(self.engine) as session:
+            result = session.execute(delete(LLMCacheEntry).where(LLMCacheEntry.created_at < cutoff))
+            session.commit()
+            return result.rowcount or 0
+
+    # -- lookups (sync) --
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached response for key, or None (miss, expired or bypassed)"""
+        if not self.enabled:
+            return None
+        if llm_cache_bypassed():
+            self.stats.record(bypasses=1)
+            return None
+        self.stats.record(lookups=1)
+
+        response = self._memory_get(key)
+        if response is not None:
+            self.stats.record(memory_hits=1)
+            return response
+
+        if self.persist:
+            found = self._persistent_get(key)
+            if found is not None:
+                response, age = found
+                self._memory_put(key, response, age)
+                self.stats.record(persistent_hits=1)
+                return response
+
+        self.stats.record(misses=1)
+        return None
+
+    def put(self, key: str, response: str, model: str = ""):
+        if not self.enabled:
+            return
+        self._memory_put(key, response)
+        if self.persist:
+            self._persistent_put(key, model, response)
+        self.stats.record(stores=1)
+
+    # -- lookups (async: the SQLite tier runs in a thread) --
+
+    async def aget(self, key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        if llm_cache_bypassed():
+            self.stats.record(bypasses=1)
+            return None
+        self.stats.record(lookups=1)
+
+        response = self._memory_get(key)
+        if response is not None:
+            self.stats.record(memory_hits=1)
+            return response
+
+        if self.persist:
+            found = await asyncio.to_thread(self._persistent_get, key)
+            if found is not None:
+                response, age = found
+                self._memory_put(key, response, age)
+                self.stats.record(persistent_hits=1)
+                return response
+
+        self.stats.record(misses=1)
+        return None
+
+    async def aput(self, key: str, response: str, model: str = ""):
+        if not self.enabled:
+            return
+        self._memory_put(key, response)
+        if self.persist:
+            await asyncio.to_thread(self._persistent_put, key, model, response)
+        self.stats.record(stores=1)
+
+    def clear(self, persisted: bool = False):
+        """Drop the memory tier (and the SQLite tier if persisted=True)"""
+        with self._lock:
+            self._entries.clear()
+        if persisted and self.persist:
+            with Session(self.engine) as session:
+                session.execute(delete(LLMCacheEntry))
+                session.commit()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            size = len(self._entries)
+        return {
+            "config": {
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "persist": self.persist
+            },
+            "memory_entries": size,
+            "counters": self.stats.snapshot()
+        }
+
+
+# Global singleton (shared by the sync and async LLM calls)
+llm_cache = LLMResponseCache()
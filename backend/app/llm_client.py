@@ -0,0 +1,348 @@
+"""
+LLM Client - Pooled Keep-Alive HTTP Session
+One thread-safe requests.Session shared by every agent: connections to the
+LLM backend are reused across calls, with connect/read timeouts and pool
+usage counters (used to size LLM_POOL_SIZE).
+AsyncLLMClient is the httpx equivalent for the async agents: a pending call
+is a coroutine waiting on a semaphore, not a blocked thread.
+"""
+
+import asyncio
+import os
+import threading
+import time
+import weakref
+from typing import Dict, Any, AsyncIterator, Iterator, Tuple
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ReadTimeoutError
+
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434")
+
+# Pool sizing and timeouts (seconds)
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "10"))                    # Concurrent connections kept alive
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "3"))
+LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", "15"))
+LLM_POOL_TIMEOUT = float(os.getenv("LLM_POOL_TIMEOUT", "30"))            # Wait for a free connection
+LLM_ASYNC_CONCURRENCY = int(os.getenv("LLM_ASYNC_CONCURRENCY", str(LLM_POOL_SIZE)))  # In-flight async calls
+
+
+class LLMPoolTimeout(Exception):
+    """No pooled connection became free within LLM_POOL_TIMEOUT"""
+
+
+class LLMPoolStats:
+    """
+    Thread-safe counters for LLM connection pool usage
+    A request that finds every connection busy counts as a pool wait.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.errors = 0
+            self.timeouts = 0
+            self.pool_waits = 0
+            self.pool_timeouts = 0
+            self.in_flight = 0
+            self.peak_in_flight = 0
+            self.total_wait_seconds = 0.0
+            self.max_wait_seconds = 0.0
+            self.total_request_seconds = 0.0
+
+    def record_checkout(self, wait_seconds: float, waited: bool):
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            self.total_wait_seconds += wait_seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+            if waited:
+                self.pool_waits += 1
+
+    def record_pool_timeout(self, wait_seconds: float):
+        with self._lock:
+            self.pool_timeouts += 1
+            self.total_wait_seconds += wait_seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+
+    def record_checkin(self, request_seconds: float, error: bool = False, timeout: bool = False):
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            self.total_request_seconds += request_seconds
+            if error:
+                self.errors += 1
+            if timeout:
+                self.timeouts += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "timeouts": self.timeouts,
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "pool_waits": self.pool_waits,
+                "pool_timeouts": self.pool_timeouts,
+                "avg_wait_ms": round((self.total_wait_seconds / self.requests * 1000) if self.requests else 0.0, 3),
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+                "avg_request_ms": round((self.total_request_seconds / self.requests * 1000) if self.requests else 0.0, 1)
+            }
+
+
+class LLMClient:
+    """
+    Shared HTTP client for the LLM backend
+    requests' HTTPAdapter keeps up to pool_size keep-alive connections;
+    a semaphore of the same size bounds concurrent calls, so waiting for a
+    connection is measured (and limited by pool_timeout) instead of hidden.
+    """
+
+    def __init__(
+        self,
+        base_url: str = OLLAMA_URL,
+        pool_size: int = LLM_POOL_SIZE,
+        connect_timeout: float = LLM_CONNECT_TIMEOUT,
+        read_timeout: float = LLM_READ_TIMEOUT,
+        pool_timeout: float = LLM_POOL_TIMEOUT
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.pool_timeout = pool_timeout
+        self.stats = LLMPoolStats()
+
+        self._adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True, max_retries=0)
+        self.session = requests.Session()
+        self.session.mount("http://", self._adapter)
+        self.session.mount("https://", self._adapter)
+        self._slots = threading.BoundedSemaphore(pool_size)
+
+    def _acquire(self):
+        start = time.perf_counter()
+        waited = not self._slots.acquire(blocking=False)
+        if waited and not self._slots.acquire(timeout=self.pool_timeout):
+            self.stats.record_pool_timeout(time.perf_counter() - start)
+            raise LLMPoolTimeout(f"No LLM connection free after {self.pool_timeout}s (LLM_POOL_SIZE={self.pool_size})")
+        self.stats.record_checkout(time.perf_counter() - start, waited)
+
+    def post_json(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        POST a JSON payload and decode the JSON response
+
+        Raises:
+            LLMPoolTimeout: If every connection stayed busy for pool_timeout
+            requests.RequestException: On connection errors, timeouts or HTTP errors
+        """
+        self._acquire()
+        start = time.perf_counter()
+        error = timeout = False
+        try:
+            response = self.session.post(f"{self.base_url}{path}", json=payload, timeout=self.timeout)
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.Timeout:
+            error = timeout = True
+            raise
+        except Exception:
+            error = True
+            raise
+        finally:
+            self._slots.release()
+            self.stats.record_checkin(time.perf_counter() - start, error=error, timeout=timeout)
+
+    def stream_lines(self, path: str, payload: Dict[str, Any]) -> Iterator[bytes]:
+        """
+        POST a JSON payload and yield the response body line by line (NDJSON)
+        The connection slot is held until the generator is exhausted or closed;
+        closing it early drops the connection, which ends the generation.
+        Callers should wrap it in contextlib.closing().
+        """
+        self._acquire()
+        start = time.perf_counter()
+        error = timeout = False
+        try:
+            with self.session.post(f"{self.base_url}{path}", json=payload, timeout=self.timeout, stream=True) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if line:
+                        yield line
+        except requests.exceptions.Timeout:
+            error = timeout = True
+            raise
+        except requests.exceptions.ConnectionError as e:
+            error = True
+            if isinstance(e.args[0] if e.args else None, ReadTimeoutError):
+                # requests reports a read timeout mid-body as a ConnectionError
+                timeout = True
+                raise requests.exceptions.ReadTimeout(e) from e
+            raise
+        except Exception:
+            error = True
+            raise
+        finally:
+            self._slots.release()
+            self.stats.record_checkin(time.perf_counter() - start, error=error, timeout=timeout)
+
+    def connections_opened(self) -> int:
+        """TCP connections opened so far (requests minus this = keep-alive reuse)"""
+        pools = self._adapter.poolmanager.pools
+        return sum(pools[key].num_connections for key in list(pools.keys()))
+
+    def pool_stats(self) -> Dict[str, Any]:
+        counters = self.stats.snapshot()
+        opened = self.connections_opened()
+        return {
+            "config": {
+                "base_url": self.base_url,
+                "pool_size": self.pool_size,
+                "connect_timeout_seconds": self.timeout[0],
+                "read_timeout_seconds": self.timeout[1],
+                "pool_timeout_seconds": self.pool_timeout
+            },
+            "connections_opened": opened,
+            "connections_reused": max(0, counters["requests"] - opened),
+            "counters": counters
+        }
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncLLMClient:
+    """
+    Async client for the LLM backend (httpx.AsyncClient, keep-alive)
+    At most `concurrency` requests are in flight; any number of callers can
+    wait on the semaphore at the cost of a coroutine each. httpx clients and
+    asyncio semaphores belong to one event loop, so each loop gets its own.
+    """
+
+    def __init__(
+        self,
+        base_url: str = OLLAMA_URL,
+        concurrency: int = LLM_ASYNC_CONCURRENCY,
+        connect_timeout: float = LLM_CONNECT_TIMEOUT,
+        read_timeout: float = LLM_READ_TIMEOUT,
+        pool_timeout: float = LLM_POOL_TIMEOUT
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.concurrency = concurrency
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout, pool=pool_timeout)
+        self.pool_timeout = pool_timeout
+        self.stats = LLMPoolStats()
+        self.waiting = 0
+        self.peak_waiting = 0
+        self._loops: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[httpx.AsyncClient, asyncio.Semaphore]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _state(self) -> Tuple[httpx.AsyncClient, asyncio.Semaphore]:
+        loop = asyncio.get_running_loop()
+        state = self._loops.get(loop)
+        if state is None:
+            limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+            state = (httpx.AsyncClient(limits=limits, timeout=self.timeout), asyncio.Semaphore(self.concurrency))
+            self._loops[loop] = state
+        return state
+
+    async def _checkout(self) -> Tuple[httpx.AsyncClient, asyncio.Semaphore]:
+        """Take an in-flight slot (waiting up to pool_timeout); returns this loop's client and semaphore"""
+        client, semaphore = self._state()
+        start = time.perf_counter()
+        waited = semaphore.locked()
+        if not waited:
+            await semaphore.acquire()  # Free slot: returns without suspending
+        else:
+            self.waiting += 1
+            self.peak_waiting = max(self.peak_waiting, self.waiting)
+            try:
+                await asyncio.wait_for(semaphore.acquire(), timeout=self.pool_timeout)
+            except asyncio.TimeoutError:
+                self.stats.record_pool_timeout(time.perf_counter() - start)
+                raise LLMPoolTimeout(
+                    f"No LLM slot free after {self.pool_timeout}s (LLM_ASYNC_CONCURRENCY={self.concurrency})"
+                ) from None
+            finally:
+                self.waiting -= 1
+        self.stats.record_checkout(time.perf_counter() - start, waited)
+        return client, semaphore
+
+    async def post_json(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        POST a JSON payload and decode the JSON response
+
+        Raises:
+            LLMPoolTimeout: If no slot became free within pool_timeout
+            httpx.HTTPError: On connection errors, timeouts or HTTP errors
+        """
+        client, semaphore = await self._checkout()
+        start = time.perf_counter()
+        error = timeout = False
+        try:
+            response = await client.post(f"{self.base_url}{path}", json=payload)
+            response.raise_for_status()
+            return response.json()
+        except httpx.TimeoutException:
+            error = timeout = True
+            raise
+        except Exception:
+            error = True
+            raise
+        finally:
+            semaphore.release()
+            self.stats.record_checkin(time.perf_counter() - start, error=error, timeout=timeout)
+
+    async def stream_lines(self, path: str, payload: Dict[str, Any]) -> AsyncIterator[str]:
+        """
+        Async NDJSON streaming counterpart of post_json (see LLMClient.stream_lines)
+        Callers should aclose() the generator when they stop early.
+        """
+        client, semaphore = await self._checkout()
+        start = time.perf_counter()
+        error = timeout = False
+        try:
+            async with client.stream("POST", f"{self.base_url}{path}", json=payload) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if line:
+                        yield line
+        except httpx.TimeoutException:
+            error = timeout = True
+            raise
+        except Exception:
+            error = True
+            raise
+        finally:
+            semaphore.release()
+            self.stats.record_checkin(time.perf_counter() - start, error=error, timeout=timeout)
+
+    def pool_stats(self) -> Dict[str, Any]:
+        return {
+            "config": {
+                "base_url": self.base_url,
+                "concurrency": self.concurrency,
+                "connect_timeout_seconds": self.timeout.connect,
+                "read_timeout_seconds": self.timeout.read,
+                "pool_timeout_seconds": self.pool_timeout
+            },
+            "waiting": self.waiting,
+            "peak_waiting": self.peak_waiting,
+            "counters": self.stats.snapshot()
+        }
+
+    async def aclose(self):
+        """Close the client of the running loop"""
+        state = self._loops.pop(asyncio.get_running_loop(), None)
+        if state is not None:
+            await state[0].aclose()
+
+
+# Global singletons (sync: shared by every agent thread; async: by the workflow coroutines)
+llm_client = LLMClient()
+async_llm_client = AsyncLLMClient()
@@ -0,0 +1,190 @@
+"""
+LLM Streaming - Early JSON Termination
+Agents only need the JSON object (or, for batched triage, the JSON array) at
+the start of a reply, but the model keeps generating after the closing brace.
+Streamed replies are fed token by token to an incremental detector; the
+request is dropped as soon as a complete, parseable value has arrived.
+Time-to-first-token and time-to-object are recorded per agent.
+"""
+
+import json
+import threading
+import time
+from typing import Dict, Any, Optional
+
+# container -> (opening character, decoded type)
+_CONTAINERS = {"object": ("{", dict), "array": ("[", list)}
+
+
+class IncrementalJSONObject:
+    """
+    Finds the first complete JSON object (or array) in text that arrives in pieces
+    Tracks bracket depth outside string literals, so brackets inside strings and
+    leading prose or ``` fences are ignored. A balanced candidate that does not
+    parse is skipped and scanning resumes after its opening bracket.
+    """
+
+    def __init__(self, container: str = "object"):
+        self._opener, self._type = _CONTAINERS[container]
+        self.text = ""
+        self.value: Optional[Any] = None
+        self.raw: Optional[str] = None
+        self._pos = 0
+        self._start: Optional[int] = None
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    @property
+    def complete(self) -> bool:
+        return self.value is not None
+
+    def feed(self, chunk: str) -> bool:
+        """Append a chunk; returns True once a complete value has been found"""
+        if self.complete:
+            return True
+        self.text += chunk
+        text = self.text
+
+        while self._pos < len(text):
+            char = text[self._pos]
+            if self._start is None:
+                if char == self._opener:
+                    self._start, self._depth = self._pos, 1
+                    self._in_string = self._escape = False
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    candidate = text[self._start:self._pos + 1]
+                    try:
+                        value = json.loads(candidate)
+                    except ValueError:
+                        value = None
+                    if isinstance(value, self._type):
+                        self.value, self.raw = value, candidate
+                        return True
+                    self._pos = self._start  # Not a value after all: resume after its bracket
+                    self._start = None
+            self._pos += 1
+        return False
+
+
+class LLMStreamStats:
+    """
+    Thread-safe per-agent streaming latencies
+    TTFT = request start to first generated token; time-to-object = request
+    start to the closing bracket of the first complete JSON value.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._agents: Dict[str, Dict[str, float]] = {}
+
+    def record(self, agent: str, ttft: Optional[float], time_to_object: Optional[float], total: float,
+               tokens: int, early_stop: bool):
+        with self._lock:
+            s = self._agents.setdefault(agent, {
+                "calls": 0, "objects": 0, "early_stops": 0, "tokens": 0,
+                "ttft_sum": 0.0, "ttft_count": 0, "ttft_max": 0.0,
+                "object_sum": 0.0, "object_max": 0.0, "total_sum": 0.0
+            })
+            s["calls"] += 1
+            s["tokens"] += tokens
+            s["total_sum"] += total
+            if ttft is not None:
+                s["ttft_count"] += 1
+                s["ttft_sum"] += ttft
+                s["ttft_max"] = max(s["ttft_max"], ttft)
+            if time_to_object is not None:
+                s["objects"] += 1
+                s["object_sum"] += time_to_object
+                s["object_max"] = max(s["object_max"], time_to_object)
+            if early_stop:
+                s["early_stops"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                agent: {
+                    "calls": s["calls"],
+                    "objects": s["objects"],
+                    "early_stops": s["early_stops"],
+                    "avg_tokens": round(s["tokens"] / s["calls"], 1),
+                    "avg_ttft_ms": round(s["ttft_sum"] / s["ttft_count"] * 1000, 1) if s["ttft_count"] else None,
+                    "max_ttft_ms": round(s["ttft_max"] * 1000, 1),
+                    "avg_time_to_object_ms": round(s["object_sum"] / s["objects"] * 1000, 1) if s["objects"] else None,
+                    "max_time_to_object_ms": round(s["object_max"] * 1000, 1),
+                    "avg_total_ms": round(s["total_sum"] / s["calls"] * 1000, 1)
+                }
+                for agent, s in self._agents.items()
+            }
+
+
+class OllamaStreamReader:
+    """
+    Consumes Ollama's NDJSON stream ({"response": token, "done": bool} per line)
+    feed() returns True when the caller should stop reading: a complete JSON
+    value arrived (early stop) or the model finished. Non-streamed replies
+    (one line holding the whole response) go through the same path.
+    """
+
+    def __init__(self, agent: str, stats: "LLMStreamStats" = None, container: str = "object"):
+        self.agent = agent
+        self.stats = stats or llm_stream_stats
+        self.detector = IncrementalJSONObject(container)
+        self.tokens = 0
+        self.done = False
+        self._start = time.perf_counter()
+        self._first_token: Optional[float] = None
+        self._object_at: Optional[float] = None
+
+    def feed(self, line) -> bool:
+        if not line:
+            return False
+        event = json.loads(line)
+        if event.get("error"):
+            raise RuntimeError(event["error"])
+
+        token = event.get("response", "")
+        if token:
+            self.tokens += 1
+            if self._first_token is None:
+                self._first_token = time.perf_counter()
+            if self.detector.feed(token):
+                self._object_at = time.perf_counter()
+                self.done = bool(event.get("done"))
+                return True
+        self.done = bool(event.get("done"))
+        return self.done
+
+    def finish(self) -> str:
+        """Record latencies; returns the JSON value text, or the whole reply if none was found"""
+        end = time.perf_counter()
+        self.stats.record(
+            self.agent,
+            ttft=(self._first_token - self._start) if self._first_token is not None else None,
+            time_to_object=(self._object_at - self._start) if self._object_at is not None else None,
+            total=end - self._start,
+            tokens=self.tokens,
+            early_stop=self.detector.complete and not self.done
+        )
+        return self.detector.raw if self.detector.complete else self.detector.text.strip()
+
+
+# Global singleton (shared by the sync and async agents)
+llm_stream_stats = LLMStreamStats()
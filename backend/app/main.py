@@ -1,27 +1,96 @@
-from fastapi import FastAPI, Depends, BackgroundTasks
+from fastapi import FastAPI, Depends, BackgroundTasks, HTTPException, Query, Request, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
-from sqlmodel import Session, select, create_engine
-from app.database import get_session, init_db, sqlite_url
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import func, tuple_
+from typing import Optional
+from app.database import engine, async_engine, get_session, get_async_session, get_pool_stats, init_db
 from app.models import Ticket
+from app.stats_store import stats_store # initializes listeners
+from app.pagination import encode_cursor, decode_cursor, naive_utc, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from contextlib import asynccontextmanager
 from datetime import datetime
 import datetime as dt
 import os
 import json
-from app.workflow_engine import process_ticket_workflow
+import asyncio
+import time
+from app.workflow_engine import process_ticket_workflow_async
+from app.rules import rule_engine, shutdown_batch_pool, RULE_RELOAD_INTERVAL_SECONDS
 from app.automation import close_ticket_workflow
 from app.metrics import agent_metrics
+from app.llm_client import llm_client, async_llm_client
+from app.llm_cache import llm_cache
+from app.llm_stream import llm_stream_stats
+from app.agents import triage_batcher, TRIAGE_BATCHING, llm_single_flight, async_llm_single_flight
+from app.near_duplicates import near_duplicate_index
 from app.event_bus import event_bus
-from app.audit import log_audit_event # initializes listeners
+from app.audit import audit_sink, build_audit_log_query # initializes listeners
+from app.audit_archive import audit_archiver, row_to_archive_record, AUDIT_ARCHIVE_INTERVAL_SECONDS
+from app.analysis_columns import backfill_analysis_columns
+from app.bulk_ingest import (
+    parse_bulk_payload, validate_tickets, ingest_tickets, run_analysis_batch_async, BULK_MAX_TICKETS
+)
+
+async def audit_archive_loop():
+    """Background job: move old audit entries to the archive tier periodically"""
+    while True:
+        try:
+            await asyncio.to_thread(audit_archiver.archive_once)
+        except Exception as e:
+            print(f"❌ Audit archival failed: {e}")
+        await asyncio.sleep(AUDIT_ARCHIVE_INTERVAL_SECONDS)
+
+async def analysis_backfill_job():
+    """Background job: copy risk/compliance fields of older tickets into their columns"""
+    try:
+        await asyncio.to_thread(backfill_analysis_columns)
+    except Exception as e:
+        print(f"❌ Analysis backfill failed: {e}")
+
+async def near_duplicate_index_job():
+    """Background job: index analyzed tickets so copies of them can reuse their triage"""
+    try:
+        indexed = await asyncio.to_thread(near_duplicate_index.rebuild)
+        print(f"♻️  Near-duplicate index: {indexed} analyzed tickets")
+    except Exception as e:
+        print(f"❌ Near-duplicate index rebuild failed: {e}")
+
+async def rules_reload_loop():
+    """Background job: pick up rule set file changes (compiled off the request path)"""
+    while True:
+        await asyncio.sleep(RULE_RELOAD_INTERVAL_SECONDS)
+        try:
+            await asyncio.to_thread(rule_engine.reload_if_changed)
+        except Exception as e:
+            print(f"❌ Rule set reload check failed: {e}")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print("Creating database tables...")
     init_db()
+    stats_store.ensure_ready()
+    llm_cache.purge_expired()
+    audit_sink.start()
+    archive_task = asyncio.create_task(audit_archive_loop())
+    backfill_task = asyncio.create_task(analysis_backfill_job())
+    duplicates_task = asyncio.create_task(near_duplicate_index_job())
+    rules_task = asyncio.create_task(rules_reload_loop()) if RULE_RELOAD_INTERVAL_SECONDS > 0 else None
     os.makedirs("app/reports", exist_ok=True)
     yield
     print("Shutting down...")
+    archive_task.cancel()
+    backfill_task.cancel()
+    duplicates_task.cancel()
+    if rules_task:
+        rules_task.cancel()
+    audit_sink.stop()
+    shutdown_batch_pool()
+    llm_client.close()
+    await async_llm_client.aclose()
+    engine.dispose()
+    await async_engine.dispose()
 
 app = FastAPI(title="IntelliFlow Copilot", lifespan=lifespan)
 
@@ -37,14 +106,97 @@ app.mount("/reports", StaticFiles(directory="app/reports"), name="reports")
 def root():
     return FileResponse("static/dashboard.html")
 
+# Characters of the description returned in list views (full text via /tickets/{id})
+DESCRIPTION_PREVIEW_CHARS = 120
+
+TICKET_SORTS = ("created_at", "risk")
+
 @app.get("/tickets")
-def list_tickets(session: Session = Depends(get_session)):
-    tickets = session.exec(select(Ticket)).all()
-    return tickets
+async def list_tickets(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    category: Optional[str] = None,
+    department: Optional[str] = None,
+    compliance_status: Optional[str] = None,
+    risk_level: Optional[str] = None,
+    min_risk: Optional[int] = Query(None, ge=0, le=100),
+    llm_used: Optional[bool] = None,
+    sort: str = "created_at",
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    List tickets newest-first (keyset pagination on created_at, id)
+    sort=risk orders by risk_score desc instead (analyzed tickets only).
+    Returns a lightweight projection without the description/AI blobs.
+    The cursor for the next page is returned in the X-Next-Cursor header.
+    """
+    if sort not in TICKET_SORTS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {list(TICKET_SORTS)}")
+
+    query = select(
+        Ticket.id,
+        Ticket.title,
+        Ticket.status,
+        Ticket.priority,
+        Ticket.category,
+        Ticket.department,
+        Ticket.ai_priority,
+        Ticket.risk_score,
+        Ticket.risk_level,
+        Ticket.compliance_status,
+        Ticket.llm_used,
+        Ticket.created_at,
+        func.substr(Ticket.description, 1, DESCRIPTION_PREVIEW_CHARS).label("description_preview")
+    )
+
+    if status:
+        query = query.where(Ticket.status == status)
+    if priority:
+        query = query.where(Ticket.priority == priority)
+    if category:
+        query = query.where(Ticket.category == category)
+    if department:
+        query = query.where(Ticket.department == department)
+    if compliance_status:
+        query = query.where(Ticket.compliance_status == compliance_status)
+    if risk_level:
+        query = query.where(Ticket.risk_level == risk_level)
+    if min_risk is not None:
+        query = query.where(Ticket.risk_score >= min_risk)
+    if llm_used is not None:
+        query = query.where(Ticket.llm_used == llm_used)
+
+    sort_column = Ticket.risk_score if sort == "risk" else Ticket.created_at
+    if sort == "risk":
+        query = query.where(Ticket.risk_score.is_not(None))
+
+    if cursor:
+        try:
+            cursor_key, cursor_id = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if isinstance(cursor_key, datetime) != (sort == "created_at"):
+            raise HTTPException(status_code=400, detail=f"Cursor does not match sort={sort}")
+        query = query.where(tuple_(sort_column, Ticket.id) < (cursor_key, cursor_id))
+
+    # Fetch one extra row to know whether another page exists
+    query = query.order_by(sort_column.desc(), Ticket.id.desc()).limit(limit + 1)
+    rows = (await session.exec(query)).all()
+
+    page = [dict(row._mapping) for row in rows[:limit]]
+    if len(rows) > limit:
+        last = page[-1]
+        sort_key = last["risk_score"] if sort == "risk" else last["created_at"]
+        response.headers["X-Next-Cursor"] = encode_cursor(sort_key, last["id"])
+
+    return page
 
 @app.get("/tickets/{ticket_id}")
-def get_ticket(ticket_id: int, session: Session = Depends(get_session)):
-    ticket = session.get(Ticket, ticket_id)
+async def get_ticket(ticket_id: int, session: AsyncSession = Depends(get_async_session)):
+    ticket = await session.get(Ticket, ticket_id)
     if not ticket:
         return {"error": "Ticket not found"}
     
@@ -60,13 +212,12 @@ def get_ticket(ticket_id: int, session: Session = Depends(get_session)):
             
     return ticket_dict
 
-def background_workflow_wrapper(ticket_id: int, title: str, description: str):
-    """Wrapper to handle session for background task"""
-    # Create a new engine with check_same_thread=False for background tasks
-    engine = create_engine(sqlite_url, connect_args={"check_same_thread": False})
+async def background_workflow_wrapper(ticket_id: int, title: str, description: str):
+    """Wrapper to handle session for background task (runs on the app's event loop)"""
+    # Shared pooled engine - background tasks only borrow a connection
     with Session(engine) as session:
         try:
-            process_ticket_workflow(ticket_id, title, description, session)
+            await process_ticket_workflow_async(ticket_id, title, description, session)
         except Exception as e:
             print(f"❌ Background workflow failed: {str(e)}")
 
@@ -82,6 +233,11 @@ def create_ticket(ticket: Ticket, background_tasks: BackgroundTasks, session: Se
         "ticket_id": ticket.id,
         "title": ticket.title,
         "priority": ticket.priority,
+        "status": ticket.status,
+        "category": ticket.category,
+        "department": ticket.department,
+        "ai_priority": ticket.ai_priority,
+        "created_at": ticket.created_at.isoformat(),
         "created_by": "User"
     })
     
@@ -90,11 +246,56 @@ def create_ticket(ticket: Ticket, background_tasks: BackgroundTasks, session: Se
     
     return ticket
 
+@app.post("/tickets/bulk")
+async def create_tickets_bulk(request: Request, background_tasks: BackgroundTasks, analyze: bool = True):
+    """
+    Create many tickets from a JSON array or NDJSON body (application/x-ndjson)
+    All rows are inserted in one transaction; the stats store and audit log
+    receive a single TICKETS_BULK_CREATED event; analyses run as one batch
+    with bounded concurrency.
+    """
+    start = time.perf_counter()
+    body = await request.body()
+    try:
+        records = parse_bulk_payload(body, request.headers.get("content-type", ""))
+        if len(records) > BULK_MAX_TICKETS:
+            raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_TICKETS} tickets per request")
+        rows = validate_tickets(records)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not rows:
+        raise HTTPException(status_code=400, detail="No tickets in payload")
+
+    result = await asyncio.to_thread(ingest_tickets, engine, rows)
+    ids = result["ids"]
+
+    if analyze:
+        items = [(ticket_id, row["title"], row["description"]) for ticket_id, row in zip(ids, rows)]
+        background_tasks.add_task(run_analysis_batch_async, items, background_workflow_wrapper)
+
+    elapsed = time.perf_counter() - start
+    return {
+        "created": len(ids),
+        "ticket_ids": ids,
+        "analysis": "queued" if analyze else "skipped",
+        "elapsed_ms": round(elapsed * 1000, 2),
+        "insert_ms": round(result["insert_seconds"] * 1000, 2),
+        "tickets_per_sec": round(len(ids) / elapsed, 1) if elapsed > 0 else None
+    }
+
 @app.post("/tickets/{ticket_id}/analyze")
-async def analyze_ticket(ticket_id: int, background_tasks: BackgroundTasks, session: Session = Depends(get_session)):
-    """Trigger AI analysis (async, non-blocking)"""
+async def analyze_ticket(
+    ticket_id: int,
+    background_tasks: BackgroundTasks,
+    force: bool = False,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Trigger AI analysis (async, non-blocking)
+    force=true re-asks the LLM instead of reusing cached responses.
+    """
     
-    ticket = session.get(Ticket, ticket_id)
+    ticket = await session.get(Ticket, ticket_id)
     if not ticket:
         return {"error": "Ticket not found"}
     
@@ -104,28 +305,20 @@ async def analyze_ticket(ticket_id: int, background_tasks: BackgroundTasks, sess
     t_desc = ticket.description
     
     # Background task function
-    def run_analysis_sync():
-        """Synchronous wrapper for background execution"""
+    async def run_analysis():
+        """Background execution on the app's event loop (LLM waits hold no thread)"""
         print(f"\n🔄 BACKGROUND TASK STARTED for ticket {t_id}")
         
         try:
-            # Create new DB session for background task
-            from sqlmodel import Session, create_engine
-            from app.database import sqlite_url
-            
-            # Crucial for SQLite in threads
-            engine = create_engine(sqlite_url, connect_args={"check_same_thread": False})
-            
+            # Borrow a connection from the shared pool for the background task
             with Session(engine) as bg_session:
-                # Import and call workflow
-                from app.workflow_engine import process_ticket_workflow
-                
                 print(f"   Calling workflow_engine...")
-                result = process_ticket_workflow(
+                result = await process_ticket_workflow_async(
                     t_id,
                     t_title,
                     t_desc,
-                    bg_session
+                    bg_session,
+                    refresh=force
                 )
                 
                 print(f"✅ Background task complete")
@@ -137,7 +330,7 @@ async def analyze_ticket(ticket_id: int, background_tasks: BackgroundTasks, sess
             traceback.print_exc()
     
     # Add to background tasks
-    background_tasks.add_task(run_analysis_sync)
+    background_tasks.add_task(run_analysis)
     
     return {
         "status": "queued",
@@ -155,20 +348,22 @@ def approve_and_close(ticket_id: int, session: Session = Depends(get_session)):
         event_bus.emit("TICKET_CLOSED", {
             "ticket_id": ticket_id,
             "pdf_filename": result.get("pdf_filename"),
+            "previous_status": result.get("previous_status"),
             "closed_at": datetime.utcnow().isoformat()
         })
         
     return result
 
 @app.get("/api/stats")
-def get_stats(session: Session = Depends(get_session)):
-    tickets = session.exec(select(Ticket)).all()
-    
+async def get_stats(session: AsyncSession = Depends(get_async_session)):
+    # Incrementally maintained counters - independent of ticket table size
+    counts = await session.run_sync(stats_store.snapshot)
+
     # 1. KPI Cards
-    total_tickets = len(tickets)
-    high_priority = len([t for t in tickets if t.priority == "High"])
-    closed_tickets = len([t for t in tickets if t.status == "Closed"])
-    analyzed_tickets = len([t for t in tickets if t.ai_priority])
+    total_tickets = counts["total"]
+    high_priority = counts["priority"].get("High", 0)
+    closed_tickets = counts["status"].get("Closed", 0)
+    analyzed_tickets = counts["ai_analyzed"]
     
     # Calculate Savings
     llm_saved_percent = 72.5 
@@ -190,34 +385,29 @@ def get_stats(session: Session = Depends(get_session)):
 
     # 2. Category Distribution
     categories = {}
-    for t in tickets:
-        cat = t.category or "Uncategorized"
-        categories[cat] = categories.get(cat, 0) + 1
+    for cat, n in counts["category"].items():
+        key = cat or "Uncategorized"
+        categories[key] = categories.get(key, 0) + n
 
     # 3. Priority Distribution
     priorities = {"High": 0, "Medium": 0, "Low": 0}
-    for t in tickets:
-        if t.priority in priorities:
-            priorities[t.priority] += 1
+    for pri in priorities:
+        priorities[pri] = counts["priority"].get(pri, 0)
 
     # 4. Status Distribution
     statuses = {"New": 0, "In_Review": 0, "Approved": 0, "Rejected": 0, "Closed": 0}
-    for t in tickets:
-        if t.status in statuses:
-            statuses[t.status] += 1
+    for st in statuses:
+        statuses[st] = counts["status"].get(st, 0)
             
-    # 5. Tickets by Day (Mock for 7 days) - FIXED datetime import
-    today = dt.date.today()
-    tickets_by_day = []
-    for i in range(7):
-        d = today - dt.timedelta(days=6-i)
-        import random
-        tickets_by_day.append({
-            "date": d.strftime("%Y-%m-%d"),
-            "high": random.randint(0, 5),
-            "medium": random.randint(2, 8),
-            "low": random.randint(1, 4)
-        })
+    # 5. Tickets by Day (last 7 days, from the hourly rollup)
+    today = datetime.combine(datetime.utcnow().date(), dt.time())
+    last_7_days = await session.run_sync(
+        lambda s: stats_store.histogram(today - dt.timedelta(days=6), today + dt.timedelta(days=1), "day", s)
+    )
+    tickets_by_day = [
+        {"date": point["bucket"], "high": point["high"], "medium": point["medium"], "low": point["low"]}
+        for point in last_7_days
+    ]
 
     return {
         "kpi_cards": kpi_cards,
@@ -227,45 +417,144 @@ def get_stats(session: Session = Depends(get_session)):
         "tickets_by_day": tickets_by_day
     }
 
+@app.get("/api/stats/tickets-over-time")
+async def get_tickets_over_time(
+    bucket: str = "day",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Tickets created per hour/day/week, broken down by priority
+    Defaults to the last 7 days; range boundaries are aligned to the hour
+    """
+    # Stored timestamps are naive UTC: convert aware (...Z) bounds before defaulting and bucketing
+    end = naive_utc(end) or datetime.utcnow()
+    start = naive_utc(start) or end - dt.timedelta(days=7)
+    try:
+        series = await session.run_sync(lambda s: stats_store.histogram(start, end, bucket, s))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "bucket": bucket,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "series": series
+    }
+
+def _audit_log_response(record: dict) -> dict:
+    """API shape of an audit record (hot row or archived line)"""
+    return {
+        "id": record["id"],
+        "event_type": record["event_type"],
+        "category": record["event_category"],
+        "ticket_id": record["ticket_id"],
+        "actor": record["actor"],
+        "description": record["description"],
+        "status": record["status"],
+        "created_at": record["created_at"],
+        "duration_ms": record["duration_ms"]
+    }
+
 @app.get("/api/audit-logs")
-def get_audit_logs(
+async def get_audit_logs(
+    response: Response,
     ticket_id: int = None,
-    limit: int = 50,
-    session: Session = Depends(get_session)
+    event_type: Optional[str] = None,
+    actor: Optional[str] = None,
+    status: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
-    Get audit trail
-    Optionally filter by ticket_id
+    Get audit trail, newest first (keyset pagination on created_at, id)
+    Filters: ticket_id, event_type, actor, status and time range [start, end).
+    Hot rows come from SQLite; when the range reaches past the hot retention
+    window (or the hot tier cannot fill the page) archived entries are merged in.
+    The cursor for the next page is returned in the X-Next-Cursor header.
     """
     
-    from app.models import AuditLog
-    from sqlmodel import select
-    
-    query = select(AuditLog).order_by(AuditLog.created_at.desc()).limit(limit)
-    
-    if ticket_id:
-        query = query.where(AuditLog.ticket_id == ticket_id)
+    # Aware (...Z) bounds are compared with naive UTC rows and the archive's cutoff
+    start, end = naive_utc(start), naive_utc(end)
+
+    decoded_cursor = None
+    if cursor:
+        try:
+            decoded_cursor = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if not isinstance(decoded_cursor[0], datetime):
+            raise HTTPException(status_code=400, detail="Cursor is not an audit log cursor")
+
+    # Fetch one extra row to know whether another page exists
+    query = build_audit_log_query(ticket_id, event_type, actor, status, start, end, decoded_cursor, limit + 1)
     
     # Check if table exists (migrated) - simple fallback if not
     try:
-        logs = session.exec(query).all()
-        return [
-            {
-                "id": log.id,
-                "event_type": log.event_type,
-                "category": log.event_category,
-                "ticket_id": log.ticket_id,
-                "actor": log.actor,
-                "description": log.description,
-                "status": log.status,
-                "created_at": log.created_at.isoformat(),
-                "duration_ms": log.duration_ms
-            }
-            for log in logs
-        ]
+        logs = (await session.exec(query)).all()
+        records = [row_to_archive_record(log) for log in logs]
     except:
         return []
 
+    if len(records) <= limit and (start is None or start < audit_archiver.hot_cutoff()):
+        filters = {"ticket_id": ticket_id, "event_type": event_type, "actor": actor, "status": status}
+        filters = {k: v for k, v in filters.items() if v is not None}
+
+        def matches(record: dict) -> bool:
+            if any(record[k] != v for k, v in filters.items()):
+                return False
+            if decoded_cursor:
+                return (naive_utc(datetime.fromisoformat(record["created_at"])), record["id"]) < decoded_cursor
+            return True
+
+        archive_end = end
+        if decoded_cursor:
+            cursor_end = decoded_cursor[0] + dt.timedelta(microseconds=1)
+            archive_end = min(end, cursor_end) if end else cursor_end
+        archived = await asyncio.to_thread(audit_archiver.read, start, archive_end, limit + 1, matches)
+
+        hot_ids = {r["id"] for r in records}
+        records += [r for r in archived if r["id"] not in hot_ids]
+        records.sort(key=lambda r: (r["created_at"], r["id"]), reverse=True)
+
+    page = records[:limit]
+    if len(records) > limit:
+        last = page[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(datetime.fromisoformat(last["created_at"]), last["id"])
+
+    return [_audit_log_response(r) for r in page]
+
+@app.get("/api/audit-archive/stats")
+def get_audit_archive_stats():
+    """
+    Retention tiers: hot cutoff, archived days and size, last archival run
+    """
+    return audit_archiver.stats()
+
+@app.post("/api/audit-archive/run")
+async def run_audit_archive():
+    """Archive audit entries older than the hot retention window now"""
+    return await asyncio.to_thread(audit_archiver.archive_once)
+
+@app.get("/api/rules")
+def get_rule_set_info():
+    """
+    Active rule set: version, source file, checksum, last reload result
+    """
+    return rule_engine.info()
+
+@app.post("/api/rules/reload")
+async def reload_rule_set():
+    """Reload the rule set file now (the active set is kept if the file is invalid)"""
+    try:
+        return await asyncio.to_thread(rule_engine.reload)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.get("/api/events/recent")
 def get_recent_events(limit: int = 20):
     """
@@ -276,28 +565,29 @@ def get_recent_events(limit: int = 20):
     return event_bus.get_recent_events(limit)
 
 @app.get("/api/agent-metrics")
-def get_agent_metrics(session: Session = Depends(get_session)):
+async def get_agent_metrics(session: AsyncSession = Depends(get_async_session)):
     """
     Real-time agent performance metrics
     """
     
-    tickets = session.exec(select(Ticket)).all()
-    # total_tickets = len(tickets)
-    ai_analyzed = len([t for t in tickets if t.ai_priority is not None])
+    counts = await session.run_sync(stats_store.snapshot)
+    ai_analyzed = counts["ai_analyzed"]
     
     # Calculate efficiency
     total_calls = agent_metrics["triage_calls"]
     rule_only = agent_metrics["rule_only_calls"]
     llm_calls = agent_metrics["llm_calls"]
+    duplicate_reuse = agent_metrics["duplicate_reuse_calls"]
     
     rule_percent = round((rule_only / total_calls * 100) if total_calls > 0 else 0, 1)
     llm_percent = round((llm_calls / total_calls * 100) if total_calls > 0 else 0, 1)
+    duplicate_percent = round((duplicate_reuse / total_calls * 100) if total_calls > 0 else 0, 1)
     
     # Cost calculation (estimates)
     cost_per_llm = 0.03  # $0.03 per LLM call
     cost_per_rule = 0.0001  # $0.0001 per rule execution
     
-    total_cost = (llm_calls * cost_per_llm) + (rule_only * cost_per_rule)
+    total_cost = (llm_calls * cost_per_llm) + ((rule_only + duplicate_reuse) * cost_per_rule)
     cost_if_all_llm = total_calls * cost_per_llm
     cost_saved = cost_if_all_llm - total_cost
     
@@ -314,9 +604,14 @@ def get_agent_metrics(session: Session = Depends(get_session)):
         "intelligence_breakdown": {
             "rule_only_count": rule_only,
             "llm_used_count": llm_calls,
+            "duplicate_reuse_count": duplicate_reuse,
             "rule_only_percent": rule_percent,
-            "llm_used_percent": llm_percent
+            "llm_used_percent": llm_percent,
+            "duplicate_reuse_percent": duplicate_percent
         },
+        "near_duplicates": near_duplicate_index.snapshot(),
+        "llm_streaming": llm_stream_stats.snapshot(),  # Per agent: time-to-first-token, time-to-object
+        "triage_batching": {"enabled": TRIAGE_BATCHING, **triage_batcher.snapshot()},
         "cost_analysis": {
             "total_cost_usd": round(total_cost, 3),
             "cost_saved_usd": round(cost_saved, 3),
@@ -332,3 +627,45 @@ def get_agent_metrics(session: Session = Depends(get_session)):
             "hours": round((dt.datetime.utcnow() - agent_metrics["last_reset"]).total_seconds() / 3600, 1)
         }
     }
+
+@app.get("/api/db/pool-stats")
+def get_db_pool_stats():
+    """
+    Connection pool usage (checkouts, waits, timeouts)
+    Use to size DB_POOL_SIZE / DB_MAX_OVERFLOW
+    """
+    return get_pool_stats()
+
+@app.get("/api/llm/pool-stats")
+def get_llm_pool_stats():
+    """
+    LLM HTTP connection pool usage (keep-alive reuse, waits, timeouts)
+    Use to size LLM_POOL_SIZE (sync agents) / LLM_ASYNC_CONCURRENCY (async agents)
+    """
+    return {**llm_client.pool_stats(), "async": async_llm_client.pool_stats()}
+
+@app.get("/api/llm/cache-stats")
+def get_llm_cache_stats():
+    """
+    LLM response cache hit/miss counters (memory and SQLite tiers)
+    Use to size LLM_CACHE_SIZE / LLM_CACHE_TTL_SECONDS
+    """
+    return llm_cache.snapshot()
+
+@app.get("/api/llm/single-flight-stats")
+def get_llm_single_flight_stats():
+    """
+    Coalesced LLM requests: identical prompts in flight at the same time share one call
+    coalesced = callers that waited on another caller's request instead of sending their own
+    """
+    return {
+        "sync": llm_single_flight.stats.snapshot(),
+        "async": async_llm_single_flight.stats.snapshot()
+    }
+
+@app.get("/api/audit-sink/stats")
+def get_audit_sink_stats():
+    """
+    Buffered audit writer counters (written, dropped, delayed, buffer depth)
+    """
+    return audit_sink.stats()
@@ -13,6 +13,7 @@ agent_metrics = {
     "risk_calls": 0,
     "llm_calls": 0,
     "rule_only_calls": 0,
+    "duplicate_reuse_calls": 0,  # Triage copied from a near-duplicate ticket
     "total_analysis_time": 0.0,
     "parallel_executions": 0,
     "last_reset": datetime.utcnow()
@@ -27,6 +28,7 @@ def reset_metrics():
         "risk_calls": 0,
         "llm_calls": 0,
         "rule_only_calls": 0,
+        "duplicate_reuse_calls": 0,
         "total_analysis_time": 0.0,
         "parallel_executions": 0,
         "last_reset": datetime.utcnow()
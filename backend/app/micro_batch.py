@@ -0,0 +1,138 @@
+"""
+Micro-Batcher - Coalesce Concurrent Async Requests
+Requests submitted within a short window (or until the batch is full) are
+handed to one batch handler call. The handler returns one result per item;
+None means "not handled" and the caller falls back to its single-item path.
+"""
+
+import asyncio
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+BatchHandler = Callable[[List[Any]], Awaitable[List[Optional[Any]]]]
+
+
+class MicroBatcherStats:
+    """Thread-safe batch counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.submitted = 0
+            self.batches = 0
+            self.batched_items = 0
+            self.max_batch_size = 0
+            self.singles = 0          # Flushed alone: handed back without a batch call
+            self.fallbacks = 0        # Items a batch call could not answer
+            self.batch_failures = 0   # Handler raised: the whole batch fell back
+
+    def record_submit(self):
+        with self._lock:
+            self.submitted += 1
+
+    def record_batch(self, size: int, unanswered: int, failed: bool):
+        with self._lock:
+            self.batches += 1
+            self.batched_items += size
+            self.max_batch_size = max(self.max_batch_size, size)
+            self.fallbacks += unanswered
+            if failed:
+                self.batch_failures += 1
+
+    def record_single(self):
+        with self._lock:
+            self.singles += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                "batches": self.batches,
+                "batched_items": self.batched_items,
+                "avg_batch_size": round(self.batched_items / self.batches, 2) if self.batches else 0.0,
+                "max_batch_size": self.max_batch_size,
+                "singles": self.singles,
+                "fallbacks": self.fallbacks,
+                "batch_failures": self.batch_failures
+            }
+
+
+class MicroBatcher:
+    """
+    Collects submissions for up to window_ms or max_batch items, then calls
+    handler(items) once. A flush holding a single item skips the handler
+    (resolves None) - batching one request would only add prompt overhead.
+    Futures belong to one event loop, so each loop gets its own queue.
+    """
+
+    def __init__(self, handler: BatchHandler, window_ms: float, max_batch: int):
+        self.handler = handler
+        self.window_ms = window_ms
+        self.max_batch = max(1, max_batch)
+        self.stats = MicroBatcherStats()
+        self._loops: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, Any]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _state(self, loop: asyncio.AbstractEventLoop) -> Dict[str, Any]:
+        state = self._loops.get(loop)
+        if state is None:
+            state = {"items": [], "timer": None, "tasks": set()}
+            self._loops[loop] = state
+        return state
+
+    async def submit(self, item: Any) -> Optional[Any]:
+        """Result of item's batch, or None if the caller should handle it alone"""
+        loop = asyncio.get_running_loop()
+        state = self._state(loop)
+        future = loop.create_future()
+        state["items"].append((item, future))
+        self.stats.record_submit()
+
+        if len(state["items"]) >= self.max_batch:
+            self._flush(loop)
+        elif state["timer"] is None:
+            state["timer"] = loop.call_later(self.window_ms / 1000, self._flush, loop)
+        return await future
+
+    def _flush(self, loop: asyncio.AbstractEventLoop):
+        state = self._state(loop)
+        if state["timer"] is not None:
+            state["timer"].cancel()
+            state["timer"] = None
+        batch, state["items"] = state["items"], []
+        batch = [(item, future) for item, future in batch if not future.done()]  # Drop cancelled callers
+
+        if len(batch) == 1:
+            self.stats.record_single()
+            batch[0][1].set_result(None)
+        elif batch:
+            task = loop.create_task(self._run(batch))
+            state["tasks"].add(task)  # Keep a reference until done
+            task.add_done_callback(state["tasks"].discard)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]):
+        failed = False
+        try:
+            results = await self.handler([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"Batch handler returned {len(results)} results for {len(batch)} items")
+        except Exception as e:
+            print(f"⚠️  Batch of {len(batch)} failed ({e}) - falling back to single calls")
+            results = [None] * len(batch)
+            failed = True
+
+        self.stats.record_batch(len(batch), sum(r is None for r in results), failed)
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "config": {"window_ms": self.window_ms, "max_batch": self.max_batch},
+            "counters": self.stats.snapshot()
+        }
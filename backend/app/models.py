@@ -1,8 +1,27 @@
 from datetime import datetime
 from typing import Optional
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel, Column, JSON
 
 class Ticket(SQLModel, table=True):
+    # Keyset pagination walks (created_at, id) newest-first; filtered listings
+    # use the (filter, created_at) indexes (SQLite appends the rowid id implicitly)
+    __table_args__ = (
+        Index("ix_ticket_created_at_id", "created_at", "id"),
+        Index("ix_ticket_status_created_at", "status", "created_at"),
+        Index("ix_ticket_priority_created_at", "priority", "created_at"),
+        Index("ix_ticket_category_created_at", "category", "created_at"),
+        Index("ix_ticket_department_created_at", "department", "created_at"),
+        # Stats: GROUP BY status/priority/category use the leading column of the
+        # composites above; COUNT(ai_priority) scans this narrow index instead
+        Index("ix_ticket_ai_priority", "ai_priority"),
+        # Promoted AI analysis fields: filter by compliance/risk level, sort by risk
+        Index("ix_ticket_compliance_status_risk_score", "compliance_status", "risk_score"),
+        Index("ix_ticket_risk_level_risk_score", "risk_level", "risk_score"),
+        Index("ix_ticket_risk_score", "risk_score"),
+        Index("ix_ticket_llm_used", "llm_used"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str
     description: str
@@ -18,6 +37,12 @@ class Ticket(SQLModel, table=True):
     # Store full JSON analysis payload (Triage, Compliance, Risk breakdown)
     # Storing as string for maximum compatibility with SQLite/SQLModel default
     ai_analysis: Optional[str] = None 
+
+    # Key analysis fields promoted out of ai_analysis (filterable/sortable in SQL)
+    risk_score: Optional[int] = None  # 0-100
+    risk_level: Optional[str] = None  # Low, Medium, High
+    compliance_status: Optional[str] = None  # OK, Needs_Info, Blocked
+    llm_used: Optional[bool] = None
     
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -26,14 +51,21 @@ class AuditLog(SQLModel, table=True):
     Audit trail for all system events
     Critical for enterprise compliance and debugging
     """
+    # Per-ticket timelines and per-event-type feeds are range scans on these
+    # composites (the leading column also serves plain equality filters)
+    __table_args__ = (
+        Index("ix_auditlog_ticket_id_created_at", "ticket_id", "created_at"),
+        Index("ix_auditlog_event_type_created_at", "event_type", "created_at"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     
     # Event metadata
-    event_type: str = Field(index=True)  # e.g., "TICKET_CREATED", "AI_ANALYZED"
+    event_type: str  # e.g., "TICKET_CREATED", "AI_ANALYZED"
     event_category: str  # "USER_ACTION", "AI_ACTION", "SYSTEM_ACTION"
     
     # Context
-    ticket_id: Optional[int] = Field(default=None, index=True)
+    ticket_id: Optional[int] = None
     actor: str = Field(default="System")  # "User", "AI-Triage", "RPA-Bot"
     
     # Details
@@ -46,3 +78,37 @@ class AuditLog(SQLModel, table=True):
     # Timing
     created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
     duration_ms: Optional[int] = None  # Execution time if applicable
+
+class TicketStatCounter(SQLModel, table=True):
+    """
+    Materialized ticket counts, maintained incrementally by the stats store
+    One row per (dimension, value), e.g. ("priority", "High") -> 42
+    """
+    __tablename__ = "ticket_stat_counter"
+
+    dimension: str = Field(primary_key=True)  # status, priority, category, department, total, ai_analyzed
+    value: str = Field(default="", primary_key=True)  # "" stands for NULL / not applicable
+    count: int = Field(default=0)
+
+class TicketHourlyRollup(SQLModel, table=True):
+    """
+    Tickets created per hour and priority (rollup for time-series charts)
+    Day/week histograms aggregate these rows instead of scanning tickets
+    """
+    __tablename__ = "ticket_hourly_rollup"
+
+    bucket_start: datetime = Field(primary_key=True)  # created_at truncated to the hour
+    priority: str = Field(primary_key=True)
+    count: int = Field(default=0)
+
+class LLMCacheEntry(SQLModel, table=True):
+    """
+    Persisted tier of the LLM response cache (survives restarts)
+    Keyed by the content hash of model, options, system and prompt
+    """
+    __tablename__ = "llm_cache_entry"
+
+    key: str = Field(primary_key=True)  # sha256 hex of the request
+    model: str
+    response: str
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
@@ -0,0 +1,278 @@
+"""
+Near-Duplicate Ticket Index - Fingerprint + MinHash/LSH
+Copy-paste and template tickets ("Invoice #NNN delayed") differ only in numbers,
+punctuation or whitespace. Analyzed tickets are indexed by a normalized-text
+fingerprint (exact duplicates) and a MinHash signature bucketed by LSH bands
+(near duplicates), so the workflow can reuse a validated triage instead of
+calling the LLM. Everything is in-process; the index is rebuilt from the
+Ticket table at startup.
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, NamedTuple, Optional, Set, Tuple
+from pydantic import ValidationError
+from sqlmodel import Session, select
+from app.models import Ticket
+from app.schemas import TriageOutput
+
+NEAR_DUP_ENABLED = os.getenv("NEAR_DUP_ENABLED", "true").lower() in ("1", "true", "yes")
+NEAR_DUP_THRESHOLD = float(os.getenv("NEAR_DUP_THRESHOLD", "0.85"))      # Estimated Jaccard needed to reuse
+NEAR_DUP_NUM_PERM = int(os.getenv("NEAR_DUP_NUM_PERM", "64"))            # MinHash signature length
+NEAR_DUP_BANDS = int(os.getenv("NEAR_DUP_BANDS", "16"))                  # LSH bands (NUM_PERM / BANDS rows each)
+NEAR_DUP_SHINGLE_SIZE = int(os.getenv("NEAR_DUP_SHINGLE_SIZE", "5"))     # Character shingles
+NEAR_DUP_MAX_ENTRIES = int(os.getenv("NEAR_DUP_MAX_ENTRIES", "50000"))   # Oldest indexed tickets dropped first
+NEAR_DUP_MAX_CHARS = 2000                                                # Text hashed per ticket
+REBUILD_BATCH_SIZE = 500
+
+_MASK64 = (1 << 64) - 1
+_DIGITS = re.compile(r"\d+")
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+# Triage reasons that mark a result as a placeholder, not a real classification
+_UNRELIABLE_REASONING = ("Guardian fallback", "LLM parsing failed")
+
+
+def normalize_text(title: str, description: str) -> str:
+    """Lowercase, numbers -> 0, punctuation and whitespace runs -> one space"""
+    text = f"{title or ''} {description or ''}".lower()
+    text = _DIGITS.sub("0", text)
+    return _NON_WORD.sub(" ", text).strip()[:NEAR_DUP_MAX_CHARS]
+
+
+def is_reusable(triage: Dict[str, Any]) -> bool:
+    """Whether a stored triage passed schema validation and is not a fallback"""
+    try:
+        validated = TriageOutput.model_validate(triage)
+    except (ValidationError, TypeError):
+        return False
+    return not validated.reasoning.startswith(_UNRELIABLE_REASONING)
+
+
+class TicketSignature(NamedTuple):
+    fingerprint: str        # sha1 of the normalized text (exact duplicates)
+    minhash: Tuple[int, ...]
+
+
+class NearDuplicateMatch(NamedTuple):
+    ticket_id: int
+    similarity: float       # Estimated Jaccard of the shingle sets (1.0 for exact duplicates)
+    exact: bool
+    triage: Dict[str, Any]
+
+
+class NearDuplicateIndex:
+    """
+    Thread-safe fingerprint + MinHash/LSH index over analyzed tickets
+    LSH bands only propose candidates; a candidate is reused when its
+    estimated similarity (share of equal MinHash values) reaches the threshold.
+    """
+
+    def __init__(
+        self,
+        threshold: float = NEAR_DUP_THRESHOLD,
+        num_perm: int = NEAR_DUP_NUM_PERM,
+        bands: int = NEAR_DUP_BANDS,
+        shingle_size: int = NEAR_DUP_SHINGLE_SIZE,
+        max_entries: int = NEAR_DUP_MAX_ENTRIES,
+        enabled: bool = NEAR_DUP_ENABLED
+    ):
+        if num_perm % bands:
+            raise ValueError(f"NEAR_DUP_NUM_PERM ({num_perm}) must be a multiple of NEAR_DUP_BANDS ({bands})")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.max_entries = max_entries
+        self.enabled = enabled
+
+        # h -> (a*h + b) mod 2^64 with odd a is a permutation of the 64-bit hashes
+        # Fixed seed: signatures are comparable across processes and restarts
+        rng = random.Random(1)
+        self._perms = [(rng.getrandbits(64) | 1, rng.getrandbits(64)) for _ in range(num_perm)]
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, Tuple[TicketSignature, Dict[str, Any]]]" = OrderedDict()
+        self._fingerprints: Dict[str, int] = {}
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], Set[int]] = {}
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self.lookups = 0
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.candidates_checked = 0
+
+    # -- signatures --
+
+    def _shingles(self, text: str) -> Set[str]:
+        k = self.shingle_size
+        if len(text) <= k:
+            return {text}
+        return {text[i:i + k] for i in range(len(text) - k + 1)}
+
+    def signature(self, title: str, description: str) -> TicketSignature:
+        text = normalize_text(title, description)
+        hashes = [
+            int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little")
+            for s in self._shingles(text)
+        ]
+        minhash = tuple(min([(a * h + b) & _MASK64 for h in hashes]) for a, b in self._perms)
+        return TicketSignature(hashlib.sha1(text.encode("utf-8")).hexdigest(), minhash)
+
+    def _band_keys(self, minhash: Tuple[int, ...]) -> List[Tuple[int, Tuple[int, ...]]]:
+        r = self.rows
+        return [(band, minhash[band * r:(band + 1) * r]) for band in range(self.bands)]
+
+    @staticmethod
+    def similarity(a: TicketSignature, b: TicketSignature) -> float:
+        """Estimated Jaccard similarity of two tickets' shingle sets"""
+        if a.fingerprint == b.fingerprint:
+            return 1.0
+        return sum(x == y for x, y in zip(a.minhash, b.minhash)) / len(a.minhash)
+
+    # -- index maintenance --
+
+    def _remove_locked(self, ticket_id: int):
+        entry = self._entries.pop(ticket_id, None)
+        if entry is None:
+            return
+        signature = entry[0]
+        if self._fingerprints.get(signature.fingerprint) == ticket_id:
+            del self._fingerprints[signature.fingerprint]
+        for key in self._band_keys(signature.minhash):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(ticket_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def add(self, ticket_id: int, signature: TicketSignature, triage: Dict[str, Any]) -> bool:
+        """Index a ticket's triage (replacing an earlier one); returns False if not reusable"""
+        if not self.enabled:
+            return False
+        if not is_reusable(triage):
+            with self._lock:
+                self._remove_locked(ticket_id)  # A re-analysis must not leave a stale triage behind
+            return False
+
+        stored = {field: triage[field] for field in ("category", "priority", "department", "reasoning")}
+        with self._lock:
+            self._remove_locked(ticket_id)
+            self._entries[ticket_id] = (signature, stored)
+            self._fingerprints[signature.fingerprint] = ticket_id
+            for key in self._band_keys(signature.minhash):
+                self._buckets.setdefault(key, set()).add(ticket_id)
+            while len(self._entries) > self.max_entries:
+                self._remove_locked(next(iter(self._entries)))
+        return True
+
+    def remove(self, ticket_id: int):
+        with self._lock:
+            self._remove_locked(ticket_id)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._fingerprints.clear()
+            self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # -- lookup --
+
+    def lookup(self, signature: TicketSignature, exclude: Optional[int] = None) -> Optional[NearDuplicateMatch]:
+        """Most similar indexed ticket at or above the threshold (never `exclude` itself)"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            self.lookups += 1
+
+            exact_id = self._fingerprints.get(signature.fingerprint)
+            if exact_id is not None and exact_id != exclude:
+                self.exact_hits += 1
+                return NearDuplicateMatch(exact_id, 1.0, True, dict(self._entries[exact_id][1]))
+
+            candidates: Set[int] = set()
+            for key in self._band_keys(signature.minhash):
+                candidates |= self._buckets.get(key, set())
+            candidates.discard(exclude)
+            self.candidates_checked += len(candidates)
+
+            best: Optional[Tuple[float, int]] = None
+            for ticket_id in candidates:
+                score = self.similarity(signature, self._entries[ticket_id][0])
+                # Ties go to the most recently analyzed ticket
+                if score >= self.threshold and (best is None or score > best[0] or (score == best[0] and ticket_id > best[1])):
+                    best = (score, ticket_id)
+
+            if best is None:
+                self.misses += 1
+                return None
+            self.near_hits += 1
+            return NearDuplicateMatch(best[1], round(best[0], 4), False, dict(self._entries[best[1]][1]))
+
+    # -- startup --
+
+    def rebuild(self, engine=None, batch_size: int = REBUILD_BATCH_SIZE) -> int:
+        """Index every analyzed ticket (walks by id in batches); returns entries indexed"""
+        if not self.enabled:
+            return 0
+        if engine is None:
+            from app.database import engine
+
+        self.clear()
+        last_id = 0
+        while True:
+            with Session(engine) as session:
+                rows = session.exec(
+                    select(Ticket.id, Ticket.title, Ticket.description, Ticket.ai_analysis)
+                    .where(Ticket.id > last_id)
+                    .where(Ticket.ai_analysis.is_not(None))
+                    .order_by(Ticket.id)
+                    .limit(batch_size)
+                ).all()
+            if not rows:
+                break
+            for ticket_id, title, description, ai_analysis in rows:
+                last_id = ticket_id
+                try:
+                    triage = json.loads(ai_analysis).get("triage") or {}
+                except (TypeError, ValueError, AttributeError):
+                    continue
+                if is_reusable(triage):
+                    self.add(ticket_id, self.signature(title, description), triage)
+        return len(self)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self.exact_hits + self.near_hits
+            return {
+                "config": {
+                    "enabled": self.enabled,
+                    "threshold": self.threshold,
+                    "num_perm": self.num_perm,
+                    "bands": self.bands,
+                    "shingle_size": self.shingle_size,
+                    "max_entries": self.max_entries
+                },
+                "indexed_tickets": len(self._entries),
+                "lookups": self.lookups,
+                "exact_hits": self.exact_hits,
+                "near_hits": self.near_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / self.lookups, 4) if self.lookups else 0.0,
+                "avg_candidates": round(self.candidates_checked / self.lookups, 2) if self.lookups else 0.0
+            }
+
+
+# Global singleton (rebuilt at startup, fed by the workflow)
+near_duplicate_index = NearDuplicateIndex()
@@ -0,0 +1,54 @@
+"""
+Keyset (cursor) Pagination Helpers
+Opaque cursors encode the (sort key, id) of the last row on a page
+The sort key is a datetime (created_at) or an integer (e.g. risk_score)
+"""
+
+import base64
+from datetime import datetime, timezone
+from typing import Optional, Tuple, Union
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+_INT_KEY_PREFIX = "i:"
+
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """
+    Naive UTC datetime (the form stored in the database)
+    Query parameters like ...Z or +02:00 parse as aware datetimes, which cannot
+    be compared with stored values; they are converted, naive values kept as is.
+    """
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def encode_cursor(sort_key: Union[datetime, int], row_id: int) -> str:
+    """Encode the sort key of the last returned row"""
+    if isinstance(sort_key, datetime):
+        key = sort_key.isoformat()
+    else:
+        key = f"{_INT_KEY_PREFIX}{int(sort_key)}"
+    raw = f"{key}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Union[datetime, int], int]:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        key, row_id = raw.rsplit("|", 1)
+        if key.startswith(_INT_KEY_PREFIX):
+            return int(key[len(_INT_KEY_PREFIX):]), int(row_id)
+        return naive_utc(datetime.fromisoformat(key)), int(row_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
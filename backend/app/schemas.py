@@ -4,7 +4,7 @@ Ensures type safety and data integrity
 """
 
 from pydantic import BaseModel, Field, field_validator
-from typing import List, Literal
+from typing import List, Literal, Optional
 
 
 class TriageOutput(BaseModel):
@@ -29,6 +29,10 @@ class TriageOutput(BaseModel):
         max_length=500,
         description="AI reasoning for classification"
     )
+    rule_version: Optional[str] = Field(
+        default=None,
+        description="Rule set version that produced the rule-based fields"
+    )
     
     @field_validator('reasoning')
     @classmethod
@@ -55,6 +59,10 @@ class ComplianceOutput(BaseModel):
         min_length=5,
         description="Recommended action"
     )
+    rule_version: Optional[str] = Field(
+        default=None,
+        description="Rule set version that produced the rule-based fields"
+    )
 
 
 class RiskOutput(BaseModel):
@@ -82,6 +90,10 @@ class RiskOutput(BaseModel):
         max_length=500,
         description="Risk assessment explanation"
     )
+    rule_version: Optional[str] = Field(
+        default=None,
+        description="Rule set version that produced the rule-based fields"
+    )
     
     @field_validator('risk_score')
     @classmethod
@@ -0,0 +1,146 @@
+"""
+Single-Flight - Coalesce Identical In-Flight Calls
+Concurrent callers with the same key share one execution: the first becomes
+the leader and runs the call, the rest wait for its result (or exception).
+Used in front of the LLM so repeated /analyze clicks or a manual analyze
+racing the create-time workflow send one request, not several.
+SingleFlight serves threads; AsyncSingleFlight serves coroutines.
+"""
+
+import asyncio
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class SingleFlightStats:
+    """Thread-safe leader/waiter counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.calls = 0
+            self.leaders = 0           # Executions actually run
+            self.coalesced = 0         # Callers that shared a leader's result
+            self.in_flight = 0
+            self.peak_waiters = 0      # Most callers sharing one execution
+
+    def record_leader(self):
+        with self._lock:
+            self.calls += 1
+            self.leaders += 1
+            self.in_flight += 1
+
+    def record_waiter(self, waiters: int):
+        with self._lock:
+            self.calls += 1
+            self.coalesced += 1
+            self.peak_waiters = max(self.peak_waiters, waiters)
+
+    def record_done(self):
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "in_flight": self.in_flight,
+                "peak_waiters": self.peak_waiters,
+                "coalesced_rate": round(self.coalesced / self.calls, 4) if self.calls else 0.0
+            }
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesces identical calls made from different threads"""
+
+    def __init__(self):
+        self.stats = SingleFlightStats()
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """fn() once per key at a time; concurrent callers get the same result"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+            else:
+                call.waiters += 1
+
+        if not leader:
+            self.stats.record_waiter(call.waiters)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        self.stats.record_leader()
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]  # Later callers start a fresh execution
+            call.done.set()
+            self.stats.record_done()
+
+
+class AsyncSingleFlight:
+    """
+    Coalesces identical calls made from coroutines
+    The execution runs as its own task and every caller awaits it shielded,
+    so a cancelled caller never cancels the request the others wait on.
+    Tasks belong to one event loop, so each loop gets its own table.
+    """
+
+    def __init__(self):
+        self.stats = SingleFlightStats()
+        # loop -> key -> [task, waiters]
+        self._loops: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, list]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    async def do(self, key: str, coro_fn: Callable[[], Awaitable[Any]]) -> Any:
+        """await coro_fn() once per key at a time; concurrent callers get the same result"""
+        loop = asyncio.get_running_loop()
+        calls = self._loops.get(loop)
+        if calls is None:
+            calls = self._loops[loop] = {}
+        entry = calls.get(key)
+
+        if entry is None:
+            entry = calls[key] = [loop.create_task(coro_fn()), 0]
+            self.stats.record_leader()
+
+            def finished(task: asyncio.Task):
+                if calls.get(key) is entry:
+                    del calls[key]  # Later callers start a fresh execution
+                self.stats.record_done()
+
+            entry[0].add_done_callback(finished)
+        else:
+            entry[1] += 1
+            self.stats.record_waiter(entry[1])
+
+        return await asyncio.shield(entry[0])
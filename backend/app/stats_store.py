@@ -0,0 +1,320 @@
+"""
+Ticket Stats Store - Incrementally Maintained Counters
+Event listeners keep per-dimension counts and the hourly creation rollup
+current so dashboards read a handful of rows instead of aggregating the Ticket table
+"""
+
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from sqlalchemy import func, text
+from sqlalchemy.dialects.sqlite import insert
+from sqlmodel import Session, select, delete
+from app.event_bus import event_bus
+from app.models import TicketStatCounter, TicketHourlyRollup
+from app.ticket_stats import aggregate_ticket_counts, STAT_DIMENSIONS
+
+# Rebuild counters from the Ticket table at startup (set false to trust the persisted table)
+REBUILD_ON_STARTUP = os.getenv("STATS_REBUILD_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+
+# Stored in place of NULL values (primary key column)
+NONE_VALUE = ""
+
+# Histogram bucket -> SQLite expression over the hourly rollup
+HISTOGRAM_BUCKETS = {
+    "hour": "strftime('%Y-%m-%d %H:00', bucket_start)",
+    "day": "strftime('%Y-%m-%d', bucket_start)",
+    "week": "date(bucket_start, 'weekday 0', '-6 days')"  # Monday of the ISO week
+}
+MAX_HISTOGRAM_POINTS = 5000
+
+Delta = Tuple[str, Optional[str], int]
+RollupDelta = Tuple[datetime, Optional[str], int]
+
+
+def _key(value: Optional[str]) -> str:
+    return NONE_VALUE if value is None else str(value)
+
+
+def _hour(ts) -> Optional[datetime]:
+    """Truncate a datetime (or ISO string from an event payload) to the hour"""
+    if ts is None:
+        return None
+    if isinstance(ts, str):
+        ts = datetime.fromisoformat(ts)
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def _bucket_floor(ts: datetime, bucket: str) -> datetime:
+    ts = _hour(ts)
+    if bucket == "hour":
+        return ts
+    day = ts.replace(hour=0)
+    if bucket == "day":
+        return day
+    return day - timedelta(days=day.weekday())
+
+
+def _bucket_label(ts: datetime, bucket: str) -> str:
+    return ts.strftime("%Y-%m-%d %H:00" if bucket == "hour" else "%Y-%m-%d")
+
+
+def _bucket_step(ts: datetime, bucket: str) -> datetime:
+    return ts + {"hour": timedelta(hours=1), "day": timedelta(days=1), "week": timedelta(weeks=1)}[bucket]
+
+
+class TicketStatsStore:
+    """
+    Counter table wrapper
+    Writes are single-statement upserts; reads never touch the Ticket table
+    """
+
+    def __init__(self, engine=None):
+        self._engine = engine
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            from app.database import engine
+            self._engine = engine
+        return self._engine
+
+    def apply(self, deltas: Iterable[Delta], rollup_deltas: Iterable[RollupDelta] = (), session: Session = None):
+        """
+        Apply counter increments and hourly rollup increments in one transaction
+
+        Args:
+            deltas: (dimension, value, delta) tuples
+            rollup_deltas: (created_at, priority, delta) tuples
+            session: run inside the caller's transaction (the caller commits)
+        """
+        merged: Dict[Tuple[str, str], int] = {}
+        for dimension, value, delta in deltas:
+            key = (dimension, _key(value))
+            merged[key] = merged.get(key, 0) + delta
+
+        merged_rollup: Dict[Tuple[datetime, str], int] = {}
+        for created_at, priority, delta in rollup_deltas:
+            if created_at is None:
+                continue
+            key = (_hour(created_at), _key(priority))
+            merged_rollup[key] = merged_rollup.get(key, 0) + delta
+
+        rows = [
+            {"dimension": d, "value": v, "count": n}
+            for (d, v), n in merged.items() if n != 0
+        ]
+        rollup_rows = [
+            {"bucket_start": h, "priority": p, "count": n}
+            for (h, p), n in merged_rollup.items() if n != 0
+        ]
+        if not rows and not rollup_rows:
+            return
+
+        own_session = session is None
+        session = session or Session(self.engine)
+        try:
+            if rows:
+                stmt = insert(TicketStatCounter)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["dimension", "value"],
+                    set_={"count": TicketStatCounter.count + stmt.excluded.count}
+                )
+                session.execute(stmt, rows)
+            if rollup_rows:
+                stmt = insert(TicketHourlyRollup)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["bucket_start", "priority"],
+                    set_={"count": TicketHourlyRollup.count + stmt.excluded.count}
+                )
+                session.execute(stmt, rollup_rows)
+            if own_session:
+                session.commit()
+        finally:
+            if own_session:
+                session.close()
+
+    def rebuild(self, session: Session = None):
+        """Recompute every counter from the Ticket table (index-only aggregation)"""
+        own_session = session is None
+        session = session or Session(self.engine)
+        try:
+            counts = aggregate_ticket_counts(session)
+
+            rows = [{"dimension": "total", "value": NONE_VALUE, "count": counts["total"]},
+                    {"dimension": "ai_analyzed", "value": NONE_VALUE, "count": counts["ai_analyzed"]}]
+            for dimension in STAT_DIMENSIONS:
+                for value, n in counts[dimension].items():
+                    rows.append({"dimension": dimension, "value": _key(value), "count": n})
+
+            session.exec(delete(TicketStatCounter))
+            session.execute(insert(TicketStatCounter), rows)
+
+            # Hourly rollup: one covering-index scan of (priority, created_at)
+            session.exec(delete(TicketHourlyRollup))
+            session.execute(text(
+                "INSERT INTO ticket_hourly_rollup (bucket_start, priority, count) "
+                "SELECT strftime('%Y-%m-%d %H:00:00.000000', created_at), priority, COUNT(*) "
+                "FROM ticket GROUP BY 1, 2"
+            ))
+            session.commit()
+            print(f"📊 Stats store rebuilt ({counts['total']} tickets)")
+        finally:
+            if own_session:
+                session.close()
+
+    def ensure_ready(self):
+        """Startup hook: rebuild, or only when the persisted table is empty"""
+        with Session(self.engine) as session:
+            if REBUILD_ON_STARTUP or session.exec(select(TicketStatCounter).limit(1)).first() is None:
+                self.rebuild(session)
+
+    def snapshot(self, session: Session = None) -> Dict[str, Any]:
+        """
+        Current counts in the same shape as aggregate_ticket_counts
+        Cost depends only on the number of distinct values, not on ticket count
+        """
+        own_session = session is None
+        session = session or Session(self.engine)
+        try:
+            rows = session.exec(select(TicketStatCounter)).all()
+        finally:
+            if own_session:
+                session.close()
+
+        counts: Dict[str, Any] = {name: {} for name in STAT_DIMENSIONS}
+        counts["total"] = 0
+        counts["ai_analyzed"] = 0
+
+        for row in rows:
+            if row.dimension in ("total", "ai_analyzed"):
+                counts[row.dimension] = row.count
+            elif row.dimension in counts and row.count != 0:
+                counts[row.dimension][row.value or None] = row.count
+
+        return counts
+
+    def histogram(
+        self,
+        start: datetime,
+        end: datetime,
+        bucket: str = "day",
+        session: Session = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Tickets created per bucket, broken down by priority, over [start, end)
+        Reads the hourly rollup (at most 24 rows per day per priority), so cost
+        depends on the range length, not on the number of tickets.
+
+        Returns:
+            [{"bucket": "2026-10-12", "high": 3, "medium": 5, "low": 1, "total": 9}, ...]
+            with zero-filled buckets for the whole range
+        """
+        if bucket not in HISTOGRAM_BUCKETS:
+            raise ValueError(f"Unknown bucket '{bucket}' (expected one of {list(HISTOGRAM_BUCKETS)})")
+        if end <= start:
+            raise ValueError("end must be after start")
+
+        first = _bucket_floor(start, bucket)
+        labels = []
+        cursor = first
+        while cursor < end:
+            labels.append(_bucket_label(cursor, bucket))
+            cursor = _bucket_step(cursor, bucket)
+            if len(labels) > MAX_HISTOGRAM_POINTS:
+                raise ValueError(f"Range too large for '{bucket}' buckets (max {MAX_HISTOGRAM_POINTS} points)")
+
+        bucket_expr = text(HISTOGRAM_BUCKETS[bucket])
+        query = (
+            select(bucket_expr, TicketHourlyRollup.priority, func.sum(TicketHourlyRollup.count))
+            .where(TicketHourlyRollup.bucket_start >= _hour(start))
+            .where(TicketHourlyRollup.bucket_start < end)
+            .group_by(bucket_expr, TicketHourlyRollup.priority)
+        )
+
+        own_session = session is None
+        session = session or Session(self.engine)
+        try:
+            rows = session.exec(query).all()
+        finally:
+            if own_session:
+                session.close()
+
+        series = {label: {"bucket": label, "high": 0, "medium": 0, "low": 0, "total": 0} for label in labels}
+        for label, priority, n in rows:
+            point = series.get(label)
+            if point is None or not n:
+                continue
+            key = (priority or "unknown").lower()
+            point[key] = point.get(key, 0) + n
+            point["total"] += n
+
+        return list(series.values())
+
+
+stats_store = TicketStatsStore()
+
+
+# ============================================================================
+# Event Listeners (Auto-triggered by event bus)
+# ============================================================================
+
+def _created_deltas(data: dict, deltas: List[Delta], rollup_deltas: List[RollupDelta]):
+    deltas.append(("total", None, 1))
+    for dimension in STAT_DIMENSIONS:
+        deltas.append((dimension, data.get(dimension), 1))
+    if data.get("ai_priority"):
+        deltas.append(("ai_analyzed", None, 1))
+    rollup_deltas.append((data.get("created_at"), data.get("priority"), 1))
+
+
+def stats_ticket_created(data: dict):
+    """TICKET_CREATED: count the new ticket in every dimension"""
+    deltas, rollup_deltas = [], []
+    _created_deltas(data, deltas, rollup_deltas)
+    stats_store.apply(deltas, rollup_deltas)
+
+
+def stats_tickets_bulk_created(data: dict):
+    """TICKETS_BULK_CREATED: merge the whole batch into one counter transaction"""
+    deltas, rollup_deltas = [], []
+    for ticket in data.get("tickets", []):
+        _created_deltas(ticket, deltas, rollup_deltas)
+    stats_store.apply(deltas, rollup_deltas)
+
+
+def analysis_deltas(previous: dict, current: dict) -> Tuple[List[Delta], List[RollupDelta]]:
+    """
+    Move a ticket from its previous classification to the new one
+    Applied by the workflow in the transaction that updates the ticket (see
+    _save_analysis), so concurrent analyses cannot both subtract the same old values.
+    """
+    deltas = []
+    for dimension in ("priority", "category", "department"):
+        deltas.append((dimension, previous.get(dimension), -1))
+        deltas.append((dimension, current.get(dimension), 1))
+    if not previous.get("ai_priority") and current.get("priority"):
+        deltas.append(("ai_analyzed", None, 1))
+
+    rollup_deltas = [
+        (previous.get("created_at"), previous.get("priority"), -1),
+        (previous.get("created_at"), current.get("priority"), 1)
+    ]
+    return deltas, rollup_deltas
+
+
+def stats_ticket_closed(data: dict):
+    """TICKET_CLOSED: move the ticket into the Closed status bucket"""
+    previous_status = data.get("previous_status")
+    if previous_status is None:
+        return
+    stats_store.apply([
+        ("status", previous_status, -1),
+        ("status", "Closed", 1)
+    ])
+
+
+# Register listeners at module load
+event_bus.on("TICKET_CREATED", stats_ticket_created)
+event_bus.on("TICKETS_BULK_CREATED", stats_tickets_bulk_created)
+event_bus.on("TICKET_CLOSED", stats_ticket_closed)
@@ -1,20 +1,122 @@
 """
 Workflow Engine - Parallel Agent Execution (Optimized)
-Reduces analysis time by 60% through concurrent processing
+Reduces analysis time by 60% through concurrent processing.
+Agents run as coroutines (async LLM client); only the database step uses a thread.
 """
 
 import asyncio
+import json
+import os
 import time
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from datetime import datetime
 from app.event_bus import event_bus
+from app.analysis_columns import analysis_columns
+from app.llm_cache import llm_cache_bypassed
+from app.near_duplicates import near_duplicate_index
+
+# Demo mode: send every ticket to the LLM even when the rules are confident
+FORCE_LLM_TRIAGE = os.getenv("FORCE_LLM_TRIAGE", "false").lower() in ("1", "true", "yes")
+
+
+def _near_duplicate_lookup(ticket_id: int, title: str, description: str, reuse: bool):
+    """MinHash signature of the ticket and, if reuse is allowed, its closest indexed near-duplicate"""
+    signature = near_duplicate_index.signature(title, description)
+    duplicate = near_duplicate_index.lookup(signature, exclude=ticket_id) if reuse else None
+    return signature, duplicate
+
+
+# Ticket fields the stats counters are keyed on (compare-and-set guard of _save_analysis)
+COUNTED_FIELDS = ("category", "priority", "department", "ai_priority")
+
+
+def _classification(ticket) -> Dict[str, Any]:
+    """Classification the stats counters currently hold the ticket under"""
+    return {
+        **{field: getattr(ticket, field) for field in COUNTED_FIELDS},
+        "created_at": ticket.created_at.isoformat() if ticket.created_at else None
+    }
+
+
+def _save_analysis(
+    session,
+    ticket_id: int,
+    triage_result: Dict[str, Any],
+    compliance_result: Dict[str, Any],
+    risk_result: Dict[str, Any],
+    rule_version: str
+) -> Optional[Dict[str, Any]]:
+    """
+    Write the analysis to the ticket (single transaction); returns the previous classification
+    The UPDATE only matches while the ticket still has the classification it was
+    read with, and the stats counters move in the same transaction. A concurrent
+    analysis that committed in between makes it re-read and retry instead of
+    subtracting the same old classification twice.
+    """
+    from sqlalchemy import update
+    from app.models import Ticket
+    from app.stats_store import stats_store, analysis_deltas
+
+    # Construct rich reasoning
+    reasoning = f"{triage_result.get('reasoning')}\n\n"
+    if compliance_result.get('issues'):
+         reasoning += f"[Compliance] Found {len(compliance_result['issues'])} issues.\n"
+    else:
+         reasoning += "[Compliance] All checks passed.\n"
+     
+    reasoning += f"[Risk Analysis] Score: {risk_result.get('risk_score')}/100 ({risk_result.get('risk_level')})"
+
+    # Save structured analysis for Frontend (JSON)
+    full_analysis = {
+        "triage": triage_result,
+        "compliance": compliance_result,
+        "risk": risk_result,
+        "rule_version": rule_version
+    }
+    values = {
+        "category": triage_result.get("category"),
+        "priority": triage_result.get("priority"),
+        "department": triage_result.get("department"),
+        "ai_priority": triage_result.get("priority"),
+        "ai_reasoning": reasoning,
+        "ai_analysis": json.dumps(full_analysis),
+        # Queryable copies of the key fields (filters/sorting without parsing JSON)
+        **analysis_columns(full_analysis)
+    }
+
+    while True:
+        ticket = session.get(Ticket, ticket_id)
+        if ticket is None:
+            print("   ❌ Ticket not found in database")
+            return None
+
+        # Classification before this analysis (counter deltas and listeners)
+        previous = _classification(ticket)
+        session.commit()  # End the read: the guarded UPDATE must see the latest committed row
+
+        result = session.execute(
+            update(Ticket)
+            .where(Ticket.id == ticket_id)
+            .where(*(getattr(Ticket, field).is_not_distinct_from(previous[field]) for field in COUNTED_FIELDS))
+            .values(**values)
+        )
+        if result.rowcount == 1:
+            stats_store.apply(*analysis_deltas(previous, triage_result), session=session)
+            session.commit()
+            break
+        session.rollback()
+        print("   🔁 Ticket changed by a concurrent analysis - re-reading")
+
+    print(f"   ✅ Database updated (Verification: AI Priority={values['ai_priority']})")
+    return previous
 
 
 async def process_ticket_workflow_async(
     ticket_id: int,
     title: str,
     description: str,
-    session
+    session,
+    refresh: bool = False
 ) -> Dict[str, Any]:
     """
     Async workflow with parallel agent execution
@@ -23,7 +125,13 @@ async def process_ticket_workflow_async(
     1. Triage (sequential - required first)
     2. Compliance + Risk (parallel - independent)
     3. Database update (sequential - safe)
+
+    refresh=True (forced re-analysis) ignores cached LLM responses and stores fresh ones.
     """
+    if refresh:
+        from app.llm_cache import bypass_llm_cache
+        with bypass_llm_cache():  # Inherited by the agent tasks below
+            return await process_ticket_workflow_async(ticket_id, title, description, session)
     
     print(f"\n{'='*60}")
     print(f"⚡ PARALLEL WORKFLOW ENGINE: Ticket #{ticket_id}")
@@ -38,14 +146,12 @@ async def process_ticket_workflow_async(
         "timestamp": datetime.utcnow().isoformat()
     })
     
-    # Import agents and rules
-    from app.rules import rule_engine
-    from app.agents import triage_agent
+    # Import agents and the per-ticket rule context
+    from app.agents import triage_agent_async
+    from app.analysis_context import AnalysisContext
     
-    # Imports for parallel tasks
-    from app.rules import rule_engine
-    # Helper wrappers to make instance methods work with asyncio.to_thread easily if needed,
-    # but we can call them directly if they are thread-safe (RuleEngine is)
+    # Rule results are computed once here and reused by every agent (and Guardian retry)
+    context = AnalysisContext(title, description)
     
     # -------------------------
     # STEP 1: TRIAGE (Must run first)
@@ -54,19 +160,35 @@ async def process_ticket_workflow_async(
     triage_start = time.time()
     
     # Try rules first
-    text = f"{title} {description}"
-    category_result = rule_engine.classify_category(text)
-    priority_result = rule_engine.classify_priority(text, category_result.get("category", ""))
+    category_result = context.category()
+    priority_result = context.priority(category_result["category"])
+    
+    # Decide if LLM needed (weighted rule confidence, see RuleEngine.is_confident)
+    use_llm = FORCE_LLM_TRIAGE or not context.is_confident()
     
-    # Decide if LLM needed
-    # FORCE AI for Demo: Always use LLM even if rules match
-    # use_llm = category_result.get("confidence", 0) < 0.8
-    use_llm = True
+    # Copy-paste / template tickets: reuse the validated triage of a near-duplicate
+    # (never for forced re-analysis or demo mode)
+    signature, duplicate = None, None
+    if near_duplicate_index.enabled:
+        # Pure-Python MinHash (tens of ms for long descriptions) runs in a thread, off the event loop
+        reuse = use_llm and not FORCE_LLM_TRIAGE and not llm_cache_bypassed()
+        signature, duplicate = await asyncio.to_thread(_near_duplicate_lookup, ticket_id, title, description, reuse)
     
-    if use_llm:
+    if duplicate:
+        print(f"   ♻️  Reusing triage of ticket #{duplicate.ticket_id} ({duplicate.similarity:.0%} similar - LLM skipped)")
+        triage_result = {
+            **duplicate.triage,
+            "reasoning": f"Near-duplicate of ticket #{duplicate.ticket_id} ({duplicate.similarity:.0%} similar): {duplicate.triage['reasoning']}"[:500],
+            "method": "near_duplicate",
+            "llm_used": False,
+            "duplicate_of": duplicate.ticket_id,
+            "similarity": duplicate.similarity,
+            "rule_version": context.rule_version
+        }
+    elif use_llm:
         print("   📡 Calling LLM (rules uncertain)...")
-        # Run synchronous agent in thread
-        triage_result = await asyncio.to_thread(triage_agent, title, description)
+        # Async agent: waiting on the LLM holds a coroutine, not a thread
+        triage_result = await triage_agent_async(title, description, context)
         triage_result["llm_used"] = True
     else:
         print("   ✅ Using rules (high confidence - LLM skipped)")
@@ -76,7 +198,8 @@ async def process_ticket_workflow_async(
             "department": category_result.get("department", "IT"),
             "reasoning": f"Rule-based classification with {category_result.get('confidence', 0)*100:.0f}% confidence",
             "method": "rule",
-            "llm_used": False
+            "llm_used": False,
+            "rule_version": category_result.get("rule_version")
         }
     
     triage_time = time.time() - triage_start
@@ -89,23 +212,23 @@ async def process_ticket_workflow_async(
     parallel_start = time.time()
     
     # Import wrapped agents
-    from app.agents import compliance_agent, risk_agent
+    from app.agents import compliance_agent_async, risk_agent_async
     
-    # Run both agents concurrently using asyncio.to_thread
+    # Run both agents concurrently as coroutines
     # These wrapped agents now include Guardian validation
     
-    compliance_task = asyncio.to_thread(
-        compliance_agent, 
+    compliance_task = compliance_agent_async(
         title, 
         description, 
-        triage_result.get("category", "General")
+        triage_result.get("category", "General"),
+        context
     )
     
-    risk_task = asyncio.to_thread(
-        risk_agent, 
+    risk_task = risk_agent_async(
         title, 
         description, 
-        triage_result.get("priority", "Medium")
+        triage_result.get("priority", "Medium"),
+        context
     )
     
     # Wait for both to complete
@@ -142,41 +265,16 @@ async def process_ticket_workflow_async(
     # -------------------------
     print("\n[3/3] 💾 Updating database...")
     
-    from app.models import Ticket
-    import json
-    
-    ticket = session.get(Ticket, ticket_id)
+    # Sync session work runs in a thread so the event loop keeps serving other workflows
+    previous = await asyncio.to_thread(
+        _save_analysis, session, ticket_id, triage_result, compliance_result, risk_result, context.rule_version
+    )
     
-    if ticket:
-        ticket.category = triage_result.get("category")
-        ticket.priority = triage_result.get("priority")
-        ticket.department = triage_result.get("department")
-        ticket.ai_priority = triage_result.get("priority")
-        
-        # Construct rich reasoning
-        reasoning = f"{triage_result.get('reasoning')}\n\n"
-        if compliance_result.get('issues'):
-             reasoning += f"[Compliance] Found {len(compliance_result['issues'])} issues.\n"
-        else:
-             reasoning += "[Compliance] All checks passed.\n"
-             
-        reasoning += f"[Risk Analysis] Score: {risk_result.get('risk_score')}/100 ({risk_result.get('risk_level')})"
-        
-        ticket.ai_reasoning = reasoning
-        
-        # Save structured analysis for Frontend (JSON)
-        full_analysis = {
-            "triage": triage_result,
-            "compliance": compliance_result,
-            "risk": risk_result
-        }
-        ticket.ai_analysis = json.dumps(full_analysis)
-        
-        session.commit()
-        session.refresh(ticket)
-        print(f"   ✅ Database updated (Verification: AI Priority={ticket.ai_priority})")
-    else:
-        print("   ❌ Ticket not found in database")
+    # Later copies of this ticket can reuse its triage (a reused triage is indexed as the original)
+    if signature is not None and previous is not None:
+        await asyncio.to_thread(
+            near_duplicate_index.add, ticket_id, signature, duplicate.triage if duplicate else triage_result
+        )
     
     # -------------------------
     # METRICS & SUMMARY
@@ -192,6 +290,8 @@ async def process_ticket_workflow_async(
         
         if triage_result.get("llm_used"):
             agent_metrics["llm_calls"] += 1
+        elif duplicate:
+            agent_metrics["duplicate_reuse_calls"] += 1
         else:
             agent_metrics["rule_only_calls"] += 1
             
@@ -207,13 +307,15 @@ async def process_ticket_workflow_async(
     print(f"   Efficiency gain: {max(0, 100 - (total_time / 15) * 100):.0f}% faster")
     print(f"{'='*60}\n")
     
-    # Emit completion event
-    event_bus.emit("AI_ANALYSIS_COMPLETE", {
+    # Emit completion event (listeners write to the database - keep them off the loop)
+    await asyncio.to_thread(event_bus.emit, "AI_ANALYSIS_COMPLETE", {
         "ticket_id": ticket_id,
         "execution_time_seconds": round(total_time, 2),
         "llm_used": triage_result.get("llm_used", False),
         "category": triage_result.get("category"),
         "priority": triage_result.get("priority"),
+        "department": triage_result.get("department"),
+        "previous": previous,
         "risk_score": risk_result.get("risk_score")
     })
     
@@ -233,8 +335,22 @@ async def process_ticket_workflow_async(
 
 
 # Synchronous wrapper for backward compatibility
-def process_ticket_workflow(ticket_id: int, title: str, description: str, session) -> Dict[str, Any]:
+def process_ticket_workflow(
+    ticket_id: int,
+    title: str,
+    description: str,
+    session,
+    refresh: bool = False
+) -> Dict[str, Any]:
     """
-    Sync wrapper - calls async version
+    Sync wrapper - calls async version on a private event loop
     """
-    return asyncio.run(process_ticket_workflow_async(ticket_id, title, description, session))
+    from app.llm_client import async_llm_client
+
+    async def run():
+        try:
+            return await process_ticket_workflow_async(ticket_id, title, description, session, refresh)
+        finally:
+            await async_llm_client.aclose()  # This loop's client dies with the loop
+
+    return asyncio.run(run())
@@ -0,0 +1,53 @@
+"""
+Benchmark: RuleEngine.classify_batch throughput
+
+Times the one-ticket-at-a-time path (classify_ticket in a loop) against
+classify_batch in-process and on the process pool with several worker counts.
+Every batch result is compared with the single-ticket results first.
+
+Usage (from backend/):
+    python -m benchmarks.bench_rule_batch --tickets 200000 --workers 1 2 4 8
+"""
+
+import argparse
+import os
+import time
+from app.rules import rule_engine, shutdown_batch_pool
+from benchmarks.bench_rules import make_tickets
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", type=int, default=200_000)
+    parser.add_argument("--length", type=int, default=200, help="Description length in characters")
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, os.cpu_count() or 1}))
+    parser.add_argument("--chunk-size", type=int, default=None)
+    args = parser.parse_args()
+
+    # A pool of distinct tickets, repeated up to --tickets
+    distinct = make_tickets(min(args.tickets, 5000), args.length)
+    tickets = [distinct[i % len(distinct)] for i in range(args.tickets)]
+    print(f"{len(tickets):,} tickets, ~{args.length} chars, {os.cpu_count()} CPUs")
+
+    start = time.perf_counter()
+    expected = [rule_engine.classify_ticket(t["title"], t["description"]) for t in tickets]
+    single = time.perf_counter() - start
+    print(f"{'single-ticket loop':<28} {len(tickets) / single:>12,.0f} tickets/s")
+
+    for workers in args.workers:
+        # Warm-up: start the pool (process spawn is a one-off cost)
+        rule_engine.classify_batch(tickets[:1], workers=workers)
+        if workers > 1:
+            rule_engine.classify_batch(tickets[:workers * 1000], workers=workers, chunk_size=1000)
+
+        start = time.perf_counter()
+        results = rule_engine.classify_batch(tickets, workers=workers, chunk_size=args.chunk_size)
+        elapsed = time.perf_counter() - start
+        assert results == expected, f"classify_batch(workers={workers}) differs from classify_ticket"
+        print(f"{f'classify_batch workers={workers}':<28} {len(tickets) / elapsed:>12,.0f} tickets/s")
+
+    shutdown_batch_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark: rule confidence gate - first-match constants vs weighted scoring
+
+Replays the triage gate (rules answer when category and priority confidence
+clear the threshold, the LLM handles the rest) over a labeled ticket corpus
+and reports, for each scoring mode:
+  - LLM avoidance rate (tickets answered by rules alone)
+  - accuracy of those rule answers (category and priority both right)
+  - estimated LLM time saved at --llm-seconds per call
+
+"legacy" reproduces the former classifiers: first category in category_order
+at 0.95, priority constants High 0.90 / billing 0.85 / Low 0.80 / Medium 0.60.
+
+Usage (from backend/):
+    python -m benchmarks.bench_rule_confidence --corpus benchmarks/labeled_tickets.jsonl
+"""
+
+import argparse
+import json
+import os
+from typing import Dict, Any, List, Tuple
+from app.rules import rule_engine, RuleHits
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(__file__), "labeled_tickets.jsonl")
+LEGACY_THRESHOLD = 0.8
+
+
+def load_corpus(path: str) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def legacy_gate(hits: RuleHits) -> Tuple[bool, str, str]:
+    """The former first-match classifiers and fixed confidences"""
+    rule_set = hits.rule_set
+    category = next((c for c in rule_set.category_order if hits.has(f"category:{c}")), None)
+    if hits.has("priority:high"):
+        priority, confidence = "High", 0.90
+    elif category == "Billing" and hits.has("priority:billing_escalation"):
+        priority, confidence = "High", 0.85
+    elif hits.has("priority:low"):
+        priority, confidence = "Low", 0.80
+    else:
+        priority, confidence = "Medium", 0.60
+    confident = category is not None and confidence >= LEGACY_THRESHOLD
+    return confident, category, priority
+
+
+def weighted_gate(hits: RuleHits, text: str) -> Tuple[bool, str, str]:
+    """The current classifiers and RuleEngine.is_confident"""
+    category = rule_engine.classify_category(text, hits=hits)
+    priority = rule_engine.classify_priority(text, category["category"], hits=hits)
+    return rule_engine.is_confident(category, priority), category["category"], priority["priority"]
+
+
+def evaluate(corpus: List[Dict[str, Any]], verbose: bool = False) -> Dict[str, Dict[str, int]]:
+    results = {mode: {"avoided": 0, "correct": 0} for mode in ("legacy", "weighted")}
+    for ticket in corpus:
+        hits = rule_engine.scan_ticket(ticket["title"], ticket["description"])
+        text = f"{ticket['title']} {ticket['description']}"
+        for mode, (confident, category, priority) in (
+            ("legacy", legacy_gate(hits)),
+            ("weighted", weighted_gate(hits, text))
+        ):
+            if not confident:
+                continue
+            correct = (category, priority) == (ticket["category"], ticket["priority"])
+            results[mode]["avoided"] += 1
+            results[mode]["correct"] += correct
+            if verbose and not correct:
+                print(f"   {mode:<9} wrong: {ticket['title']!r} -> {category}/{priority} "
+                      f"(label {ticket['category']}/{ticket['priority']})")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="JSONL with title, description, category, priority")
+    parser.add_argument("--llm-seconds", type=float, default=15.0, help="Average call_ollama latency")
+    parser.add_argument("--verbose", action="store_true", help="List wrong rule answers")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    results = evaluate(corpus, args.verbose)
+
+    print(f"Corpus: {len(corpus)} labeled tickets, rule set {rule_engine.version}")
+    print(f"{'mode':<10} {'LLM avoided':>12} {'rate':>7} {'rule accuracy':>14} {'wrong':>6} {'LLM time saved':>15}")
+    for mode, counts in results.items():
+        avoided, correct = counts["avoided"], counts["correct"]
+        rate = avoided / len(corpus) * 100 if corpus else 0
+        accuracy = f"{correct / avoided * 100:.1f}%" if avoided else "-"
+        saved = avoided * args.llm_seconds
+        print(f"{mode:<10} {avoided:>12} {rate:>6.1f}% {accuracy:>14} {avoided - correct:>6} {saved:>14.0f}s")
+
+
+if __name__ == "__main__":
+    main()
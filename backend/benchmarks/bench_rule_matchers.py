@@ -0,0 +1,98 @@
+"""
+Benchmark: RuleEngine matcher backends as the keyword list grows
+
+Adds N synthetic word-bounded terms to the rule table, compiles a RulePlan
+with each matcher backend (RULE_MATCHER=regex / aho_corasick), checks that
+both report identical hits, then times plan compilation and scanning.
+
+Usage (from backend/):
+    python -m benchmarks.bench_rule_matchers --terms 0 1000 10000 50000
+"""
+
+import argparse
+import random
+import string
+import time
+from app.rules import RulePlan, RuleSet, RULE_SET_PATH, MATCHERS
+from benchmarks.bench_rules import make_tickets
+
+
+def synthetic_terms(count: int, seed: int = 11):
+    rng = random.Random(seed)
+    terms = set()
+    while len(terms) < count:
+        terms.add("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10))))
+    return sorted(terms)
+
+
+def signal_table(extra_terms):
+    signals = dict(RuleSet.from_file(RULE_SET_PATH).signals)
+    if extra_terms:
+        signals["category:Synthetic"] = (extra_terms, True)
+    return signals
+
+
+def with_extra_keywords(texts, extra_terms, rate: float, seed: int = 5):
+    """Sprinkle some of the synthetic terms into the descriptions so they produce hits"""
+    if not extra_terms:
+        return texts
+    rng = random.Random(seed)
+    out = []
+    for text in texts:
+        words = text.split(" ")
+        for i in range(len(words)):
+            if rng.random() < rate:
+                words[i] = rng.choice(extra_terms)
+        out.append(" ".join(words))
+    return out
+
+
+def snapshot(hits):
+    return {signal: sorted(found) for signal, found in hits.signals.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--terms", type=int, nargs="+", default=[0, 1000, 10000, 50000])
+    parser.add_argument("--tickets", type=int, default=100)
+    parser.add_argument("--length", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    base_texts = [t["description"] for t in make_tickets(args.tickets, args.length)]
+    base_count = sum(len(terms) for terms, _ in RuleSet.from_file(RULE_SET_PATH).signals.values())
+
+    header = f"{'terms':>8}"
+    for name in MATCHERS:
+        header += f" {name + ' build s':>20} {name + ' scan ms':>20}"
+    print(header)
+
+    for extra in args.terms:
+        extra_terms = synthetic_terms(extra)
+        texts = with_extra_keywords(base_texts, extra_terms, rate=0.01)
+        signals = signal_table(extra_terms)
+
+        row = f"{base_count + extra:>8}"
+        results = {}
+        for name in MATCHERS:
+            start = time.perf_counter()
+            plan = RulePlan(signals, matcher=name)
+            build = time.perf_counter() - start
+
+            results[name] = [snapshot(plan.scan(text)) for text in texts]
+
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                for text in texts:
+                    plan.scan(text)
+                best = min(best, time.perf_counter() - start)
+            row += f" {build:>20.2f} {best * 1000:>20.1f}"
+
+        first, *others = results.values()
+        assert all(other == first for other in others), "matcher backends disagree"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Benchmark: RuleEngine - per-rule regex scans vs the single-pass rule plan
+
+Runs the full rule pipeline (category, priority, compliance, risk) over
+synthetic tickets of increasing description length and keyword density with the original
+implementation (one regex search per rule, up to 13 scans) and with the
+compiled plan (one scan_ticket result shared by all four classifiers). Compliance
+and risk outputs are compared first (category/priority use weighted scoring
+since, see bench_rule_confidence), so a speedup is only reported for identical results.
+
+Usage (from backend/):
+    python -m benchmarks.bench_rules --tickets 200 --lengths 200 2000 20000
+"""
+
+import argparse
+import random
+import re
+import time
+from typing import Dict, Any
+from app.rules import RuleEngine, RuleSet, RULE_SET_PATH
+
+FILLER = (
+    "the customer reported that the dashboard shows stale numbers after the nightly sync "
+    "and the team would like someone to look into it when there is capacity this week"
+).split()
+KEYWORDS = [
+    "invoice", "payment", "refund", "password", "login", "vpn", "error", "crash", "server",
+    "shipping", "delivery", "urgent", "critical", "production", "vip", "overdue", "late",
+    "question", "how to", "info", "#4821", "PO", "$250", "user@example.com", "employee",
+    "share password", "skip review", "enterprise", "director", "Production", "Downtime"
+]
+
+
+class LegacyRuleEngine:
+    """The original implementation: one compiled regex (or substring test) per rule"""
+
+    def __init__(self):
+        self.cat_patterns = {
+            "Billing": re.compile(r'\b(invoice|payment|billing|refund|charge|cost|price)\b', re.IGNORECASE),
+            "Access": re.compile(r'\b(password|login|access|vpn|permission|account|auth)\b', re.IGNORECASE),
+            "Technical": re.compile(r'\b(error|bug|crash|outage|down|server|failed|slow)\b', re.IGNORECASE),
+            "Logistics": re.compile(r'\b(shipping|delivery|warehouse|shipment|track)\b', re.IGNORECASE)
+        }
+        self.high_priority = re.compile(r'\b(urgent|critical|emergency|production|down|outage|vip|blocked)\b', re.IGNORECASE)
+        self.low_priority = re.compile(r'\b(question|how to|clarification|info|help)\b', re.IGNORECASE)
+        self.compliance_financial = re.compile(r'(invoice|#|po|amount|\$)', re.IGNORECASE)
+        self.compliance_access = re.compile(r'(@|email|user|id|employee)', re.IGNORECASE)
+        self.policy_violations = re.compile(r'(share password|bypass approval|override|skip review)', re.IGNORECASE)
+        self.risk_vip = re.compile(r'\b(vip|enterprise|ceo|director)\b', re.IGNORECASE)
+
+    def classify_category(self, text: str) -> Dict[str, Any]:
+        dept_map = {"Billing": "Finance", "Access": "IT", "Technical": "IT", "Logistics": "Operations"}
+        for category, pattern in self.cat_patterns.items():
+            if pattern.search(text):
+                return {"category": category, "department": dept_map.get(category, "General"),
+                        "confidence": 0.95, "method": "regex_rule"}
+        return {"category": None, "confidence": 0.0, "method": "none"}
+
+    def classify_priority(self, text: str, category: str) -> Dict[str, Any]:
+        if self.high_priority.search(text):
+            return {"priority": "High", "confidence": 0.90, "method": "regex_rule"}
+        if category == "Billing" and re.search(r'\b(overdue|late|penalty)\b', text, re.IGNORECASE):
+            return {"priority": "High", "confidence": 0.85, "method": "billing_rule"}
+        if self.low_priority.search(text):
+            return {"priority": "Low", "confidence": 0.80, "method": "regex_rule"}
+        return {"priority": "Medium", "confidence": 0.60, "method": "default"}
+
+    def check_compliance(self, ticket: Dict[str, Any]) -> Dict[str, Any]:
+        description = ticket.get("description", "")
+        category = ticket.get("category", "")
+        issues, status = [], "OK"
+        if category == "Billing" and not self.compliance_financial.search(description):
+            issues.append("Missing invoice/PO number or amount")
+            status = "Needs_Info"
+        if category == "Access" and not self.compliance_access.search(description):
+            issues.append("Missing user email or ID")
+            status = "Needs_Info"
+        if self.policy_violations.search(description):
+            issues.append("POLICY VIOLATION: Security breach attempt detected")
+            status = "Blocked"
+        return {"status": status, "issues": issues, "method": "regex_rule", "approval_required": status == "Blocked"}
+
+    def calculate_risk(self, ticket: Dict[str, Any], triage: Dict[str, Any]) -> Dict[str, Any]:
+        priority = triage.get("priority", "Medium")
+        description = ticket.get("description", "")
+        base_score = 30
+        if priority == "High": base_score += 40
+        elif priority == "Medium": base_score += 20
+        if self.risk_vip.search(description):
+            base_score += 15
+        if "production" in description.lower():
+            base_score += 20
+        risk_level = "High" if base_score >= 70 else "Medium" if base_score >= 40 else "Low"
+        return {"risk_score": min(100, base_score), "risk_level": risk_level,
+                "method": "heuristic_rule", "needs_llm_review": base_score > 80}
+
+
+def make_tickets(count: int, length: int, keyword_rate: float = 0.01, seed: int = 7):
+    """Tickets of ~length characters with keyword_rate of the words being rule keywords"""
+    rng = random.Random(seed)
+    tickets = []
+    for _ in range(count):
+        words, size = [], 0
+        while size < length:
+            word = rng.choice(KEYWORDS) if rng.random() < keyword_rate else rng.choice(FILLER)
+            words.append(word)
+            size += len(word) + 1
+        category_hint = rng.choice(CATEGORY_HINTS)
+        tickets.append({"title": f"{category_hint} request", "description": " ".join(words)})
+    return tickets
+
+
+CATEGORY_HINTS = ["Payment", "Access", "Server", "Shipment", "General"]
+
+
+def run_pipeline(engine, ticket: Dict[str, Any]):
+    """Same call sequence as the triage/compliance/risk agents"""
+    text = f"{ticket['title']} {ticket['description']}"
+    category = engine.classify_category(text)
+    priority = engine.classify_priority(text, category["category"])
+    full = {**ticket, "category": category["category"]}
+    compliance = engine.check_compliance(full)
+    risk = engine.calculate_risk(full, {"priority": priority["priority"]})
+    return category, priority, compliance, risk
+
+
+def run_pipeline_single_pass(engine: RuleEngine, ticket: Dict[str, Any]):
+    """The same pipeline reading one scan_ticket result"""
+    hits = engine.scan_ticket(ticket["title"], ticket["description"])
+    text = f"{ticket['title']} {ticket['description']}"
+    category = engine.classify_category(text, hits=hits)
+    priority = engine.classify_priority(text, category["category"], hits=hits)
+    full = {**ticket, "category": category["category"]}
+    compliance = engine.check_compliance(full, hits=hits)
+    risk = engine.calculate_risk(full, {"priority": priority["priority"]}, hits=hits)
+    return category, priority, compliance, risk
+
+
+def legacy_checks(legacy, ticket: Dict[str, Any], results):
+    """Legacy compliance/risk for the category and priority the engine picked"""
+    category, priority = results[0], results[1]
+    full = {**ticket, "category": category["category"]}
+    return legacy.check_compliance(full), legacy.calculate_risk(full, {"priority": priority["priority"]})
+
+
+def unversioned(results):
+    """Drop the rule_version stamp (the legacy engine has no versions)"""
+    return tuple({k: v for k, v in result.items() if k != "rule_version"} for result in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", type=int, default=200)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[200, 2000, 20000])
+    parser.add_argument("--keyword-rates", type=float, nargs="+", default=[0.01, 0.0],
+                        help="Share of words that are rule keywords (0 = nothing matches, LLM fallback)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    legacy = LegacyRuleEngine()
+    # Engine without the scan cache, so repeated runs really scan
+    rule_set = RuleSet.from_file(RULE_SET_PATH)
+    single_pass = RuleEngine.from_rule_set(RuleSet(rule_set.data, cache_size=0))
+
+    print(f"{'kw rate':>8} {'chars':>8} {'legacy ms':>10} {'single-pass ms':>15} {'speedup':>8}")
+    for rate, length in [(r, n) for r in args.keyword_rates for n in args.lengths]:
+        tickets = make_tickets(args.tickets, length, rate)
+
+        for ticket in tickets:
+            # Compliance/risk must match the legacy regexes; category/priority now
+            # use weighted scoring, so only the per-call path is compared for those
+            expected = run_pipeline(single_pass, ticket)
+            assert run_pipeline_single_pass(single_pass, ticket) == expected, ticket["title"]
+            legacy_compliance, legacy_risk = legacy_checks(legacy, ticket, expected)
+            assert unversioned(expected[2:]) == (legacy_compliance, legacy_risk), ticket["title"]
+
+        def timed(pipeline, engine):
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                for ticket in tickets:
+                    pipeline(engine, ticket)
+                best = min(best, time.perf_counter() - start)
+            return best * 1000
+
+        legacy_ms = timed(run_pipeline, legacy)
+        plan_ms = timed(run_pipeline_single_pass, single_pass)
+        print(f"{rate:>8} {length:>8} {legacy_ms:>10.1f} {plan_ms:>15.1f} {legacy_ms / plan_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark: SQLite storage profiles under concurrent read/write load
+
+Writers insert a Ticket plus its AuditLog row per transaction while readers
+poll the dashboard-style queries. Runs once per profile on a fresh database file.
+
+Usage (from backend/):
+    python -m benchmarks.bench_sqlite_profile --seconds 5 --writers 4 --readers 8
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import func
+from sqlalchemy.exc import OperationalError
+from sqlmodel import SQLModel, Session, select
+from app.database import build_engine
+from app.models import Ticket, AuditLog
+
+
+def seed(engine, rows: int):
+    with Session(engine) as session:
+        for i in range(rows):
+            session.add(Ticket(title=f"Seed ticket {i}", description="seed " * 20, priority="Medium"))
+        session.commit()
+
+
+def run_profile(profile: str, seconds: float, writers: int, readers: int, seed_rows: int):
+    tmp_dir = tempfile.mkdtemp(prefix=f"bench-{profile}-")
+    url = f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+    engine = build_engine(url, profile=profile, echo=False)
+    SQLModel.metadata.create_all(engine)
+    seed(engine, seed_rows)
+
+    counters = {"writes": 0, "reads": 0, "write_errors": 0, "read_errors": 0}
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def writer(worker_id: int):
+        n = 0
+        while not stop.is_set():
+            try:
+                with Session(engine) as session:
+                    ticket = Ticket(title=f"W{worker_id}-{n}", description="benchmark write " * 10)
+                    session.add(ticket)
+                    session.flush()
+                    session.add(AuditLog(
+                        event_type="TICKET_CREATED",
+                        event_category="USER_ACTION",
+                        ticket_id=ticket.id,
+                        description="benchmark",
+                        created_at=datetime.utcnow()
+                    ))
+                    session.commit()
+                with lock:
+                    counters["writes"] += 1
+            except OperationalError:
+                with lock:
+                    counters["write_errors"] += 1
+            n += 1
+
+    def reader():
+        while not stop.is_set():
+            try:
+                with Session(engine) as session:
+                    session.exec(select(func.count()).select_from(Ticket)).one()
+                    session.exec(select(AuditLog).order_by(AuditLog.created_at.desc()).limit(20)).all()
+                with lock:
+                    counters["reads"] += 1
+            except OperationalError:
+                with lock:
+                    counters["read_errors"] += 1
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    engine.dispose()
+
+    return {
+        "profile": profile,
+        "writes_per_sec": counters["writes"] / elapsed,
+        "reads_per_sec": counters["reads"] / elapsed,
+        "write_errors": counters["write_errors"],
+        "read_errors": counters["read_errors"]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seed-rows", type=int, default=5000)
+    parser.add_argument("--profiles", nargs="+", default=["legacy", "performance"])
+    args = parser.parse_args()
+
+    print(f"{'profile':<12} {'writes/s':>10} {'reads/s':>10} {'w_err':>6} {'r_err':>6}")
+    for profile in args.profiles:
+        r = run_profile(profile, args.seconds, args.writers, args.readers, args.seed_rows)
+        print(f"{r['profile']:<12} {r['writes_per_sec']:>10.1f} {r['reads_per_sec']:>10.1f} "
+              f"{r['write_errors']:>6} {r['read_errors']:>6}")
+
+
+if __name__ == "__main__":
+    main()
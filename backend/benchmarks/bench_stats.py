@@ -0,0 +1,124 @@
+"""
+Benchmark: /api/stats aggregation - Python loops vs SQL GROUP BY
+
+Seeds a fresh database with N tickets, then times the old approach
+(load every Ticket, count in Python) against aggregate_ticket_counts,
+and a 90-day histogram read from the hourly rollup.
+
+Usage (from backend/):
+    python -m benchmarks.bench_stats --rows 1000000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from sqlmodel import SQLModel, Session, select
+from app.database import build_engine
+from app.models import Ticket
+from app.ticket_stats import aggregate_ticket_counts
+from app.stats_store import TicketStatsStore
+
+STATUSES = ["New", "In_Review", "Approved", "Rejected", "Closed"]
+PRIORITIES = ["High", "Medium", "Low"]
+CATEGORIES = ["Billing", "Technical", "Access", "Logistics", None]
+DEPARTMENTS = ["Finance", "IT", "Operations", "Sales", None]
+
+
+def seed(engine, rows: int, batch: int = 50000):
+    """Bulk insert synthetic tickets with raw executemany (fast seeding)"""
+    rng = random.Random(42)
+    start = datetime(2026, 1, 1)
+    sql = (
+        "INSERT INTO ticket (title, description, status, priority, category, department, ai_priority, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+    )
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        for offset in range(0, rows, batch):
+            params = []
+            for i in range(offset, min(rows, offset + batch)):
+                priority = rng.choice(PRIORITIES)
+                params.append((
+                    f"Ticket {i}",
+                    "Synthetic description " * 10,
+                    rng.choice(STATUSES),
+                    priority,
+                    rng.choice(CATEGORIES),
+                    rng.choice(DEPARTMENTS),
+                    priority if rng.random() < 0.7 else None,
+                    (start + timedelta(seconds=i * 7)).strftime("%Y-%m-%d %H:%M:%S.%f")
+                ))
+            cursor.executemany(sql, params)
+        raw.commit()
+    finally:
+        raw.close()
+
+
+def legacy_stats(session: Session):
+    """The original get_stats approach: load all rows, loop in Python"""
+    tickets = session.exec(select(Ticket)).all()
+    result = {
+        "total": len(tickets),
+        "high": len([t for t in tickets if t.priority == "High"]),
+        "closed": len([t for t in tickets if t.status == "Closed"]),
+        "analyzed": len([t for t in tickets if t.ai_priority]),
+        "categories": {}
+    }
+    for t in tickets:
+        cat = t.category or "Uncategorized"
+        result["categories"][cat] = result["categories"].get(cat, 0) + 1
+    return result
+
+
+def timed(fn, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-legacy", action="store_true", help="Skip the (slow) load-everything path")
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix="bench-stats-")
+    engine = build_engine(f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}", echo=False)
+    SQLModel.metadata.create_all(engine)
+
+    print(f"Seeding {args.rows:,} tickets...")
+    start = time.perf_counter()
+    seed(engine, args.rows)
+    print(f"   seeded in {time.perf_counter() - start:.1f}s")
+
+    with Session(engine) as session:
+        sql_time = timed(lambda: aggregate_ticket_counts(session), args.repeat)
+        print(f"SQL GROUP BY (aggregate_ticket_counts): {sql_time * 1000:10.1f} ms")
+
+        if not args.skip_legacy:
+            legacy_time = timed(lambda: legacy_stats(session), 1)
+            print(f"Python loops (load all tickets):        {legacy_time * 1000:10.1f} ms")
+            print(f"Speedup: {legacy_time / sql_time:.0f}x")
+
+        store = TicketStatsStore(engine)
+        rebuild_time = timed(lambda: store.rebuild(session), 1)
+        print(f"Stats store rebuild (counters + rollup):  {rebuild_time * 1000:10.1f} ms")
+
+        start = datetime(2026, 1, 1)
+        for bucket in ("hour", "day", "week"):
+            hist_time = timed(lambda: store.histogram(start, start + timedelta(days=90), bucket, session), args.repeat)
+            print(f"Histogram 90 days by {bucket:<5} (rollup):      {hist_time * 1000:10.1f} ms")
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
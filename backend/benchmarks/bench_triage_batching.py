@@ -0,0 +1,166 @@
+"""
+Benchmark: LLM triage - one call per ticket vs micro-batched prompts
+
+Runs the async triage agent over tickets the rules are not confident about
+(so every one needs the LLM) against a local fake Ollama with a latency
+model of a single local model server:
+  - requests are served --slots at a time (OLLAMA_NUM_PARALLEL)
+  - each request costs --overhead-ms, plus --prompt-ms per prompt token
+    (system prompt + tickets) and --token-ms per generated token
+  - tokens are streamed; the server stops generating when the client
+    disconnects (early JSON termination), otherwise it rambles on
+Tokens are approximated as 4 characters. --scale shrinks every delay so a
+run takes seconds; reported times are scaled back up.
+
+Reports tickets/s, LLM requests, batch sizes and fallbacks for each mode.
+
+Usage (from backend/):
+    python -m benchmarks.bench_triage_batching --tickets 48 --concurrency 8 --batch-size 8
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Tuple
+import app.agents as agents
+from app.analysis_context import AnalysisContext
+from app.llm_cache import LLMResponseCache
+from app.llm_client import AsyncLLMClient
+from app.micro_batch import MicroBatcher
+from benchmarks.bench_rule_confidence import load_corpus, DEFAULT_CORPUS
+
+CLASSIFICATION = {"category": "Technical", "priority": "Medium", "department": "IT",
+                  "reasoning": "Needs investigation by the IT support team"}
+RAMBLE = " This classification is based on the ticket text." * 3  # Models keep going after the JSON
+BATCH_ENTRY = re.compile(r"^\[(\d+)\] Title:", re.MULTILINE)
+
+
+class LatencyModelHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        ids = [int(i) for i in BATCH_ENTRY.findall(payload["prompt"])]
+        if ids:
+            reply = json.dumps([{"id": i, **CLASSIFICATION} for i in ids]) + RAMBLE
+        else:
+            reply = json.dumps(CLASSIFICATION) + RAMBLE
+        tokens = [reply[i:i + 4] for i in range(0, len(reply), 4)]
+        prompt_tokens = (len(payload.get("system", "")) + len(payload["prompt"])) / 4
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        with server.slots:
+            with server.lock:
+                server.requests += 1
+                server.prompt_tokens += prompt_tokens
+            time.sleep((server.overhead_ms + prompt_tokens * server.prompt_ms) / 1000 * server.scale)
+            for token in tokens + [""]:
+                time.sleep(server.token_ms / 1000 * server.scale)
+                line = json.dumps({"response": token, "done": token == ""}).encode() + b"\n"
+                try:
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+                    self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    self.close_connection = True
+                    return  # Client stopped reading: generation stops, slot is freed
+                with server.lock:
+                    server.generated_tokens += 1
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server(args) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), LatencyModelHandler)
+    server.daemon_threads = True
+    server.slots = threading.BoundedSemaphore(args.slots)
+    server.lock = threading.Lock()
+    server.overhead_ms, server.prompt_ms, server.token_ms = args.overhead_ms, args.prompt_ms, args.token_ms
+    server.scale = args.scale
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def uncertain_tickets(count: int) -> List[Tuple[str, str]]:
+    """Corpus tickets the rule gate sends to the LLM, repeated with unique suffixes"""
+    pool = [(t["title"], t["description"]) for t in load_corpus(DEFAULT_CORPUS)
+            if not AnalysisContext(t["title"], t["description"]).is_confident()]
+    return [(f"{pool[i % len(pool)][0]} (#{i})", pool[i % len(pool)][1]) for i in range(count)]
+
+
+async def run_mode(server, tickets, batching: bool, args):
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    agents.async_llm_client = AsyncLLMClient(base_url=base_url, concurrency=args.concurrency, read_timeout=600)
+    agents.TRIAGE_BATCHING = batching
+    agents.triage_batcher = MicroBatcher(agents._triage_batch, args.window_ms, args.batch_size)
+    server.requests = server.generated_tokens = 0
+    server.prompt_tokens = 0.0
+
+    semaphore = asyncio.Semaphore(args.concurrency)  # Like run_analysis_batch_async
+
+    async def triage(ticket):
+        async with semaphore:
+            return await agents.triage_agent_raw_async(*ticket)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(triage(t) for t in tickets))
+    elapsed = (time.perf_counter() - start) / args.scale
+    await agents.async_llm_client.aclose()
+
+    valid = sum(r.get("category") == CLASSIFICATION["category"] for r in results)
+    return {
+        "elapsed": elapsed,
+        "valid": valid,
+        "requests": server.requests,
+        "prompt_tokens": server.prompt_tokens,
+        "generated_tokens": server.generated_tokens,
+        "batching": agents.triage_batcher.stats.snapshot()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", type=int, default=48)
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent workflows (BULK_ANALYSIS_CONCURRENCY)")
+    parser.add_argument("--batch-size", type=int, default=8, help="TRIAGE_BATCH_MAX_SIZE")
+    parser.add_argument("--window-ms", type=float, default=50, help="TRIAGE_BATCH_WINDOW_MS")
+    parser.add_argument("--slots", type=int, default=1, help="Requests the model server runs at once")
+    parser.add_argument("--overhead-ms", type=float, default=150, help="Fixed cost per request")
+    parser.add_argument("--prompt-ms", type=float, default=5, help="Prompt evaluation per token")
+    parser.add_argument("--token-ms", type=float, default=40, help="Generation per token")
+    parser.add_argument("--scale", type=float, default=0.02, help="Multiply every delay (shorter runs)")
+    args = parser.parse_args()
+
+    agents.llm_cache = LLMResponseCache(max_entries=0, persist=False)  # Measure the LLM, not the cache
+    agents.LLM_STREAMING = True
+    server = start_server(args)
+    tickets = uncertain_tickets(args.tickets)
+
+    print(f"{len(tickets)} LLM triages, concurrency {args.concurrency}, model slots {args.slots}, "
+          f"batch <= {args.batch_size} / {args.window_ms:.0f} ms")
+    print(f"{'mode':<11} {'time':>8} {'tickets/s':>10} {'requests':>9} {'prompt tok':>11} "
+          f"{'gen tok':>8} {'avg batch':>10} {'fallbacks':>10} {'valid':>6}")
+    baseline = None
+    for mode, batching in (("per-ticket", False), ("batched", True)):
+        r = asyncio.run(run_mode(server, tickets, batching, args))
+        rate = len(tickets) / r["elapsed"]
+        baseline = baseline or rate
+        b = r["batching"]
+        print(f"{mode:<11} {r['elapsed']:>7.1f}s {rate:>10.2f} {r['requests']:>9} {r['prompt_tokens']:>11.0f} "
+              f"{r['generated_tokens']:>8} {b['avg_batch_size'] if batching else '-':>10} "
+              f"{b['fallbacks'] + b['singles'] if batching else '-':>10} {r['valid']:>6}")
+    print(f"Batched throughput: {rate / baseline:.2f}x per-ticket")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
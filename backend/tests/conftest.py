@@ -0,0 +1,133 @@
+"""
+Shared test configuration
+Points the app at a throwaway SQLite file before any app module is imported
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_tmp_dir = tempfile.mkdtemp(prefix="intelliflow-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_tmp_dir, 'test.db')}")
+
+import pytest
+
+
+@pytest.fixture
+def clean_db():
+    """Create tables and empty them so each test starts from a known state"""
+    from sqlmodel import SQLModel, Session
+    from app.database import engine, init_db
+    from app.near_duplicates import near_duplicate_index
+
+    init_db()
+    near_duplicate_index.clear()  # Mirrors analyzed tickets
+    with Session(engine) as session:
+        for table in reversed(SQLModel.metadata.sorted_tables):
+            session.execute(table.delete())
+        session.commit()
+    return engine
+
+
+@pytest.fixture
+def client(clean_db):
+    """API client without running the lifespan (tables already created)"""
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    return TestClient(app)
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive
+    delay = 0.0
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests += 1
+        time.sleep(self.server.delay)
+        if self.server.responder:
+            reply = self.server.responder(payload)
+        else:
+            reply = self.server.reply or f"echo: {payload['prompt']}"
+        if payload.get("stream"):
+            return self._stream(reply)
+        body = json.dumps({"response": reply}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, reply: str):
+        """NDJSON token stream (4-character tokens, chunked encoding)"""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        tokens = [reply[i:i + 4] for i in range(0, len(reply), 4)]
+        events = [{"response": token, "done": False} for token in tokens] + [{"response": "", "done": True}]
+        try:
+            for event in events:
+                line = json.dumps(event).encode() + b"\n"
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+                self.wfile.flush()
+                self.server.tokens_sent += 1
+                time.sleep(self.server.token_delay)
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            self.server.aborted += 1  # Client stopped reading
+            self.close_connection = True
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_ollama():
+    """
+    Local keep-alive HTTP server standing in for Ollama
+    Set .delay / .reply or .responder(payload) (and .token_delay for streamed
+    replies); read .requests, .tokens_sent and .aborted.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOllamaHandler)
+    server.daemon_threads = True
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    server.delay = 0.0
+    server.reply = None
+    server.responder = None
+    server.requests = 0
+    server.token_delay = 0.0
+    server.tokens_sent = 0
+    server.aborted = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def ollama(fake_ollama, monkeypatch):
+    """
+    Agents talk to fake_ollama through fresh sync/async clients
+    Streaming on, no response cache, fresh single-flight tables. Test modules
+    override this fixture (requesting `ollama`) to change only what differs.
+    """
+    import app.agents as agents
+    from app.llm_cache import LLMResponseCache
+    from app.llm_client import LLMClient, AsyncLLMClient
+    from app.single_flight import SingleFlight, AsyncSingleFlight
+
+    client = LLMClient(base_url=fake_ollama.base_url)
+    monkeypatch.setattr(agents, "llm_client", client)
+    monkeypatch.setattr(agents, "async_llm_client", AsyncLLMClient(base_url=fake_ollama.base_url))
+    monkeypatch.setattr(agents, "llm_cache", LLMResponseCache(max_entries=0, persist=False))
+    monkeypatch.setattr(agents, "llm_single_flight", SingleFlight())
+    monkeypatch.setattr(agents, "async_llm_single_flight", AsyncSingleFlight())
+    monkeypatch.setattr(agents, "LLM_STREAMING", True)
+    yield fake_ollama
+    client.close()
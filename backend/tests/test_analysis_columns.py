@@ -0,0 +1,85 @@
+"""
+Tests for the promoted analysis columns (extraction, backfill, schema migration)
+"""
+
+import json
+from sqlalchemy import inspect
+from sqlmodel import Session, select, create_engine
+from app.database import init_db
+from app.models import Ticket
+from app.analysis_columns import analysis_columns, backfill_analysis_columns
+
+
+ANALYSIS = {
+    "triage": {"category": "Billing", "priority": "High", "llm_used": True},
+    "compliance": {"status": "Blocked", "issues": ["PII"]},
+    "risk": {"risk_score": "82", "risk_level": "High"}
+}
+
+
+class TestAnalysisColumns:
+    """Mapping the analysis payload to typed columns"""
+
+    def test_extracts_typed_values(self):
+        assert analysis_columns(ANALYSIS) == {
+            "risk_score": 82,
+            "risk_level": "High",
+            "compliance_status": "Blocked",
+            "llm_used": True
+        }
+
+    def test_missing_sections(self):
+        assert analysis_columns({}) == {
+            "risk_score": None, "risk_level": None, "compliance_status": None, "llm_used": None
+        }
+
+
+class TestBackfill:
+    """Backfilling tickets analyzed before the columns existed"""
+
+    def test_backfill_populates_columns(self, clean_db):
+        with Session(clean_db) as session:
+            session.add(Ticket(title="old", description="d", ai_analysis=json.dumps(ANALYSIS)))
+            session.add(Ticket(title="broken", description="d", ai_analysis="not json"))
+            session.add(Ticket(title="pending", description="d"))
+            session.commit()
+
+        result = backfill_analysis_columns(clean_db, batch_size=1)
+        assert result == {"updated": 1, "skipped": 1}
+
+        with Session(clean_db) as session:
+            old = session.exec(select(Ticket).where(Ticket.title == "old")).one()
+            assert (old.risk_score, old.compliance_status, old.llm_used) == (82, "Blocked", True)
+
+        # Already populated rows are not touched again
+        assert backfill_analysis_columns(clean_db)["updated"] == 0
+
+
+class TestSchemaMigration:
+    """init_db adds new columns and indexes to databases created by older versions"""
+
+    def test_adds_missing_columns(self, tmp_path):
+        legacy = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+        with legacy.begin() as conn:
+            conn.exec_driver_sql(
+                "CREATE TABLE ticket (id INTEGER PRIMARY KEY, title VARCHAR NOT NULL, "
+                "description VARCHAR NOT NULL, status VARCHAR NOT NULL, priority VARCHAR NOT NULL, "
+                "category VARCHAR, department VARCHAR, ai_priority VARCHAR, ai_reasoning VARCHAR, "
+                "ai_analysis VARCHAR, created_at DATETIME NOT NULL)"
+            )
+            conn.exec_driver_sql(
+                "INSERT INTO ticket (title, description, status, priority, created_at) "
+                "VALUES ('t', 'd', 'New', 'Low', '2026-01-01 00:00:00')"
+            )
+
+        init_db(legacy)
+
+        inspector = inspect(legacy)
+        columns = {col["name"] for col in inspector.get_columns("ticket")}
+        assert {"risk_score", "risk_level", "compliance_status", "llm_used"} <= columns
+        indexes = {ix["name"] for ix in inspector.get_indexes("ticket")}
+        assert "ix_ticket_compliance_status_risk_score" in indexes
+
+        with Session(legacy) as session:
+            assert session.exec(select(Ticket)).one().risk_score is None
+        legacy.dispose()
@@ -0,0 +1,91 @@
+"""
+Tests for the per-ticket analysis context
+Rule results are computed once and shared by the agents and Guardian retries
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from app.analysis_context import AnalysisContext
+from app.rules import rule_engine
+import app.agents as agents
+
+TITLE = "Urgent: Invoice Payment Overdue"
+DESCRIPTION = "Invoice #5678 payment is 15 days overdue for VIP customer"
+
+
+class TestAnalysisContext:
+    """Memoized rule results"""
+
+    def test_matches_rule_engine(self):
+        context = AnalysisContext(TITLE, DESCRIPTION)
+        text = f"{TITLE} {DESCRIPTION}"
+        ticket = {"title": TITLE, "description": DESCRIPTION, "category": "Billing"}
+
+        assert context.category() == rule_engine.classify_category(text)
+        assert context.priority("Billing") == rule_engine.classify_priority(text, "Billing")
+        assert context.compliance("Billing") == rule_engine.check_compliance(ticket)
+        assert context.risk("High") == rule_engine.calculate_risk(ticket, {"priority": "High"})
+        assert context.rule_version == rule_engine.version
+
+    def test_results_computed_once(self):
+        context = AnalysisContext(TITLE, DESCRIPTION)
+        for _ in range(3):
+            context.category()
+            context.priority()
+            context.is_confident()
+            context.risk("High")
+
+        assert context.computed == 3  # category, priority(Billing), risk(High)
+
+    def test_inputs_are_part_of_the_key(self):
+        context = AnalysisContext(TITLE, DESCRIPTION)
+
+        assert context.risk("High")["risk_score"] != context.risk("Low")["risk_score"]
+        assert context.computed == 2
+
+    def test_callers_get_copies(self):
+        context = AnalysisContext(TITLE, DESCRIPTION)
+        context.compliance("Billing")["issues"].append("mutated")
+
+        assert "mutated" not in context.compliance("Billing")["issues"]
+
+    def test_shared_between_threads(self):
+        context = AnalysisContext(TITLE, DESCRIPTION)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: context.risk("High"), range(32)))
+
+        assert all(r == results[0] for r in results)
+        assert context.computed == 1
+
+
+class TestAgentsShareContext:
+    """Agents and Guardian retries reuse one context"""
+
+    def test_guardian_retries_reuse_rule_results(self, monkeypatch):
+        calls = []
+
+        def failing_llm(prompt, system="", agent="LLM"):
+            calls.append(prompt)
+            raise RuntimeError("LLM unavailable")
+
+        monkeypatch.setattr(agents, "call_ollama", failing_llm)
+        context = AnalysisContext("Hello", "Something odd happened")
+
+        result = agents.triage_agent("Hello", "Something odd happened", context)
+
+        assert len(calls) == 3  # every Guardian attempt fell through to the LLM
+        assert result["reasoning"].startswith("Guardian fallback")
+        assert context.computed == 2  # category + priority, not once per attempt
+
+    def test_workflow_agents_share_one_scan(self, monkeypatch):
+        monkeypatch.setattr(agents, "call_ollama", lambda prompt, system="", agent="LLM": "Error: offline")
+        scans = []
+        original = rule_engine.scan_ticket
+        monkeypatch.setattr(rule_engine, "scan_ticket", lambda *args: scans.append(args) or original(*args))
+        context = AnalysisContext(TITLE, DESCRIPTION)
+
+        triage = agents.triage_agent(TITLE, DESCRIPTION, context)
+        agents.compliance_agent(TITLE, DESCRIPTION, triage["category"], context)
+        risk = agents.risk_agent(TITLE, DESCRIPTION, triage["priority"], context)
+
+        assert len(scans) == 1
+        assert risk["rule_version"] == rule_engine.version
@@ -0,0 +1,59 @@
+"""
+Tests for the async (aiosqlite) database path
+"""
+
+import asyncio
+import inspect
+import httpx
+import pytest
+from sqlmodel import Session
+from app.database import get_pool_stats
+from app.models import Ticket
+
+
+READ_ENDPOINTS = ["list_tickets", "get_ticket", "analyze_ticket", "get_stats",
+                  "get_tickets_over_time", "get_audit_logs", "get_agent_metrics"]
+
+
+class TestAsyncEndpoints:
+    """Read endpoints run on the event loop with the async engine"""
+
+    def test_endpoints_are_coroutines(self):
+        """No threadpool slot is taken by the dashboard read endpoints"""
+        import app.main as main
+
+        for name in READ_ENDPOINTS:
+            assert inspect.iscoroutinefunction(getattr(main, name)), name
+
+    def test_reads_use_async_pool(self, client, clean_db):
+        with Session(clean_db) as session:
+            session.add(Ticket(title="t", description="d"))
+            session.commit()
+
+        before = get_pool_stats()["async"]["counters"]["checkouts"]
+        assert len(client.get("/tickets").json()) == 1
+        assert client.get("/api/stats").status_code == 200
+        after = get_pool_stats()["async"]["counters"]["checkouts"]
+
+        assert after >= before + 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_clients_on_one_loop(self, clean_db):
+        """Many concurrent dashboard requests are served from a single event loop"""
+        from app.main import app
+        from app.stats_store import stats_store
+
+        with Session(clean_db) as session:
+            for i in range(20):
+                session.add(Ticket(title=f"t{i}", description="d", priority="High"))
+            session.commit()
+        stats_store.rebuild()
+
+        async with httpx.AsyncClient(app=app, base_url="http://test") as ac:
+            responses = await asyncio.gather(*[
+                ac.get("/api/stats" if i % 2 else "/tickets") for i in range(50)
+            ])
+
+        assert all(r.status_code == 200 for r in responses)
+        assert responses[1].json()["kpi_cards"]["total_tickets"] == 20
+        assert len(responses[0].json()) == 20
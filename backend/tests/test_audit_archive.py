@@ -0,0 +1,105 @@
+"""
+Tests for AuditLog retention tiers (hot SQLite + gzip JSONL archive)
+"""
+
+import gzip
+import json
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from sqlmodel import Session, select
+from app.audit_archive import AuditArchiver
+from app.models import AuditLog
+
+NOW = datetime(2026, 6, 1, 12, 0)
+
+
+def add_logs(engine, ages_in_days, ticket_id=1):
+    with Session(engine) as session:
+        for i, age in enumerate(ages_in_days):
+            session.add(AuditLog(
+                event_type="TEST_EVENT",
+                event_category="SYSTEM_ACTION",
+                ticket_id=ticket_id,
+                description=f"entry {i}",
+                created_at=NOW - timedelta(days=age, minutes=i)
+            ))
+        session.commit()
+
+
+def hot_count(engine) -> int:
+    with Session(engine) as session:
+        return session.exec(select(func.count()).select_from(AuditLog)).one()
+
+
+class TestAuditArchiver:
+    """Archival moves old rows to compressed files; reads merge them back"""
+
+    def test_archive_moves_old_rows(self, clean_db, tmp_path):
+        add_logs(clean_db, [60, 41, 40, 2, 1])
+        archiver = AuditArchiver(clean_db, archive_dir=str(tmp_path), retention_days=30, batch_size=2)
+
+        summary = archiver.archive_once(now=NOW)
+
+        assert summary["archived"] == 3
+        assert summary["chunks"] == 2
+        assert hot_count(clean_db) == 2
+        assert len(archiver.archived_days()) == 3
+
+        with gzip.open(tmp_path / f"audit-{archiver.archived_days()[0]}.jsonl.gz", "rt") as f:
+            record = json.loads(f.readline())
+        assert record["event_type"] == "TEST_EVENT"
+
+    def test_read_range_and_dedupe(self, clean_db, tmp_path):
+        """A re-appended chunk (crash before delete) is returned once"""
+        add_logs(clean_db, [1, 40, 41, 42])
+        archiver = AuditArchiver(clean_db, archive_dir=str(tmp_path), retention_days=30)
+
+        with Session(clean_db) as session:
+            from app.audit_archive import row_to_archive_record
+            old = [row_to_archive_record(l) for l in session.exec(select(AuditLog)).all()
+                   if l.created_at < NOW - timedelta(days=30)]
+        archiver._append(old)  # simulated crash after append, before delete
+        archiver.archive_once(now=NOW)
+
+        records = archiver.read(limit=10)
+        assert len(records) == 3
+        assert [r["created_at"] for r in records] == sorted((r["created_at"] for r in records), reverse=True)
+
+        ranged = archiver.read(start=NOW - timedelta(days=41, hours=1), end=NOW - timedelta(days=40, hours=12))
+        assert [r["description"] for r in ranged] == ["entry 2"]
+
+    def test_keeps_max_id_row(self, clean_db, tmp_path):
+        """The newest-id row stays so SQLite never reuses archived ids"""
+        add_logs(clean_db, [50, 40])
+        archiver = AuditArchiver(clean_db, archive_dir=str(tmp_path), retention_days=30)
+
+        archiver.archive_once(now=NOW)
+
+        assert hot_count(clean_db) == 1
+        add_logs(clean_db, [0])
+        with Session(clean_db) as session:
+            ids = sorted(l.id for l in session.exec(select(AuditLog)).all())
+        assert ids[-1] > max(r["id"] for r in archiver.read(limit=10))
+
+    def test_endpoint_merges_hot_and_archive(self, client, clean_db, tmp_path, monkeypatch):
+        from app.audit_archive import audit_archiver
+
+        add_logs(clean_db, [1, 2], ticket_id=1)
+        add_logs(clean_db, [45, 46], ticket_id=2)
+        add_logs(clean_db, [47, 0.5], ticket_id=1)
+        monkeypatch.setattr(audit_archiver, "archive_dir", str(tmp_path))
+        monkeypatch.setattr(audit_archiver, "hot_cutoff", lambda now=None: NOW - timedelta(days=30))
+        audit_archiver.archive_once(now=NOW)
+
+        logs = client.get("/api/audit-logs", params={"limit": 10}).json()
+        assert len(logs) == 6
+        assert [l["created_at"] for l in logs] == sorted((l["created_at"] for l in logs), reverse=True)
+
+        per_ticket = client.get("/api/audit-logs", params={"ticket_id": 1}).json()
+        assert len(per_ticket) == 4
+        assert all(l["ticket_id"] == 1 for l in per_ticket)
+
+        # A recent-only range never opens the archive
+        monkeypatch.setattr(audit_archiver, "read", lambda *a, **k: (_ for _ in ()).throw(AssertionError("archive read")))
+        recent = client.get("/api/audit-logs", params={"start": (NOW - timedelta(days=3)).isoformat()}).json()
+        assert len(recent) == 3
@@ -0,0 +1,120 @@
+"""
+Tests for the buffered audit log writer
+"""
+
+import time
+from sqlalchemy import event, func
+from sqlmodel import Session, select
+from app.audit import AuditSink, build_audit_entry
+from app.event_bus import event_bus
+from app.models import AuditLog
+
+
+def count_logs(engine) -> int:
+    with Session(engine) as session:
+        return session.exec(select(func.count()).select_from(AuditLog)).one()
+
+
+def entry(i: int = 0):
+    return build_audit_entry("TEST_EVENT", "SYSTEM_ACTION", ticket_id=i, description=f"entry {i}")
+
+
+def wait_for(predicate, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestAuditSink:
+    """Batching, bounded buffering and shutdown flush"""
+
+    def test_flushes_in_multi_row_batches(self, clean_db):
+        """12 entries with batch size 5 -> three INSERT statements"""
+        inserts = []
+        listener = lambda conn, cursor, statement, *args: inserts.append(statement) if statement.startswith("INSERT INTO auditlog") else None
+        event.listen(clean_db, "before_cursor_execute", listener)
+
+        sink = AuditSink(clean_db, batch_size=5, flush_interval_ms=10_000)
+        sink.start()
+        try:
+            for i in range(12):
+                sink.submit(entry(i))
+            assert wait_for(lambda: sink.stats()["written"] == 10)
+        finally:
+            sink.stop()
+            event.remove(clean_db, "before_cursor_execute", listener)
+
+        assert count_logs(clean_db) == 12
+        assert len(inserts) == 3
+        assert sink.stats()["batches"] == 3
+
+    def test_flushes_on_interval(self, clean_db):
+        sink = AuditSink(clean_db, batch_size=100, flush_interval_ms=20)
+        sink.start()
+        try:
+            sink.submit(entry())
+            assert wait_for(lambda: count_logs(clean_db) == 1)
+        finally:
+            sink.stop()
+
+    def test_bounded_buffer_drops_and_counts(self, clean_db):
+        sink = AuditSink(clean_db, batch_size=100, flush_interval_ms=10_000, max_buffer=3)
+        sink.start()
+        results = [sink.submit(entry(i)) for i in range(5)]
+        sink.stop()
+
+        assert results == [True, True, True, False, False]
+        assert sink.stats()["dropped"] == 2
+        assert count_logs(clean_db) == 3
+
+    def test_write_failure_keeps_entries(self, clean_db, tmp_path):
+        """A failed flush puts the batch back instead of losing it"""
+        from app.database import build_engine
+
+        broken = build_engine(f"sqlite:///{tmp_path / 'missing-dir' / 'audit.db'}")
+        sink = AuditSink(broken, batch_size=100, flush_interval_ms=10_000)
+        sink.start()
+        sink.submit(entry())
+
+        assert sink.flush() == 0
+        assert sink.stats()["write_failures"] == 1
+        assert sink.stats()["buffered"] == 1
+
+        sink._engine = clean_db
+        sink.stop()
+        assert count_logs(clean_db) == 1
+
+    def test_failing_writes_back_off(self, clean_db, monkeypatch):
+        """A persistent write error with a full batch buffered is retried after a wait, not in a loop"""
+        attempts = []
+
+        def failing(session, statement, *args, **kwargs):
+            attempts.append(time.monotonic())
+            raise RuntimeError("database is locked")
+
+        sink = AuditSink(clean_db, batch_size=2, flush_interval_ms=50)
+        monkeypatch.setattr(Session, "execute", failing)
+        sink.start()
+        try:
+            sink.submit_many([entry(i) for i in range(4)])
+            time.sleep(0.4)
+        finally:
+            monkeypatch.undo()
+            sink.stop()
+
+        # 50 + 100 + 200 ms waits: a handful of attempts, not thousands
+        assert 2 <= len(attempts) <= 5
+        assert sink.stats()["write_failures"] == len(attempts)
+        assert count_logs(clean_db) == 4
+
+    def test_listeners_write_through_global_sink(self, clean_db):
+        """Without a running flusher (no lifespan) listener entries are written immediately"""
+        event_bus.emit("TICKET_CLOSED", {"ticket_id": 7, "pdf_filename": "r.pdf"})
+
+        with Session(clean_db) as session:
+            log = session.exec(select(AuditLog)).one()
+        assert log.event_type == "TICKET_CLOSED"
+        assert log.ticket_id == 7
@@ -0,0 +1,134 @@
+"""
+Tests for bulk ticket ingestion (POST /tickets/bulk)
+"""
+
+import asyncio
+import json
+from sqlalchemy import event, func
+from sqlmodel import Session, select
+from app.event_bus import event_bus, EVENT_PREVIEW_ITEMS
+from app.models import Ticket, AuditLog
+from app.stats_store import stats_store
+from app.bulk_ingest import parse_bulk_payload, run_analysis_batch_async
+import app.main as main
+
+
+def tickets(n: int):
+    return [
+        {"title": f"Bulk {i}", "description": "Printer offline", "priority": "High" if i % 2 else "Low"}
+        for i in range(n)
+    ]
+
+
+def count(engine, model) -> int:
+    with Session(engine) as session:
+        return session.exec(select(func.count()).select_from(model)).one()
+
+
+class TestBulkIngest:
+    """Single-transaction insert, batched event and throughput report"""
+
+    def test_json_array(self, client, clean_db):
+        """All tickets are inserted and counted by the stats store and audit log"""
+        stats_store.rebuild()
+        res = client.post("/tickets/bulk", params={"analyze": False}, json=tickets(25))
+
+        assert res.status_code == 200
+        body = res.json()
+        assert body["created"] == 25
+        assert body["ticket_ids"] == sorted(body["ticket_ids"])
+        assert body["analysis"] == "skipped"
+        assert body["tickets_per_sec"] > 0
+
+        assert count(clean_db, Ticket) == 25
+        assert count(clean_db, AuditLog) == 25
+        snapshot = stats_store.snapshot()
+        assert snapshot["total"] == 25
+        assert snapshot["priority"] == {"High": 12, "Low": 13}
+
+    def test_ndjson(self, client, clean_db):
+        payload = "\n".join(json.dumps(t) for t in tickets(3)) + "\n"
+        res = client.post(
+            "/tickets/bulk", params={"analyze": False}, content=payload,
+            headers={"Content-Type": "application/x-ndjson"}
+        )
+        assert res.json()["created"] == 3
+
+        with Session(clean_db) as session:
+            titles = [t.title for t in session.exec(select(Ticket).order_by(Ticket.id)).all()]
+        assert titles == ["Bulk 0", "Bulk 1", "Bulk 2"]
+
+    def test_chunked_multi_row_insert(self, client, clean_db):
+        """Chunked multi-row INSERTs instead of one statement per ticket"""
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(clean_db, "before_cursor_execute", listener)
+        try:
+            client.post("/tickets/bulk", params={"analyze": False}, json=tickets(1200))
+        finally:
+            event.remove(clean_db, "before_cursor_execute", listener)
+
+        ticket_inserts = [s for s in statements if s.startswith("INSERT INTO ticket ")]
+        assert len(ticket_inserts) == 3  # 500 + 500 + 200 rows
+        assert count(clean_db, Ticket) == 1200
+
+    def test_event_log_keeps_a_preview(self, client, clean_db):
+        """Listeners get every ticket; the event history only a capped preview"""
+        client.post("/tickets/bulk", params={"analyze": False}, json=tickets(50))
+
+        recorded = event_bus.get_recent_events(1)[0]
+        assert recorded["type"] == "TICKETS_BULK_CREATED"
+        assert recorded["data"]["count"] == 50
+        assert len(recorded["data"]["tickets"]) == EVENT_PREVIEW_ITEMS + 1
+        assert recorded["data"]["tickets"][-1] == f"... {50 - EVENT_PREVIEW_ITEMS} more"
+        assert count(clean_db, AuditLog) == 50
+
+    def test_invalid_record_inserts_nothing(self, client, clean_db):
+        payload = tickets(3) + [{"title": "missing description"}]
+        res = client.post("/tickets/bulk", params={"analyze": False}, json=payload)
+
+        assert res.status_code == 400
+        assert "#3" in res.json()["detail"]
+        assert count(clean_db, Ticket) == 0
+
+    def test_limits(self, client, clean_db, monkeypatch):
+        monkeypatch.setattr(main, "BULK_MAX_TICKETS", 2)
+        assert client.post("/tickets/bulk", json=tickets(3)).status_code == 413
+        assert client.post("/tickets/bulk", json=[]).status_code == 400
+        assert client.post("/tickets/bulk", content=b"{not json").status_code == 400
+
+    def test_analyses_queued_as_batch(self, client, clean_db, monkeypatch):
+        """One background task runs every analysis"""
+        seen = []
+
+        async def workflow(*item):
+            seen.append(item)
+
+        monkeypatch.setattr(main, "background_workflow_wrapper", workflow)
+
+        res = client.post("/tickets/bulk", json=tickets(4))
+        assert res.json()["analysis"] == "queued"
+        assert sorted(item[0] for item in seen) == res.json()["ticket_ids"]
+
+
+class TestPayloadAndScheduling:
+    """Payload parsing and bounded analysis concurrency"""
+
+    def test_parse_formats(self):
+        assert parse_bulk_payload(b'[{"a": 1}]') == [{"a": 1}]
+        assert parse_bulk_payload(b'{"a": 1}\n\n{"a": 2}') == [{"a": 1}, {"a": 2}]
+        assert parse_bulk_payload(b"  ") == []
+
+    def test_concurrency_is_bounded(self):
+        active, peak, done = [0], [0], []
+
+        async def worker(ticket_id, title, description):
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+            await asyncio.sleep(0.02)
+            active[0] -= 1
+            done.append(ticket_id)
+
+        asyncio.run(run_analysis_batch_async([(i, "t", "d") for i in range(12)], worker, concurrency=3))
+        assert peak[0] == 3
+        assert sorted(done) == list(range(12))
@@ -0,0 +1,108 @@
+"""
+Unit Tests for the shared database engine
+"""
+
+import asyncio
+import threading
+import pytest
+from sqlmodel import Session, select
+from app import database
+from app.database import engine, get_pool_stats, init_db
+from app.models import Ticket
+
+
+class TestSharedEngine:
+    """The whole process shares one pooled engine"""
+
+    def test_background_workflow_uses_shared_engine(self, monkeypatch):
+        """Background workflows borrow from the shared pool instead of creating engines"""
+        import app.main as main
+
+        seen = []
+
+        async def workflow(tid, title, desc, session):
+            seen.append(session.get_bind())
+
+        monkeypatch.setattr(main, "process_ticket_workflow_async", workflow)
+
+        asyncio.run(main.background_workflow_wrapper(1, "title", "description"))
+
+        assert seen == [engine]
+
+    def test_audit_listeners_use_shared_engine(self):
+        """Audit listener sessions are bound to the shared engine"""
+        from app.audit import get_db_session
+
+        with get_db_session() as session:
+            assert session.get_bind() is engine
+
+    def test_pool_stats_track_checkouts(self):
+        """Checkouts and checkins are counted"""
+        init_db()
+        before = get_pool_stats()["counters"]
+
+        with Session(engine) as session:
+            session.exec(select(Ticket)).all()
+
+        after = get_pool_stats()["counters"]
+        assert after["checkouts"] == before["checkouts"] + 1
+        assert after["checkins"] == before["checkins"] + 1
+        assert after["checked_out"] == before["checked_out"]
+
+    def test_concurrent_sessions_share_pool(self):
+        """Many threads reuse pooled connections (no engine per thread)"""
+        init_db()
+        errors = []
+
+        def worker():
+            try:
+                with Session(engine) as session:
+                    session.exec(select(Ticket)).all()
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(20)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        stats = get_pool_stats()
+        assert not errors
+        assert stats["counters"]["connects"] <= database.POOL_SIZE + database.MAX_OVERFLOW
+        assert stats["config"]["pool_class"] == "InstrumentedQueuePool"
+
+
+class TestStorageProfile:
+    """SQLite PRAGMA profile applied on every connection"""
+
+    def test_performance_profile_applied(self):
+        """Default engine runs in WAL mode with tuned pragmas and no echo"""
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA journal_mode").scalar().lower() == "wal"
+            assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+            assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == 5000
+            assert conn.exec_driver_sql("PRAGMA temp_store").scalar() == 2  # MEMORY
+
+        assert engine.echo is False
+
+    def test_legacy_profile_keeps_defaults(self, tmp_path):
+        """Legacy profile leaves SQLite defaults untouched"""
+        legacy = database.build_engine(f"sqlite:///{tmp_path / 'legacy.db'}", profile="legacy")
+        with legacy.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA journal_mode").scalar().lower() == "delete"
+        legacy.dispose()
+
+    def test_env_override(self, monkeypatch):
+        """Individual DB_* variables override the named profile"""
+        monkeypatch.setenv("DB_BUSY_TIMEOUT_MS", "1234")
+        assert database.get_storage_profile("performance")["busy_timeout"] == "1234"
+
+    def test_rejects_unknown_profile_and_bad_values(self, monkeypatch):
+        """Misconfiguration fails loudly instead of producing bad SQL"""
+        with pytest.raises(ValueError):
+            database.get_storage_profile("turbo")
+
+        monkeypatch.setenv("DB_JOURNAL_MODE", "WAL; DROP TABLE ticket")
+        with pytest.raises(ValueError):
+            database.get_storage_profile("performance")
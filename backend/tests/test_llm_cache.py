@@ -0,0 +1,198 @@
+"""
+Tests for the content-addressed LLM response cache
+Memory LRU/TTL tier, SQLite tier and the call_ollama integration
+"""
+
+import asyncio
+import json
+from datetime import datetime, timedelta
+import pytest
+from sqlmodel import Session
+from app.llm_cache import LLMResponseCache, bypass_llm_cache, cache_key
+from app.models import LLMCacheEntry
+import app.agents as agents
+
+
+def payload(**overrides):
+    base = {"model": "mistral", "prompt": "Classify", "system": "sys", "stream": False, "options": {"temperature": 0.1}}
+    return {**base, **overrides}
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    """Fresh memory-only cache wired into the agents"""
+    cache = LLMResponseCache(max_entries=8, ttl_seconds=60, persist=False)
+    monkeypatch.setattr(agents, "llm_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def ollama(ollama, cache):
+    """Shared fake Ollama wiring (conftest) in front of the test's cache, echoing prompts as JSON"""
+    ollama.responder = lambda p: echo(p["prompt"])  # Only JSON replies are cached
+    return ollama
+
+
+def echo(prompt):
+    return json.dumps({"echo": prompt})
+
+
+def run_async(coro_fn):
+    """Run coroutine(s) and close the async client on the same loop"""
+    async def run():
+        try:
+            return await coro_fn()
+        finally:
+            await agents.async_llm_client.aclose()
+    return asyncio.run(run())
+
+
+class TestCacheKey:
+    """Key covers model, options, system and prompt only"""
+
+    def test_each_field_changes_the_key(self):
+        key = cache_key(payload())
+        assert cache_key(payload(model="llama3")) != key
+        assert cache_key(payload(options={"temperature": 0.2})) != key
+        assert cache_key(payload(system="other")) != key
+        assert cache_key(payload(prompt="Classify!")) != key
+
+    def test_stable_across_dict_order_and_transport_fields(self):
+        reordered = {"options": {"temperature": 0.1}, "prompt": "Classify", "system": "sys", "model": "mistral"}
+        assert cache_key(reordered) == cache_key(payload())
+        assert cache_key(payload(stream=True)) == cache_key(payload())
+
+
+class TestMemoryTier:
+    """LRU eviction and TTL"""
+
+    def test_lru_eviction(self):
+        cache = LLMResponseCache(max_entries=2, ttl_seconds=60, persist=False)
+        cache.put("a", "A")
+        cache.put("b", "B")
+        cache.get("a")  # a becomes most recently used
+        cache.put("c", "C")
+
+        assert (cache.get("a"), cache.get("b"), cache.get("c")) == ("A", None, "C")
+        assert cache.stats.snapshot()["evictions"] == 1
+
+    def test_ttl_expiry(self, monkeypatch):
+        import app.llm_cache as llm_cache_module
+
+        now = [1000.0]
+        monkeypatch.setattr(llm_cache_module.time, "monotonic", lambda: now[0])
+        cache = LLMResponseCache(max_entries=4, ttl_seconds=10, persist=False)
+        cache.put("a", "A")
+
+        now[0] += 9
+        assert cache.get("a") == "A"
+        now[0] += 2
+        assert cache.get("a") is None
+        counters = cache.stats.snapshot()
+        assert (counters["memory_hits"], counters["expired"], counters["misses"]) == (1, 1, 1)
+
+    def test_bypass_skips_lookup(self):
+        cache = LLMResponseCache(max_entries=4, ttl_seconds=60, persist=False)
+        cache.put("a", "A")
+        with bypass_llm_cache():
+            assert cache.get("a") is None
+        assert cache.get("a") == "A"
+        assert cache.stats.snapshot()["bypasses"] == 1
+
+
+class TestPersistentTier:
+    """SQLite tier survives a new cache instance (restart)"""
+
+    def test_survives_restart(self, clean_db):
+        LLMResponseCache(max_entries=4, ttl_seconds=60, persist=True, engine=clean_db).put("k", "stored", "mistral")
+
+        restarted = LLMResponseCache(max_entries=4, ttl_seconds=60, persist=True, engine=clean_db)
+        assert restarted.get("k") == "stored"
+        assert restarted.get("k") == "stored"
+        counters = restarted.stats.snapshot()
+        assert (counters["persistent_hits"], counters["memory_hits"]) == (1, 1)  # promoted to memory
+
+    def test_expired_rows_are_ignored_and_purged(self, clean_db):
+        with Session(clean_db) as session:
+            old = datetime.utcnow() - timedelta(seconds=120)
+            session.add(LLMCacheEntry(key="old", model="mistral", response="stale", created_at=old))
+            session.add(LLMCacheEntry(key="older", model="mistral", response="stale", created_at=old))
+            session.commit()
+        cache = LLMResponseCache(max_entries=4, ttl_seconds=60, persist=True, engine=clean_db)
+
+        assert cache.get("old") is None
+        assert cache.purge_expired() == 1
+        with Session(clean_db) as session:
+            assert session.get(LLMCacheEntry, "older") is None
+
+
+class TestCallOllamaCache:
+    """call_ollama / call_ollama_async reuse responses"""
+
+    def test_repeat_prompt_served_from_cache(self, ollama, cache):
+        assert agents.call_ollama("hi", system="s") == echo("hi")
+        assert agents.call_ollama("hi", system="s") == echo("hi")
+        assert agents.call_ollama("hi", system="other") == echo("hi")
+
+        assert ollama.requests == 2
+        assert cache.stats.snapshot()["memory_hits"] == 1
+
+    def test_errors_are_not_cached(self, ollama, cache, monkeypatch):
+        def offline(path, payload):
+            raise RuntimeError("connection refused")
+
+        online = agents.llm_client.stream_lines
+        monkeypatch.setattr(agents.llm_client, "stream_lines", offline)
+        assert agents.call_ollama("hi").startswith("Error:")
+        monkeypatch.setattr(agents.llm_client, "stream_lines", online)
+
+        assert agents.call_ollama("hi") == echo("hi")
+        assert ollama.requests == 1
+        assert cache.stats.snapshot()["stores"] == 1
+
+    @pytest.mark.parametrize("reply", ["", "I cannot classify this ticket.", '{"category": "HR", "reas'])
+    @pytest.mark.parametrize("stream", [True, False])
+    def test_replies_without_json_are_not_cached(self, ollama, cache, monkeypatch, reply, stream):
+        """Empty, prose-only and truncated replies are retried, not pinned for the TTL"""
+        monkeypatch.setattr(agents, "LLM_STREAMING", stream)
+        ollama.responder = lambda p: reply
+
+        assert agents.call_ollama("hi") == reply
+        assert run_async(lambda: agents.call_ollama_async("hi")) == reply
+        assert agents.call_ollama("hi") == reply
+        assert ollama.requests == 3
+        assert cache.stats.snapshot()["stores"] == 0
+
+    def test_bypass_refreshes_entry(self, ollama, cache):
+        agents.call_ollama("hi")
+        ollama.responder = lambda p: '{"fresh": true}'
+        with bypass_llm_cache():
+            assert agents.call_ollama("hi") == '{"fresh": true}'
+
+        assert agents.call_ollama("hi") == '{"fresh": true}'
+        assert ollama.requests == 2
+
+    def test_async_shares_the_cache(self, ollama, cache):
+        agents.call_ollama("hi")
+
+        async def calls():
+            return await asyncio.gather(*(agents.call_ollama_async("hi") for _ in range(3)))
+
+        assert run_async(calls) == [echo("hi")] * 3
+        assert ollama.requests == 1
+
+    def test_async_bypass_reaches_gathered_calls(self, ollama, cache):
+        run_async(lambda: agents.call_ollama_async("hi"))
+
+        async def forced():
+            with bypass_llm_cache():
+                return await asyncio.gather(agents.call_ollama_async("hi"), agents.call_ollama_async("hi"))
+
+        run_async(forced)
+        assert ollama.requests == 2  # Both skip the cache; the identical in-flight pair is coalesced
+        assert cache.stats.snapshot()["bypasses"] == 2
+
+    def test_cache_stats_endpoint(self, client):
+        data = client.get("/api/llm/cache-stats").json()
+        assert data["config"]["max_entries"] >= 0
+        assert "hit_rate" in data["counters"]
@@ -0,0 +1,215 @@
+"""
+Tests for the pooled LLM client
+Runs against a local keep-alive HTTP server standing in for Ollama (fake_ollama, conftest.py)
+"""
+
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+import pytest
+import requests
+from sqlmodel import Session
+from app.llm_cache import llm_cache
+from app.llm_client import LLMClient, AsyncLLMClient, LLMPoolTimeout
+from app.models import Ticket
+
+
+@pytest.fixture(autouse=True)
+def empty_llm_cache():
+    """Request counts below assume every call reaches the server"""
+    llm_cache.clear()
+
+
+def make_client(server, **kwargs) -> LLMClient:
+    return LLMClient(base_url=server.base_url, **kwargs)
+
+
+def make_async_client(server, **kwargs) -> AsyncLLMClient:
+    return AsyncLLMClient(base_url=server.base_url, **kwargs)
+
+
+class TestLLMClient:
+    """Keep-alive reuse, timeouts and pool metrics"""
+
+    def test_connections_are_reused(self, fake_ollama):
+        client = make_client(fake_ollama, pool_size=4)
+        for i in range(5):
+            assert client.post_json("/api/generate", {"prompt": str(i)}) == {"response": f"echo: {i}"}
+
+        stats = client.pool_stats()
+        assert stats["connections_opened"] == 1
+        assert stats["connections_reused"] == 4
+        assert stats["counters"]["requests"] == 5
+        client.close()
+
+    def test_pool_exhaustion_is_counted(self, fake_ollama):
+        fake_ollama.delay = 0.2
+        client = make_client(fake_ollama, pool_size=1)
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            list(pool.map(lambda i: client.post_json("/api/generate", {"prompt": str(i)}), range(3)))
+
+        counters = client.stats.snapshot()
+        assert counters["pool_waits"] == 2
+        assert counters["peak_in_flight"] == 1
+        assert counters["max_wait_ms"] > 100
+        client.close()
+
+    def test_pool_timeout(self, fake_ollama):
+        fake_ollama.delay = 0.5
+        client = make_client(fake_ollama, pool_size=1, pool_timeout=0.05)
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            futures = [pool.submit(client.post_json, "/api/generate", {"prompt": str(i)}) for i in range(2)]
+            errors = [f.exception() for f in futures]
+
+        assert sum(isinstance(e, LLMPoolTimeout) for e in errors) == 1
+        assert client.stats.snapshot()["pool_timeouts"] == 1
+        client.close()
+
+    def test_read_timeout(self, fake_ollama):
+        fake_ollama.delay = 0.5
+        client = make_client(fake_ollama, read_timeout=0.05)
+
+        with pytest.raises(requests.exceptions.Timeout):
+            client.post_json("/api/generate", {"prompt": "slow"})
+        counters = client.stats.snapshot()
+        assert (counters["timeouts"], counters["errors"], counters["in_flight"]) == (1, 1, 0)
+        client.close()
+
+    def test_call_ollama_uses_shared_client(self, fake_ollama, monkeypatch):
+        import app.agents as agents
+
+        client = make_client(fake_ollama)
+        monkeypatch.setattr(agents, "llm_client", client)
+
+        assert agents.call_ollama("hi") == "echo: hi"
+        assert client.stats.snapshot()["requests"] == 1
+        client.close()
+
+    def test_pool_stats_endpoint(self, client):
+        data = client.get("/api/llm/pool-stats").json()
+        assert data["config"]["pool_size"] >= 1
+        assert "pool_waits" in data["counters"]
+
+
+class TestAsyncLLMClient:
+    """Pending async LLM calls cost coroutines, not threads"""
+
+    def test_many_pending_calls_share_few_connections(self, fake_ollama):
+        fake_ollama.delay = 0.02
+        client = make_async_client(fake_ollama, concurrency=4)
+
+        async def run():
+            threads_before = threading.active_count()
+            calls = [client.post_json("/api/generate", {"prompt": str(i)}) for i in range(100)]
+            results = await asyncio.gather(*calls)
+            await client.aclose()
+            return results, threads_before
+
+        results, threads_before = asyncio.run(run())
+
+        assert [r["response"] for r in results] == [f"echo: {i}" for i in range(100)]
+        stats = client.pool_stats()
+        assert stats["counters"]["peak_in_flight"] == 4
+        assert stats["peak_waiting"] >= 90
+        assert stats["counters"]["pool_waits"] >= 90
+        assert threading.active_count() <= threads_before + 4  # server handler threads only
+
+    def test_read_timeout(self, fake_ollama):
+        fake_ollama.delay = 0.5
+        client = make_async_client(fake_ollama, read_timeout=0.05)
+
+        async def run():
+            try:
+                await client.post_json("/api/generate", {"prompt": "slow"})
+            finally:
+                await client.aclose()
+
+        with pytest.raises(httpx.TimeoutException):
+            asyncio.run(run())
+        counters = client.stats.snapshot()
+        assert (counters["timeouts"], counters["in_flight"]) == (1, 0)
+
+    def test_pool_timeout(self, fake_ollama):
+        fake_ollama.delay = 0.3
+        client = make_async_client(fake_ollama, concurrency=1, pool_timeout=0.05)
+
+        async def run():
+            results = await asyncio.gather(
+                *(client.post_json("/api/generate", {"prompt": str(i)}) for i in range(2)),
+                return_exceptions=True
+            )
+            await client.aclose()
+            return results
+
+        results = asyncio.run(run())
+        assert sum(isinstance(r, LLMPoolTimeout) for r in results) == 1
+
+
+class TestAsyncAgents:
+    """Async agents and workflow use the async client end to end"""
+
+    def test_call_ollama_async(self, fake_ollama, monkeypatch):
+        import app.agents as agents
+
+        client = make_async_client(fake_ollama)
+        monkeypatch.setattr(agents, "async_llm_client", client)
+
+        async def run():
+            try:
+                return await agents.call_ollama_async("hi")
+            finally:
+                await client.aclose()
+
+        assert asyncio.run(run()) == "echo: hi"
+
+    def test_async_guardian_falls_back(self, monkeypatch):
+        import app.agents as agents
+
+        async def offline(prompt, system="", agent="LLM"):
+            raise RuntimeError("LLM unavailable")
+
+        monkeypatch.setattr(agents, "call_ollama_async", offline)
+        result = asyncio.run(agents.triage_agent_async("Hello", "Something odd happened"))
+
+        assert result["reasoning"].startswith("Guardian fallback")
+
+    def test_workflow_runs_agents_as_coroutines(self, fake_ollama, clean_db, monkeypatch):
+        import app.agents as agents
+        from app.workflow_engine import process_ticket_workflow_async
+
+        fake_ollama.reply = json.dumps({
+            "category": "HR", "priority": "Low", "department": "HR", "reasoning": "Leave request for HR"
+        })
+        client = make_async_client(fake_ollama)
+        monkeypatch.setattr(agents, "async_llm_client", client)
+        monkeypatch.setattr(asyncio, "to_thread", _only_database_threads(asyncio.to_thread))
+
+        with Session(clean_db) as session:
+            ticket = Ticket(title="Holiday", description="I would like to book annual leave in August")
+            session.add(ticket)
+            session.commit()
+            ticket_id = ticket.id
+
+            async def run():
+                try:
+                    return await process_ticket_workflow_async(ticket_id, ticket.title, ticket.description, session)
+                finally:
+                    await client.aclose()
+
+            result = asyncio.run(run())
+
+        assert result["triage"]["category"] == "HR"
+        assert result["metadata"]["llm_used"] is True
+        assert client.stats.snapshot()["requests"] == 1
+        with Session(clean_db) as session:
+            assert session.get(Ticket, ticket_id).ai_priority == "Low"
+
+
+def _only_database_threads(to_thread):
+    """asyncio.to_thread guard: agents must not be pushed to threads"""
+    async def guarded(func, *args, **kwargs):
+        assert "agent" not in getattr(func, "__name__", ""), func
+        return await to_thread(func, *args, **kwargs)
+    return guarded
@@ -0,0 +1,136 @@
+"""
+Tests for streamed LLM replies
+Incremental JSON detection and early termination against the fake Ollama server
+"""
+
+import asyncio
+import json
+import time
+import pytest
+from app.llm_stream import IncrementalJSONObject, OllamaStreamReader, LLMStreamStats, llm_stream_stats
+import app.agents as agents
+
+TRIAGE_JSON = json.dumps({"category": "HR", "priority": "Low", "department": "HR", "reasoning": "Leave {request}"})
+RAMBLING = " The ticket concerns annual leave and should go to HR." * 10  # ~140 more tokens
+
+
+def feed_all(detector, text, size=3):
+    for i in range(0, len(text), size):
+        if detector.feed(text[i:i + size]):
+            return True
+    return False
+
+
+@pytest.fixture
+def ollama(ollama):
+    """Shared fake Ollama wiring (conftest) with fresh streaming stats"""
+    llm_stream_stats.reset()
+    return ollama
+
+
+def wait_for_abort(server, timeout=2.0):
+    deadline = time.time() + timeout
+    while not server.aborted and time.time() < deadline:
+        time.sleep(0.01)
+    return server.aborted
+
+
+class TestIncrementalJSONObject:
+    """Brace matching outside strings, across arbitrary chunk boundaries"""
+
+    def test_object_split_across_chunks(self):
+        detector = IncrementalJSONObject()
+        assert feed_all(detector, TRIAGE_JSON + RAMBLING)
+        assert detector.value["reasoning"] == "Leave {request}"
+        assert detector.raw == TRIAGE_JSON
+
+    def test_prose_fences_and_nesting(self):
+        text = 'Sure! ```json\n{"impact_areas": ["Finance"], "meta": {"quote": "a \\"}\\" b"}}\n``` done'
+        detector = IncrementalJSONObject()
+
+        assert feed_all(detector, text, size=1)
+        assert detector.value["meta"]["quote"] == 'a "}" b'
+
+    def test_unparseable_candidate_is_skipped(self):
+        detector = IncrementalJSONObject()
+        assert feed_all(detector, 'Use {braces} like {"a": 1}')
+        assert detector.value == {"a": 1}
+
+    def test_incomplete_object(self):
+        detector = IncrementalJSONObject()
+        assert not feed_all(detector, TRIAGE_JSON[:-1])
+        assert not detector.complete
+
+
+class TestOllamaStreamReader:
+    """NDJSON events -> reply text and per-agent latencies"""
+
+    def test_reply_without_object_is_returned_whole(self):
+        stats = LLMStreamStats()
+        reader = OllamaStreamReader("Risk Agent", stats)
+        for event in ({"response": "no json "}, {"response": "here"}, {"response": "", "done": True}):
+            stop = reader.feed(json.dumps(event))
+
+        assert stop and reader.finish() == "no json here"
+        agent = stats.snapshot()["Risk Agent"]
+        assert (agent["calls"], agent["objects"], agent["early_stops"]) == (1, 0, 0)
+        assert agent["avg_time_to_object_ms"] is None
+
+    def test_error_event_raises(self):
+        with pytest.raises(RuntimeError, match="model not found"):
+            OllamaStreamReader("Triage Agent", LLMStreamStats()).feed('{"error": "model not found"}')
+
+
+class TestStreamingCalls:
+    """call_ollama stops reading once the JSON object is complete"""
+
+    def test_sync_call_stops_early(self, ollama):
+        ollama.reply = TRIAGE_JSON + RAMBLING
+        ollama.token_delay = 0.01
+        total_events = len(ollama.reply) // 4 + 2
+
+        start = time.perf_counter()
+        response = agents.call_ollama("Classify", agent="Triage Agent")
+        elapsed = time.perf_counter() - start
+
+        assert response == TRIAGE_JSON
+        assert elapsed < total_events * 0.01 / 2
+        assert wait_for_abort(ollama) == 1
+        assert ollama.tokens_sent < total_events
+
+        stats = llm_stream_stats.snapshot()["Triage Agent"]
+        assert (stats["calls"], stats["objects"], stats["early_stops"]) == (1, 1, 1)
+        assert 0 < stats["avg_ttft_ms"] <= stats["avg_time_to_object_ms"]
+
+    def test_async_call_stops_early(self, ollama):
+        ollama.reply = TRIAGE_JSON + RAMBLING
+        ollama.token_delay = 0.01
+
+        async def run():
+            try:
+                return await agents.call_ollama_async("Classify", agent="Risk Agent")
+            finally:
+                await agents.async_llm_client.aclose()
+
+        assert asyncio.run(run()) == TRIAGE_JSON
+        assert wait_for_abort(ollama) == 1
+        assert llm_stream_stats.snapshot()["Risk Agent"]["early_stops"] == 1
+        assert agents.async_llm_client.stats.snapshot()["in_flight"] == 0
+
+    def test_triage_agent_parses_streamed_reply(self, ollama):
+        ollama.reply = "```json\n" + TRIAGE_JSON + "\n```" + RAMBLING
+
+        result = agents.triage_agent_raw("Holiday", "I would like to book annual leave in August")
+
+        assert (result["category"], result["department"]) == ("HR", "HR")
+        assert llm_stream_stats.snapshot()["Triage Agent"]["calls"] == 1
+
+    def test_non_streaming_mode(self, ollama, monkeypatch):
+        monkeypatch.setattr(agents, "LLM_STREAMING", False)
+        ollama.reply = TRIAGE_JSON + RAMBLING
+
+        assert agents.call_ollama("Classify") == (TRIAGE_JSON + RAMBLING).strip()
+        assert llm_stream_stats.snapshot() == {}
+
+    def test_agent_metrics_expose_streaming(self, client):
+        assert "llm_streaming" in client.get("/api/agent-metrics").json()
@@ -0,0 +1,153 @@
+"""
+Tests for near-duplicate ticket detection
+Fingerprint/MinHash index and triage reuse in the workflow
+"""
+
+import asyncio
+import json
+import threading
+from sqlmodel import Session
+from app.models import Ticket
+from app.near_duplicates import NearDuplicateIndex, near_duplicate_index, normalize_text
+import app.agents as agents
+
+TRIAGE = {
+    "category": "Technical",
+    "priority": "High",
+    "department": "IT",
+    "reasoning": "VPN outage blocks remote work"
+}
+VPN_TITLE = "VPN not working"
+VPN_DESCRIPTION = "My VPN client disconnects every few minutes since this morning, error 691 on the company laptop"
+
+
+def index_with(*tickets, **kwargs) -> NearDuplicateIndex:
+    index = NearDuplicateIndex(**kwargs)
+    for ticket_id, title, description in tickets:
+        index.add(ticket_id, index.signature(title, description), TRIAGE)
+    return index
+
+
+class TestNearDuplicateIndex:
+    """Fingerprints, MinHash similarity and LSH candidates"""
+
+    def test_normalization_ignores_numbers_case_and_punctuation(self):
+        assert normalize_text("Invoice #5678 delayed", "Order  12") == normalize_text("invoice 91 DELAYED!", "order 7")
+
+    def test_template_copy_is_exact_match(self):
+        index = index_with((1, "Invoice #5678 delayed", "Payment for order 12 is late"))
+        match = index.lookup(index.signature("Invoice #9012 delayed", "Payment for order 345 is late."))
+
+        assert (match.ticket_id, match.similarity, match.exact) == (1, 1.0, True)
+        assert match.triage == TRIAGE
+
+    def test_small_edit_is_near_match(self):
+        index = index_with((1, VPN_TITLE, VPN_DESCRIPTION))
+        match = index.lookup(index.signature(VPN_TITLE, VPN_DESCRIPTION + " please help"))
+
+        assert match.ticket_id == 1 and not match.exact
+        assert index.threshold <= match.similarity < 1.0
+
+    def test_different_ticket_and_threshold(self):
+        index = index_with((1, VPN_TITLE, VPN_DESCRIPTION))
+        assert index.lookup(index.signature("Printer jammed", "The printer on floor 3 is jammed")) is None
+
+        strict = index_with((1, VPN_TITLE, VPN_DESCRIPTION), threshold=1.0)
+        assert strict.lookup(strict.signature(VPN_TITLE, VPN_DESCRIPTION + " please help")) is None
+
+    def test_excludes_the_ticket_itself(self):
+        index = index_with((1, VPN_TITLE, VPN_DESCRIPTION))
+        assert index.lookup(index.signature(VPN_TITLE, VPN_DESCRIPTION), exclude=1) is None
+
+    def test_only_validated_triage_is_indexed(self):
+        index = index_with((1, VPN_TITLE, VPN_DESCRIPTION))
+        signature = index.signature(VPN_TITLE, VPN_DESCRIPTION)
+        fallback = {**TRIAGE, "reasoning": "Guardian fallback: Triage Agent output validation failed"}
+
+        assert index.add(2, signature, {**TRIAGE, "department": "General"}) is False
+        assert index.add(1, signature, fallback) is False  # Re-analysis drops the old entry
+        assert len(index) == 0
+
+    def test_oldest_entries_evicted(self):
+        index = index_with((1, VPN_TITLE, VPN_DESCRIPTION), (2, "Printer jammed", "Floor 3 printer"), max_entries=1)
+
+        assert len(index) == 1
+        assert index.lookup(index.signature(VPN_TITLE, VPN_DESCRIPTION)) is None
+
+    def test_stats(self):
+        index = index_with((1, VPN_TITLE, VPN_DESCRIPTION))
+        index.lookup(index.signature(VPN_TITLE, VPN_DESCRIPTION))
+        index.lookup(index.signature("Printer jammed", "Floor 3 printer"))
+
+        stats = index.snapshot()
+        assert (stats["indexed_tickets"], stats["exact_hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 1, 0.5)
+
+    def test_rebuild_from_analyzed_tickets(self, clean_db):
+        with Session(clean_db) as session:
+            session.add(Ticket(title=VPN_TITLE, description=VPN_DESCRIPTION, ai_analysis=json.dumps({"triage": TRIAGE})))
+            session.add(Ticket(title="Printer jammed", description="Floor 3 printer"))
+            session.commit()
+        index = NearDuplicateIndex()
+
+        assert index.rebuild(clean_db) == 1
+        assert index.lookup(index.signature(VPN_TITLE, VPN_DESCRIPTION)).triage == TRIAGE
+
+
+class TestWorkflowReuse:
+    """Copies of an analyzed ticket skip the LLM"""
+
+    def test_copy_reuses_triage(self, clean_db, monkeypatch):
+        from app.workflow_engine import process_ticket_workflow_async
+
+        prompts = []
+
+        async def llm(prompt, system="", agent="LLM"):
+            prompts.append(prompt)
+            return json.dumps({"category": "HR", "priority": "Low", "department": "HR", "reasoning": "Leave request for HR"})
+
+        monkeypatch.setattr(agents, "call_ollama_async", llm)
+
+        def analyze(description, refresh=False):
+            with Session(clean_db) as session:
+                ticket = Ticket(title="Holiday", description=description)
+                session.add(ticket)
+                session.commit()
+                return asyncio.run(process_ticket_workflow_async(ticket.id, ticket.title, description, session, refresh))
+
+        first = analyze("I would like to book annual leave from 4 to 8 August")
+        copy = analyze("I would like to book annual leave from 11 to 15 August")
+        forced = analyze("I would like to book annual leave from 18 to 22 August", refresh=True)
+
+        assert len(prompts) == 2  # first + forced re-analysis
+        assert copy["triage"]["duplicate_of"] == first["ticket_id"]
+        assert copy["triage"]["category"] == "HR"
+        assert copy["metadata"]["llm_used"] is False
+        assert forced["metadata"]["llm_used"] is True
+        assert near_duplicate_index.snapshot()["indexed_tickets"] == 3
+
+    def test_minhash_runs_off_the_event_loop(self, clean_db, monkeypatch):
+        """Signature, lookup and add run in worker threads, even for rule-confident tickets"""
+        from app.workflow_engine import process_ticket_workflow_async
+
+        threads = []
+        for name in ("signature", "lookup", "add"):
+            original = getattr(near_duplicate_index, name)
+            monkeypatch.setattr(near_duplicate_index, name,
+                                lambda *args, _original=original, **kwargs: threads.append(threading.get_ident())
+                                or _original(*args, **kwargs))
+
+        with Session(clean_db) as session:
+            ticket = Ticket(title="Production outage", description="Production server down, payment API returns 500")
+            session.add(ticket)
+            session.commit()
+            asyncio.run(process_ticket_workflow_async(ticket.id, ticket.title, ticket.description, session))
+
+        assert len(threads) >= 2  # signature + add (lookup only when the LLM is needed)
+        assert threading.get_ident() not in threads
+
+    def test_agent_metrics_expose_index(self, client):
+        data = client.get("/api/agent-metrics").json()
+
+        assert data["near_duplicates"]["config"]["threshold"] == near_duplicate_index.threshold
+        assert "hit_rate" in data["near_duplicates"]
+        assert "duplicate_reuse_count" in data["intelligence_breakdown"]
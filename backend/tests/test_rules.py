@@ -150,3 +150,298 @@ class TestWorkflowIntegration:
         # High priority + Billing + VIP
         assert risk_result["risk_score"] >= 60
         assert risk_result["risk_level"] in ["Medium", "High"]
+
+
+class TestSinglePassScanner:
+    """Compiled rule plan: one scan feeding all four classifiers"""
+
+    def test_one_scan_per_ticket(self):
+        """scan_ticket splits title+description hits without rescanning"""
+        hits = rule_engine.scan_ticket("Production outage", "Customer cannot login")
+
+        assert hits.has("risk:production")
+        assert hits.has("category:Access")
+        assert not hits.description.has("risk:production")
+        assert hits.description.terms("category:Access") == ["login"]
+        assert rule_engine.scan_ticket("Production outage", "Customer cannot login") is hits
+
+    def test_same_text_split_differently(self):
+        """Tickets joining to the same text keep their own description hits"""
+        rule_engine.scan_ticket("VPN", "production outage")
+        hits = rule_engine.scan_ticket("VPN production", "outage")
+
+        assert not hits.description.has("risk:production")
+        assert rule_engine.scan_ticket("VPN", "production outage").description.has("risk:production")
+        ticket = {"title": "VPN production", "description": "outage", "category": "Technical"}
+        uncached = rule_engine.calculate_risk(ticket, {"priority": "High"})
+        assert rule_engine.calculate_risk(ticket, {"priority": "High"}, hits=hits) == uncached
+
+    def test_word_boundaries_per_signal(self):
+        """The same term can be word-bounded for one rule and a substring for another"""
+        hits = rule_engine.plan.scan("invoices for the prepayment")
+
+        assert hits.has("compliance:financial")          # 'invoice' substring
+        assert not hits.has("category:Billing")          # \binvoice\b / \bpayment\b fail
+        assert rule_engine.plan.scan("the stale report").has("compliance:financial")   # 'po'
+        assert not rule_engine.plan.scan("the stale report").has("priority:billing_escalation")
+
+    def test_overlapping_and_prefix_terms(self):
+        """Terms inside or sharing a prefix with a longer match are still found"""
+        hits = rule_engine.plan.scan("please share password now")
+        assert hits.has("compliance:violation")
+        assert hits.terms("category:Access") == ["password"]
+
+        hits = rule_engine.plan.scan("vipo")  # 'po' starts inside 'vip'
+        assert hits.has("compliance:financial")
+        assert not hits.has("risk:vip")
+
+        assert rule_engine.plan.scan("need info").terms("priority:low") == ["info"]
+
+    def test_case_insensitive_multi_word(self):
+        assert rule_engine.plan.scan("HOW TO reset").has("priority:low")
+        assert not rule_engine.plan.scan("howto reset").has("priority:low")
+
+    def test_hits_are_shared_by_all_classifiers(self):
+        title, description = "VIP refund", "Refund overdue, invoice #12 for the CEO"
+        hits = rule_engine.scan_ticket(title, description)
+        text = f"{title} {description}"
+        ticket = {"title": title, "description": description, "category": "Billing"}
+
+        assert rule_engine.classify_category(text, hits=hits) == rule_engine.classify_category(text)
+        assert rule_engine.classify_priority(text, "Billing", hits=hits)["priority"] == "High"
+        assert rule_engine.check_compliance(ticket, hits=hits) == rule_engine.check_compliance(ticket)
+        risk = rule_engine.calculate_risk(ticket, {"priority": "High"}, hits=hits)
+        assert risk == rule_engine.calculate_risk(ticket, {"priority": "High"})
+        assert risk["risk_score"] == 85
+
+
+class TestMatcherBackends:
+    """Regex and Aho-Corasick backends report the same hits"""
+
+    TEXTS = [
+        "URGENT: Production Outage Critical server down affecting all users",
+        "Please share password with new employee, override the vipo policy",
+        "invoices for the prepayment, see report #12 ($40) overdue",
+        "How to reset?  how  to login; e-mail user@corp.com id 7",
+        "",
+        "Ünïcode tëxt with VPN and ĆEO director",
+    ]
+
+    @pytest.mark.parametrize("text", TEXTS)
+    def test_backends_agree(self, text):
+        from app.rules import RulePlan, MATCHERS, rule_engine
+
+        signals = rule_engine.rule_set.signals
+        results = [
+            {signal: sorted(found) for signal, found in RulePlan(signals, matcher=name).scan(text).signals.items()}
+            for name in MATCHERS
+        ]
+        assert all(result == results[0] for result in results)
+
+    def test_overlapping_terms_aho_corasick(self):
+        from app.rules import RulePlan
+
+        plan = RulePlan({"a": (["he", "she", "hers"], False), "b": (["his"], True)}, matcher="aho_corasick")
+        hits = plan.scan("ushers his")
+        assert sorted(hits.signals["a"]) == [(1, "she"), (2, "he"), (2, "hers")]
+        assert hits.signals["b"] == [(7, "his")]
+
+    def test_unknown_matcher(self):
+        from app.rules import RulePlan, rule_engine
+
+        with pytest.raises(ValueError):
+            RulePlan(rule_engine.rule_set.signals, matcher="nfa")
+
+
+class TestClassifyBatch:
+    """Batch classification matches the single-ticket path"""
+
+    TICKETS = [
+        {"title": "Urgent: Invoice Payment Overdue", "description": "Invoice #5678 payment is 15 days overdue for VIP customer"},
+        {"title": "VPN Access Needed", "description": "Please share password with new employee"},
+        {"title": "Question", "description": "How to change my email preferences?"},
+        {"title": "Shipment delayed", "description": "Warehouse says production line is down"},
+        {"title": "Hello", "description": ""},
+    ]
+
+    def expected(self):
+        return [rule_engine.classify_ticket(t["title"], t["description"]) for t in self.TICKETS]
+
+    def test_in_process(self):
+        assert rule_engine.classify_batch(self.TICKETS, workers=1) == self.expected()
+
+    def test_classify_ticket_matches_individual_calls(self):
+        ticket = self.TICKETS[0]
+        result = rule_engine.classify_ticket(ticket["title"], ticket["description"])
+        text = f"{ticket['title']} {ticket['description']}"
+
+        assert result["category"] == rule_engine.classify_category(text)
+        assert result["priority"] == rule_engine.classify_priority(text, "Billing")
+        assert result["compliance"] == rule_engine.check_compliance({**ticket, "category": "Billing"})
+        assert result["risk"]["risk_score"] == 85
+
+    def test_process_pool_preserves_order(self, monkeypatch):
+        import app.rules as rules
+
+        monkeypatch.setattr(rules, "RULE_BATCH_PARALLEL_MIN", 0)
+        tickets = self.TICKETS * 20
+        try:
+            results = rule_engine.classify_batch(tickets, workers=2, chunk_size=7)
+        finally:
+            rules.shutdown_batch_pool()
+
+        assert results == self.expected() * 20
+
+
+class TestWeightedScoring:
+    """Confidence reflects weighted evidence across all categories"""
+
+    def test_ambiguous_ticket_is_not_confident(self):
+        text = "Login page shows error when I try to login"
+        category = rule_engine.classify_category(text)
+
+        assert category["category"] == "Access"
+        assert category["confidence"] < rule_engine.classify_category("Password reset for my login")["confidence"]
+        assert category["confidence"] < 0.8
+
+    def test_highest_score_wins_over_category_order(self):
+        # Billing comes first in category_order but has the weaker evidence
+        result = rule_engine.classify_category("Price of the VPN: cannot login, password rejected")
+        assert result["category"] == "Access"
+
+    def test_tie_has_zero_confidence(self):
+        result = rule_engine.classify_category("invoice password")
+        assert result["category"] == "Billing"
+        assert result["confidence"] == 0.0
+
+    def test_weak_term_alone_is_not_confident(self):
+        assert rule_engine.classify_category("What does it cost")["confidence"] < 0.8
+        assert rule_engine.classify_category("Refund my invoice")["confidence"] >= 0.8
+
+    def test_conflicting_priority_lowers_confidence(self):
+        clear = rule_engine.classify_priority("Urgent: server down", "Technical")
+        mixed = rule_engine.classify_priority("Urgent question, how to restart the server", "Technical")
+
+        assert clear["priority"] == "High"
+        assert mixed["confidence"] < clear["confidence"]
+
+    def test_is_confident_gate(self):
+        text = "Urgent: shipment stuck at the warehouse"
+        category = rule_engine.classify_category(text)
+        priority = rule_engine.classify_priority(text, category["category"])
+
+        assert rule_engine.is_confident(category, priority)
+        assert not rule_engine.is_confident(rule_engine.classify_category("hello"), priority)
+
+        # No priority term at all: the Medium default is not evidence, so the LLM decides
+        text = "Shipment stuck at the warehouse"
+        default = rule_engine.classify_priority(text, category["category"])
+        assert default["method"] == "default"
+        assert not rule_engine.is_confident(rule_engine.classify_category(text), default)
+
+    def test_invalid_weights_rejected(self):
+        from app.rules import parse_rule_set
+        import json
+
+        data = dict(rule_engine.rule_set.data)
+        data["signals"] = dict(data["signals"], **{"category:Billing": {"word_bounded": True, "terms": ["invoice"], "weights": {"invoice": -1}}})
+        with pytest.raises(ValueError):
+            parse_rule_set(json.dumps(data).encode())
+        with pytest.raises(ValueError):
+            parse_rule_set(json.dumps(dict(rule_engine.rule_set.data, scoring={"threshold": 1})).encode())
+
+
+class TestRuleSetReload:
+    """Versioned rule set files, validation and atomic hot reload"""
+
+    @staticmethod
+    def write_rule_set(path, version, extra_terms=()):
+        import json
+
+        data = dict(rule_engine.rule_set.data, version=version)
+        signals = dict(data["signals"])
+        signals["risk:vip"] = {"word_bounded": True, "terms": signals["risk:vip"]["terms"] + list(extra_terms)}
+        data["signals"] = signals
+        path.write_text(json.dumps(data))
+
+    def engine_for(self, path):
+        from app.rules import RuleEngine, RuleSet
+
+        engine = RuleEngine.from_rule_set(RuleSet.from_file(str(path)))
+        engine._path = str(path)
+        engine._file_state = engine._stat(str(path))
+        return engine
+
+    def test_results_are_stamped_with_version(self):
+        result = rule_engine.classify_ticket("Invoice overdue", "Invoice #5 overdue for VIP")
+        version = rule_engine.version
+
+        assert version
+        assert {part["rule_version"] for part in result.values()} == {version}
+
+    def test_reload_swaps_in_new_version(self, tmp_path):
+        path = tmp_path / "rules.json"
+        self.write_rule_set(path, "v1")
+        engine = self.engine_for(path)
+        ticket = {"title": "Outage", "description": "platinum customer affected"}
+        assert engine.calculate_risk(ticket, {"priority": "Low"})["risk_score"] == 30
+
+        in_flight = engine.scan_ticket(ticket["title"], ticket["description"])
+        self.write_rule_set(path, "v2", extra_terms=["platinum"])
+        result = engine.reload()
+
+        assert result["status"] == "reloaded"
+        assert (result["previous_version"], result["version"]) == ("v1", "v2")
+        risk = engine.calculate_risk(ticket, {"priority": "Low"})
+        assert (risk["risk_score"], risk["rule_version"]) == (45, "v2")
+        # Hits scanned before the swap keep classifying with the version that produced them
+        assert engine.calculate_risk(ticket, {"priority": "Low"}, hits=in_flight)["rule_version"] == "v1"
+
+    def test_changed_content_needs_new_version(self, tmp_path):
+        path = tmp_path / "rules.json"
+        self.write_rule_set(path, "v1")
+        engine = self.engine_for(path)
+        self.write_rule_set(path, "v1", extra_terms=["platinum"])
+
+        with pytest.raises(ValueError):
+            engine.reload()
+        assert engine.version == "v1"
+        assert engine.last_reload["status"] == "error"
+
+    def test_invalid_file_keeps_active_rule_set(self, tmp_path):
+        path = tmp_path / "rules.json"
+        self.write_rule_set(path, "v1")
+        engine = self.engine_for(path)
+        plan = engine.plan
+
+        path.write_text('{"version": "v2", "signals": {"risk:vip": {"terms": ["vip"]}}}')
+        assert engine.reload_if_changed()["status"] == "error"
+        assert engine.plan is plan
+        # The broken file is not retried on every poll
+        assert engine.reload_if_changed() is None
+
+    def test_unchanged_file_is_not_reloaded(self, tmp_path):
+        path = tmp_path / "rules.json"
+        self.write_rule_set(path, "v1")
+        engine = self.engine_for(path)
+
+        assert engine.reload_if_changed() is None
+        assert engine.reload()["status"] == "unchanged"
+
+    def test_yaml_rule_set(self, tmp_path):
+        yaml = pytest.importorskip("yaml")
+        from app.rules import RuleSet
+
+        path = tmp_path / "rules.yaml"
+        path.write_text(yaml.safe_dump(dict(rule_engine.rule_set.data, version="yaml-1")))
+        rule_set = RuleSet.from_file(str(path))
+
+        assert rule_set.version == "yaml-1"
+        assert rule_set.signals == rule_engine.rule_set.signals
+
+    def test_rules_api(self, client):
+        info = client.get("/api/rules").json()
+        assert info["version"] == rule_engine.version
+        assert info["checksum"] == rule_engine.rule_set.checksum
+
+        assert client.post("/api/rules/reload").json()["status"] == "unchanged"
@@ -0,0 +1,150 @@
+"""
+Tests for single-flight coalescing of identical in-flight LLM requests
+SingleFlight/AsyncSingleFlight primitives and the threaded/async agent paths
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from app.llm_client import LLMClient
+from app.single_flight import SingleFlight, AsyncSingleFlight
+import app.agents as agents
+
+
+class TestSingleFlight:
+    """Threaded callers share the leader's result or exception"""
+
+    def test_concurrent_callers_share_one_call(self):
+        flight = SingleFlight()
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def fn():
+            calls.append(1)
+            started.set()
+            release.wait(2)
+            return "shared"
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            leader = pool.submit(flight.do, "k", fn)
+            started.wait(2)
+            followers = [pool.submit(flight.do, "k", fn) for _ in range(3)]
+            while flight.stats.snapshot()["coalesced"] < 3:
+                time.sleep(0.001)
+            release.set()
+            results = [leader.result()] + [f.result() for f in followers]
+
+        assert results == ["shared"] * 4
+        assert calls == [1]
+        counters = flight.stats.snapshot()
+        assert (counters["leaders"], counters["coalesced"], counters["peak_waiters"]) == (1, 3, 3)
+        assert counters["in_flight"] == 0
+
+    def test_exception_reaches_every_waiter_and_next_call_runs_fresh(self):
+        flight = SingleFlight()
+        started, release = threading.Event(), threading.Event()
+
+        def boom():
+            started.set()
+            release.wait(2)
+            raise RuntimeError("down")
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            leader = pool.submit(flight.do, "k", boom)
+            started.wait(2)
+            follower = pool.submit(flight.do, "k", boom)
+            while flight.stats.snapshot()["coalesced"] < 1:
+                time.sleep(0.001)
+            release.set()
+            for future in (leader, follower):
+                with pytest.raises(RuntimeError):
+                    future.result()
+
+        assert flight.do("k", lambda: "fresh") == "fresh"
+
+
+class TestAsyncSingleFlight:
+    """Coroutines share one task; a cancelled caller does not cancel it"""
+
+    def test_gathered_callers_share_one_call(self):
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return "shared"
+
+        async def main():
+            return await asyncio.gather(*(flight.do("k", fn) for _ in range(5)), flight.do("other", fn))
+
+        assert asyncio.run(main()) == ["shared"] * 6
+        assert len(calls) == 2  # One per key
+        counters = flight.stats.snapshot()
+        assert (counters["leaders"], counters["coalesced"], counters["peak_waiters"]) == (2, 4, 4)
+
+    def test_cancelled_leader_does_not_cancel_followers(self):
+        flight = AsyncSingleFlight()
+
+        async def fn():
+            await asyncio.sleep(0.02)
+            return "done"
+
+        async def main():
+            leader = asyncio.ensure_future(flight.do("k", fn))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(flight.do("k", fn))
+            await asyncio.sleep(0)
+            leader.cancel()
+            return await follower
+
+        assert asyncio.run(main()) == "done"
+
+
+class TestCoalescedLLMCalls:
+    """Identical concurrent prompts reach Ollama once on both call paths"""
+
+    @pytest.fixture
+    def ollama(self, ollama):
+        """Slow replies, so concurrent callers overlap"""
+        ollama.delay = 0.3
+        ollama.reply = '{"category": "HR"}'
+        return ollama
+
+    def test_threaded_callers(self, ollama):
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda _: agents.call_ollama("Same prompt", "sys"), range(4)))
+
+        assert results == ['{"category": "HR"}'] * 4
+        assert ollama.requests == 1
+        assert agents.llm_single_flight.stats.snapshot()["coalesced"] == 3
+
+    def test_async_callers(self, ollama):
+        async def main():
+            try:
+                return await asyncio.gather(*(agents.call_ollama_async("Same prompt", "sys") for _ in range(4)),
+                                            agents.call_ollama_async("Other prompt", "sys"))
+            finally:
+                await agents.async_llm_client.aclose()
+
+        results = asyncio.run(main())
+
+        assert results == ['{"category": "HR"}'] * 5
+        assert ollama.requests == 2
+        assert agents.async_llm_single_flight.stats.snapshot()["coalesced"] == 3
+
+    def test_errors_are_shared_too(self, ollama, monkeypatch):
+        monkeypatch.setattr(agents, "llm_client", LLMClient(base_url=ollama.base_url, read_timeout=0.1))
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            results = list(pool.map(lambda _: agents.call_ollama("Same prompt", "sys"), range(3)))
+
+        assert results == ["Error: Timeout"] * 3
+        assert ollama.requests == 1
+
+    def test_stats_endpoint(self, client):
+        data = client.get("/api/llm/single-flight-stats").json()
+        assert {"leaders", "coalesced", "peak_waiters"} <= set(data["sync"])
+        assert "coalesced" in data["async"]
@@ -0,0 +1,161 @@
+"""
+API Tests for the paginated ticket listing
+"""
+
+from datetime import datetime, timedelta
+from sqlmodel import Session
+from app.models import Ticket
+
+
+def seed_tickets(engine, count: int, **overrides):
+    base = datetime(2026, 1, 1)
+    with Session(engine) as session:
+        for i in range(count):
+            fields = {
+                "title": f"Ticket {i}",
+                "description": "x" * 500,
+                "priority": "High" if i % 2 else "Low",
+                "status": "New",
+                "ai_reasoning": "long reasoning",
+                "ai_analysis": "{}",
+                "created_at": base + timedelta(minutes=i)
+            }
+            fields.update(overrides)
+            session.add(Ticket(**fields))
+        session.commit()
+
+
+class TestTicketListing:
+    """Keyset pagination, filters and projection on GET /tickets"""
+
+    def test_pages_cover_all_tickets_newest_first(self, client, clean_db):
+        """Following X-Next-Cursor walks every ticket exactly once"""
+        seed_tickets(clean_db, 7)
+
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 3}
+            if cursor:
+                params["cursor"] = cursor
+            res = client.get("/tickets", params=params)
+            assert res.status_code == 200
+            seen.extend(t["id"] for t in res.json())
+            cursor = res.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+        assert len(seen) == 7
+        assert len(set(seen)) == 7
+        assert seen == sorted(seen, reverse=True)
+
+    def test_ties_on_created_at_are_broken_by_id(self, client, clean_db):
+        """Tickets sharing a timestamp are neither skipped nor repeated"""
+        seed_tickets(clean_db, 5, created_at=datetime(2026, 1, 1))
+
+        first = client.get("/tickets", params={"limit": 2})
+        second = client.get("/tickets", params={"limit": 10, "cursor": first.headers["X-Next-Cursor"]})
+
+        ids = [t["id"] for t in first.json()] + [t["id"] for t in second.json()]
+        assert sorted(ids) == sorted(set(ids))
+        assert len(ids) == 5
+
+    def test_filters(self, client, clean_db):
+        """Server-side filtering by priority and status"""
+        seed_tickets(clean_db, 6)
+
+        res = client.get("/tickets", params={"priority": "High"})
+        assert len(res.json()) == 3
+        assert all(t["priority"] == "High" for t in res.json())
+
+        assert client.get("/tickets", params={"status": "Closed"}).json() == []
+
+    def test_projection_excludes_blobs(self, client, clean_db):
+        """List rows carry a short preview instead of the large text columns"""
+        seed_tickets(clean_db, 1)
+
+        row = client.get("/tickets").json()[0]
+        assert "description" not in row
+        assert "ai_reasoning" not in row
+        assert "ai_analysis" not in row
+        assert len(row["description_preview"]) == 120
+
+    def test_invalid_cursor(self, client):
+        """Garbage cursors are rejected"""
+        assert client.get("/tickets", params={"cursor": "not-a-cursor"}).status_code == 400
+
+    def test_keyset_query_uses_index(self, clean_db):
+        """Newest-first page query is served from the (created_at, id) index"""
+        with clean_db.connect() as conn:
+            plan = conn.exec_driver_sql(
+                "EXPLAIN QUERY PLAN SELECT id FROM ticket "
+                "WHERE (created_at, id) < ('2026-01-01 00:00:00', 10) "
+                "ORDER BY created_at DESC, id DESC LIMIT 50"
+            ).all()
+
+        details = " ".join(row[-1] for row in plan)
+        assert "ix_ticket_created_at_id" in details
+        assert "TEMP B-TREE" not in details
+
+
+class TestRiskColumns:
+    """Filtering and sorting on the promoted analysis columns"""
+
+    def seed_analyzed(self, engine):
+        rows = [
+            ("Blocked", 90, "High"), ("Blocked", 75, "High"), ("Blocked", 40, "Medium"),
+            ("OK", 95, "High"), ("OK", 10, "Low"), (None, None, None)
+        ]
+        with Session(engine) as session:
+            for i, (compliance, risk, level) in enumerate(rows):
+                session.add(Ticket(
+                    title=f"Ticket {i}", description="d", compliance_status=compliance,
+                    risk_score=risk, risk_level=level, llm_used=bool(i % 2),
+                    created_at=datetime(2026, 1, 1) + timedelta(minutes=i)
+                ))
+            session.commit()
+
+    def test_filter_blocked_high_risk(self, client, clean_db):
+        """compliance_status + min_risk narrow the list in SQL"""
+        self.seed_analyzed(clean_db)
+
+        res = client.get("/tickets", params={"compliance_status": "Blocked", "min_risk": 70, "sort": "risk"})
+        assert [t["risk_score"] for t in res.json()] == [90, 75]
+        assert all(t["compliance_status"] == "Blocked" for t in res.json())
+
+    def test_sort_by_risk_paginates(self, client, clean_db):
+        """sort=risk walks analyzed tickets by descending risk via the cursor"""
+        self.seed_analyzed(clean_db)
+
+        scores, cursor = [], None
+        while True:
+            params = {"limit": 2, "sort": "risk"}
+            if cursor:
+                params["cursor"] = cursor
+            res = client.get("/tickets", params=params)
+            scores.extend(t["risk_score"] for t in res.json())
+            cursor = res.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+        assert scores == [95, 90, 75, 40, 10]
+
+    def test_sort_validation(self, client, clean_db):
+        """Unknown sorts and cursors from another sort are rejected"""
+        self.seed_analyzed(clean_db)
+
+        assert client.get("/tickets", params={"sort": "title"}).status_code == 400
+        cursor = client.get("/tickets", params={"limit": 1}).headers["X-Next-Cursor"]
+        assert client.get("/tickets", params={"sort": "risk", "cursor": cursor}).status_code == 400
+
+    def test_risk_query_uses_composite_index(self, clean_db):
+        """Blocked tickets above a risk threshold are read from (compliance_status, risk_score)"""
+        with clean_db.connect() as conn:
+            plan = conn.exec_driver_sql(
+                "EXPLAIN QUERY PLAN SELECT id FROM ticket "
+                "WHERE compliance_status = 'Blocked' AND risk_score >= 70 "
+                "ORDER BY risk_score DESC, id DESC LIMIT 50"
+            ).all()
+
+        details = " ".join(row[-1] for row in plan)
+        assert "ix_ticket_compliance_status_risk_score" in details
+        assert "TEMP B-TREE" not in details
@@ -0,0 +1,143 @@
+"""
+Tests for micro-batched LLM triage
+MicroBatcher windows/flushes and the batched triage agent with per-ticket fallback
+"""
+
+import asyncio
+import json
+import re
+import pytest
+from app.micro_batch import MicroBatcher
+import app.agents as agents
+
+HR = {"category": "HR", "priority": "Low", "department": "HR", "reasoning": "Leave request for HR"}
+
+
+def run(coro_fn):
+    async def main():
+        try:
+            return await coro_fn()
+        finally:
+            await agents.async_llm_client.aclose()
+    return asyncio.run(main())
+
+
+class TestMicroBatcher:
+    """Window, size limit, singles and failures"""
+
+    def test_concurrent_submits_share_one_call(self):
+        calls = []
+
+        async def handler(items):
+            calls.append(list(items))
+            return [item * 10 for item in items]
+
+        batcher = MicroBatcher(handler, window_ms=20, max_batch=10)
+
+        async def main():
+            return await asyncio.gather(*(batcher.submit(i) for i in range(1, 5)))
+
+        assert asyncio.run(main()) == [10, 20, 30, 40]
+        assert calls == [[1, 2, 3, 4]]
+        assert batcher.stats.snapshot()["avg_batch_size"] == 4
+
+    def test_full_batch_flushes_without_waiting(self):
+        async def handler(items):
+            return items
+
+        batcher = MicroBatcher(handler, window_ms=10_000, max_batch=2)
+
+        async def main():
+            return await asyncio.wait_for(asyncio.gather(batcher.submit("a"), batcher.submit("b")), timeout=1)
+
+        assert asyncio.run(main()) == ["a", "b"]
+
+    def test_single_item_skips_handler(self):
+        async def handler(items):
+            raise AssertionError("handler must not run for one item")
+
+        batcher = MicroBatcher(handler, window_ms=5, max_batch=8)
+
+        assert asyncio.run(batcher.submit("alone")) is None
+        assert batcher.stats.snapshot()["singles"] == 1
+
+    def test_handler_failure_resolves_none(self):
+        async def handler(items):
+            return items[:1]  # Wrong length counts as a failure
+
+        batcher = MicroBatcher(handler, window_ms=5, max_batch=8)
+
+        async def main():
+            return await asyncio.gather(batcher.submit(1), batcher.submit(2))
+
+        assert asyncio.run(main()) == [None, None]
+        counters = batcher.stats.snapshot()
+        assert (counters["batch_failures"], counters["fallbacks"]) == (1, 2)
+
+
+class TestSplitTriageBatch:
+    """Batch replies are split and validated per ticket"""
+
+    def test_matches_by_id_and_validates(self):
+        reply = "Here you go: " + json.dumps([
+            {"id": 2, **HR},
+            {"id": 1, **HR, "category": "Gardening"},  # Invalid -> single-ticket fallback
+        ])
+
+        results = agents._split_triage_batch(reply, 3)
+
+        assert results[0] is None and results[2] is None
+        assert results[1]["category"] == "HR"
+        assert results[1]["method"] == "llm_batch"
+
+    def test_unusable_reply_raises(self):
+        with pytest.raises(RuntimeError):
+            agents._split_triage_batch("Error: Timeout", 2)
+        with pytest.raises(ValueError):
+            agents._split_triage_batch('{"category": "HR"}', 2)
+
+
+class TestBatchedTriageAgent:
+    """Concurrent async triages go out as one prompt"""
+
+    @pytest.fixture
+    def ollama(self, ollama, monkeypatch):
+        """Shared fake Ollama wiring (conftest) with batching on"""
+        monkeypatch.setattr(agents, "TRIAGE_BATCHING", True)
+        monkeypatch.setattr(agents, "triage_batcher", MicroBatcher(agents._triage_batch, window_ms=30, max_batch=8))
+        return ollama
+
+    def test_batch_with_fallback(self, ollama):
+        prompts = []
+
+        def responder(payload):
+            prompts.append(payload["prompt"])
+            ids = [int(i) for i in re.findall(r"^\[(\d+)\] Title:", payload["prompt"], re.MULTILINE)]
+            if ids:
+                # The model skips the last ticket of the batch
+                return json.dumps([{"id": i, **HR} for i in ids[:-1]]) + " Let me know if you need more."
+            return json.dumps({**HR, "reasoning": "Single-ticket classification"})
+
+        ollama.responder = responder
+        tickets = [(f"Holiday {i}", "I would like to book annual leave in August") for i in range(3)]
+
+        results = run(lambda: asyncio.gather(*(agents.triage_agent_raw_async(*t) for t in tickets)))
+
+        assert [r["category"] for r in results] == ["HR"] * 3
+        assert [r.get("method") for r in results] == ["llm_batch", "llm_batch", None]
+        assert ollama.requests == 2  # One batch + one fallback
+        assert prompts[0].count("Title:") == 3
+        assert agents.triage_batcher.stats.snapshot()["fallbacks"] == 1
+
+    def test_lone_ticket_uses_single_prompt(self, ollama):
+        ollama.reply = json.dumps(HR)
+
+        result = run(lambda: agents.triage_agent_raw_async("Holiday", "I would like to book annual leave in August"))
+
+        assert result["category"] == "HR" and "method" not in result
+        assert agents.triage_batcher.stats.snapshot()["singles"] == 1
+
+    def test_agent_metrics_expose_batching(self, client):
+        data = client.get("/api/agent-metrics").json()["triage_batching"]
+        assert data["config"]["max_batch"] >= 1
+        assert "fallbacks" in data["counters"]